@@ -1,5 +1,6 @@
-// Import generated problems
+// Import generated problems and solutions
 import { generatedProblems } from './generated-problems';
+import { generatedSolutions } from './generated-solutions';
 
 // Mock database configuration for testing without PostgreSQL
 export const mockConnection = {
@@ -85,5 +86,6 @@ export const mockSolutions = [
     created_at: new Date(),
     updated_at: new Date(),
     published_at: new Date()
-  }
+  },
+  ...generatedSolutions
 ];
\ No newline at end of file
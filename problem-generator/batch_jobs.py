@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Offline Batch Jobs for ML/AI Problem Generation System
+Exports prompts as JSONL jobs and bulk-imports the model results
+"""
+
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from dedup_index import DuplicateProblemError, MinHashLSH, problem_text
+from ml_problem_generator import MLProblemGenerator
+from practice_skeleton import SkeletonError
+from schema import PROBLEM_SCHEMA, SOLUTION_SCHEMA, SchemaValidationError, check_record, load_record
+
+SOLUTION_STAGES = ("full_solution", "practice_solution")
+
+def export_problem_jobs(generator: MLProblemGenerator, topics: List, jobs_file: str) -> int:
+    """Render one problem prompt per topic (or planned coverage cell) into a JSONL job file"""
+    jobs = []
+    for item in topics:
+        topic, difficulty, company = (item, None, None) if isinstance(item, str) else item
+        problem_id = generator._get_problem_placeholder(topic)["id"]
+        # Planned cells ride along in the custom_id so the import can pin them
+        cell = f":{difficulty}:{company}" if difficulty or company else ""
+        jobs.append({
+            "custom_id": f"problem:{problem_id}:{topic}{cell}",
+            "stage": "problem",
+            "topic": topic,
+            "prompt": generator._load_problem_prompt(topic, difficulty, company)
+        })
+    return _write_jsonl(jobs_file, jobs)
+
+def export_solution_jobs(generator: MLProblemGenerator, problems: List[Dict], jobs_file: str) -> int:
+    """Render full and practice solution prompts for each problem into a JSONL job file"""
+    jobs = []
+    for problem in problems:
+        prompts = {"full_solution": generator._load_full_solution_prompt(problem)}
+        # Local practice skeletons are derived from the full solution on import
+        if not generator.local_practice:
+            prompts["practice_solution"] = generator._load_practice_solution_prompt(problem)
+        for stage, prompt in prompts.items():
+            jobs.append({
+                "custom_id": f"{stage}:{problem['id']}",
+                "stage": stage,
+                "topic": problem.get("topic", ""),
+                "prompt": prompt
+            })
+    return _write_jsonl(jobs_file, jobs)
+
+def import_results(generator: MLProblemGenerator, results_file: str, solution_jobs_file: str = None) -> Dict:
+    """Parse, validate and persist a JSONL results file in one pass.
+    
+    Problems and solutions are each committed with a single bulk write.
+    Imported problems get a follow-up solution job file (the second round),
+    and responses that fail validation are written to a rejects file.
+    """
+    problems, solutions, rejects = [], [], []
+    stored_problems = {p["id"]: p for p in generator.data_manager.get_all_problems()}
+    # Re-importing the same results file must not duplicate records
+    stored_solutions = {(s.get("problem_id"), s.get("type")) for s in generator.data_manager.get_all_solutions()}
+    # Near-duplicates within this file are not in the store's index yet
+    batch_index = MinHashLSH()
+    
+    for line_number, entry in _read_jsonl(results_file):
+        if entry is None:
+            rejects.append({"custom_id": f"line {line_number}", "errors": ["invalid JSON line"]})
+            continue
+        if not isinstance(entry, dict):
+            rejects.append({"custom_id": f"line {line_number}",
+                            "errors": [f"expected a JSON object, got {type(entry).__name__}"]})
+            continue
+        custom_id = entry.get("custom_id", "")
+        stage, _, rest = custom_id.partition(":")
+        text = response_text(entry)
+        if text is None:
+            rejects.append({"custom_id": custom_id, "errors": ["no response text"]})
+            continue
+        
+        try:
+            if stage == "problem":
+                problem_id, _, topic = rest.partition(":")
+                topic, _, cell = topic.partition(":")
+                difficulty, _, company = cell.partition(":")
+                if problem_id in stored_problems:
+                    raise SchemaValidationError([f"problem '{problem_id}' already imported"])
+                base = generator._get_problem_placeholder(topic)
+                base["id"] = problem_id
+                problem = load_record(text, PROBLEM_SCHEMA, base)
+                # The job id is authoritative even if the model echoed its own
+                problem["id"] = problem_id
+                generator._pin_cell(problem, difficulty or None, company or None)
+                signature = batch_index.signature(problem_text(problem))
+                batch_matches = batch_index.query(signature)
+                if batch_matches and generator.on_duplicate == "reject":
+                    raise SchemaValidationError([f"near-duplicate of {batch_matches[0][0]} in this file"])
+                generator.check_duplicate(problem)
+                batch_index.add(problem_id, signature)
+                stored_problems[problem_id] = problem
+                problems.append(problem)
+            elif stage in SOLUTION_STAGES:
+                problem = stored_problems.get(rest)
+                if problem is None:
+                    raise SchemaValidationError([f"unknown problem '{rest}'"])
+                if (rest, stage) in stored_solutions:
+                    raise SchemaValidationError([f"{stage} for '{rest}' already imported"])
+                if stage == "full_solution":
+                    base = generator._get_full_solution_placeholder(problem)
+                else:
+                    base = generator._get_practice_solution_placeholder(problem)
+                solution = load_record(text, SOLUTION_SCHEMA, base)
+                solution.update(problem_id=rest, type=stage)
+                # Only a valid response claims the slot; a later retry line may still fill it
+                stored_solutions.add((rest, stage))
+                solutions.append(solution)
+                if stage == "full_solution" and generator.local_practice \
+                        and (rest, "practice_solution") not in stored_solutions:
+                    practice = _derive_practice(generator, problem, solution)
+                    if practice is not None:
+                        stored_solutions.add((rest, "practice_solution"))
+                        solutions.append(practice)
+            else:
+                raise SchemaValidationError([f"unknown stage '{stage}'"])
+        except SchemaValidationError as e:
+            rejects.append({"custom_id": custom_id, "errors": e.errors})
+        except DuplicateProblemError as e:
+            rejects.append({"custom_id": custom_id, "errors": [str(e)]})
+    
+    if problems:
+        generator.data_manager.save_problems(problems)
+    if solutions:
+        generator.data_manager.save_solutions(solutions)
+    
+    base_path = os.path.splitext(results_file)[0]
+    summary = {"problems": len(problems), "solutions": len(solutions), "rejected": len(rejects)}
+    if rejects:
+        summary["rejects_file"] = f"{base_path}.rejects.jsonl"
+        _write_jsonl(summary["rejects_file"], rejects)
+    if problems:
+        summary["solution_jobs_file"] = solution_jobs_file or f"{base_path}.solution_jobs.jsonl"
+        summary["solution_jobs"] = export_solution_jobs(generator, problems, summary["solution_jobs_file"])
+    return summary
+
+def _derive_practice(generator: MLProblemGenerator, problem: Dict, full_solution: Dict) -> Optional[Dict]:
+    """Local practice skeleton for an imported full solution, or None if the code cannot be stubbed"""
+    try:
+        return check_record(generator.derive_practice_solution(problem, full_solution), SOLUTION_SCHEMA)
+    except (SkeletonError, SchemaValidationError):
+        return None
+
+def response_text(entry: Dict):
+    """Extract the model text from a plain or provider batch-API result line"""
+    for key in ("response", "content", "output", "text"):
+        value = entry.get(key)
+        if isinstance(value, str):
+            return value
+    
+    # OpenAI batch output: response.body.choices[0].message.content
+    body = (entry.get("response") or {}).get("body") if isinstance(entry.get("response"), dict) else None
+    if isinstance(body, dict) and body.get("choices"):
+        return body["choices"][0].get("message", {}).get("content")
+    
+    # Anthropic batch output: result.message.content[*].text
+    result = entry.get("result")
+    if isinstance(result, dict) and isinstance(result.get("message"), dict):
+        parts = [block.get("text", "") for block in result["message"].get("content", []) if block.get("type") == "text"]
+        return "".join(parts) if parts else None
+    return None
+
+def _read_jsonl(path: str) -> Iterable[Tuple[int, Optional[Dict]]]:
+    """Yield (line number, record) pairs; the record is None for unparseable lines"""
+    with open(path, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError:
+                yield line_number, None
+
+def _write_jsonl(path: str, records: List[Dict]) -> int:
+    with open(path, 'w') as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(",", ":")))
+            f.write("\n")
+    return len(records)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Coverage Planner for ML/AI Problem Generation System
+Plans the fewest generations that bring the store up to a target coverage matrix
+"""
+
+import heapq
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
+
+from config.ml_topics_config import MLTopicsConfig
+
+# One planned generation: the coverage cell it is meant to fill
+PlannedGeneration = namedtuple("PlannedGeneration", ["topic", "difficulty", "company"])
+
+DEFAULT_CELL_TARGET = 1
+
+class CoveragePlanner:
+    """Computes the gaps in the topic × difficulty × company matrix.
+    
+    Each generation is pinned to one cell, so the smallest plan is exactly the
+    sum of the cell shortfalls. Work is ordered by remaining gap, largest
+    first, so successive generations spread across cells instead of filling
+    one before starting the next; ties go to topics the company prefers.
+    """
+    
+    def __init__(self, topics_config: MLTopicsConfig = None, target: int = DEFAULT_CELL_TARGET):
+        self.topics_config = topics_config or MLTopicsConfig()
+        self.target = target
+    
+    def target_cells(self, topics: List[str]) -> List[Tuple[str, str, str]]:
+        """Every (topic, difficulty, company) cell the catalog expects to be covered"""
+        preferring = self._preferring_companies()
+        cells = []
+        for topic in topics:
+            metadata = self.topics_config.get_topic_metadata(topic)
+            difficulties = metadata.get("difficulty_levels") or ["medium"]
+            companies = metadata.get("companies") or preferring.get(topic) or ["OpenAI"]
+            cells.extend((topic, difficulty, company) for difficulty in difficulties for company in companies)
+        return cells
+    
+    def gaps(self, topics: List[str], counts: Dict[Tuple[str, str, str], int]) -> Dict[Tuple[str, str, str], int]:
+        """Shortfall per under-covered cell"""
+        gaps = {}
+        for cell in self.target_cells(topics):
+            missing = self.target - counts.get(cell, 0)
+            if missing > 0:
+                gaps[cell] = missing
+        return gaps
+    
+    def plan(self, topics: List[str], counts: Dict[Tuple[str, str, str], int],
+             limit: Optional[int] = None) -> List[PlannedGeneration]:
+        """Ordered generations that close every gap (or the first `limit` of them)"""
+        preference = self._preference_scores()
+        heap = [
+            (-missing, -preference.get((company, topic), 0.0), topic, difficulty, company, missing)
+            for (topic, difficulty, company), missing in self.gaps(topics, counts).items()
+        ]
+        heapq.heapify(heap)
+        
+        plan = []
+        while heap and (limit is None or len(plan) < limit):
+            _, rank, topic, difficulty, company, missing = heapq.heappop(heap)
+            plan.append(PlannedGeneration(topic, difficulty, company))
+            if missing > 1:
+                heapq.heappush(heap, (-(missing - 1), rank, topic, difficulty, company, missing - 1))
+        return plan
+    
+    def _preference_scores(self) -> Dict[Tuple[str, str], float]:
+        """Higher for topics earlier in a company's COMPANY_TOPIC_PREFERENCES list"""
+        scores = {}
+        for company, preferred in self.topics_config.COMPANY_TOPIC_PREFERENCES.items():
+            for rank, topic in enumerate(preferred):
+                scores[(company, topic)] = 1.0 - rank / len(preferred)
+        return scores
+    
+    def _preferring_companies(self) -> Dict[str, List[str]]:
+        companies = {}
+        for company, preferred in self.topics_config.COMPANY_TOPIC_PREFERENCES.items():
+            for topic in preferred:
+                companies.setdefault(topic, []).append(company)
+        return companies
+
+def summarize_plan(plan: List[PlannedGeneration]) -> Dict[str, int]:
+    """Planned generations per topic, largest first"""
+    counts = {}
+    for item in plan:
+        counts[item.topic] = counts.get(item.topic, 0) + 1
+    return dict(sorted(counts.items(), key=lambda entry: entry[1], reverse=True))
@@ -4,11 +4,19 @@ Data Manager for ML/AI Problem Generation System
 Handles storage, retrieval, and management of generated problems and solutions
 """
 
+import heapq
 import json
 import os
-from typing import Dict, List, Optional
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 import uuid
+from dedup_index import DuplicateIndex
+from schema import PROBLEM_SCHEMA, SOLUTION_SCHEMA, check_record
+from metrics import STORE_BYTES, STORE_COMMIT_LATENCY
+from read_index import ReadIndex
+from solution_join import SolutionJoin
+from tracing import traced
 
 class DataManager:
     """Manages generated problems and solutions data"""
@@ -18,6 +26,15 @@ class DataManager:
         self.problems_file = os.path.join(data_dir, "generated_problems.json")
         self.solutions_file = os.path.join(data_dir, "generated_solutions.json")
         self.metadata_file = os.path.join(data_dir, "generation_metadata.json")
+        self.dedup_index_file = os.path.join(data_dir, "dedup_index.json")
+        self.join_file = os.path.join(data_dir, "solution_join.json")
+        self._dedup_index = None
+        self._dedup_version = None
+        self._join = None
+        self._coverage = None
+        self._read_index = None
+        # Writes are read-modify-write on whole files; serialize them across threads
+        self._lock = threading.RLock()
         
         # Ensure data directory exists
         os.makedirs(data_dir, exist_ok=True)
@@ -41,44 +58,146 @@ class DataManager:
                 "generation_history": []
             })
     
+    @STORE_COMMIT_LATENCY.timed(operation="save_problem")
+    @traced("store.save_problem")
     def save_problem(self, problem: Dict) -> str:
         """Save a generated problem and return its ID"""
-        problems = self._load_problems()
-        
-        # Add generation metadata
-        problem["generated_at"] = datetime.now().isoformat()
-        problem["status"] = "generated"
-        
-        # Convert datetime objects to strings
-        problem_copy = self._convert_datetime_to_string(problem)
-        
-        problems.append(problem_copy)
-        self._save_problems(problems)
-        
-        # Update metadata
-        self._update_metadata("problem_added", problem["id"])
-        
-        return problem["id"]
+        with self._lock:
+            join = self._get_join()
+            index = self._get_dedup_index()
+            problems = self._load_problems()
+            
+            # Add generation metadata
+            problem["generated_at"] = datetime.now().isoformat()
+            problem["status"] = "generated"
+            
+            # Convert datetime objects to strings, then repair and validate the shape
+            problem_copy = check_record(self._convert_datetime_to_string(problem), PROBLEM_SCHEMA)
+            
+            problems.append(problem_copy)
+            self._save_problems(problems)
+            self._commit_join(join)
+            self._index_problems(index, [problem_copy])
+            
+            # Update metadata
+            self._update_metadata("problem_added", problem["id"])
+            
+            return problem["id"]
     
+    @STORE_COMMIT_LATENCY.timed(operation="save_solution")
+    @traced("store.save_solution")
     def save_solution(self, solution: Dict, problem_id: str) -> str:
         """Save a generated solution and return its ID"""
-        solutions = self._load_solutions()
-        
-        # Add generation metadata
-        solution["generated_at"] = datetime.now().isoformat()
-        solution["problem_id"] = problem_id
-        solution["status"] = "generated"
-        
-        # Convert datetime objects to strings
-        solution_copy = self._convert_datetime_to_string(solution)
-        
-        solutions.append(solution_copy)
-        self._save_solutions(solutions)
-        
-        # Update metadata
-        self._update_metadata("solution_added", solution["id"])
-        
-        return solution["id"]
+        with self._lock:
+            join = self._get_join()
+            solutions = self._load_solutions()
+            
+            # Add generation metadata
+            solution["generated_at"] = datetime.now().isoformat()
+            solution["problem_id"] = problem_id
+            solution["status"] = "generated"
+            
+            # Convert datetime objects to strings, then repair and validate the shape
+            solution_copy = check_record(self._convert_datetime_to_string(solution), SOLUTION_SCHEMA)
+            
+            solutions.append(solution_copy)
+            self._save_solutions(solutions)
+            join.add_solutions([solution_copy])
+            self._commit_join(join)
+            
+            # Update metadata
+            self._update_metadata("solution_added", solution["id"])
+            
+            return solution["id"]
+    
+    @STORE_COMMIT_LATENCY.timed(operation="save_problems")
+    @traced("store.save_problems")
+    def save_problems(self, problems: List[Dict]) -> List[str]:
+        """Validate and save many problems with a single write; returns their IDs"""
+        with self._lock:
+            generated_at = datetime.now().isoformat()
+            new_problems = []
+            for problem in problems:
+                problem["generated_at"] = generated_at
+                problem["status"] = "generated"
+                new_problems.append(check_record(self._convert_datetime_to_string(problem), PROBLEM_SCHEMA))
+            
+            join = self._get_join()
+            index = self._get_dedup_index()
+            stored = self._load_problems()
+            stored.extend(new_problems)
+            self._save_problems(stored)
+            self._commit_join(join)
+            self._index_problems(index, new_problems)
+            
+            ids = [problem["id"] for problem in new_problems]
+            self._update_metadata_many("problem_added", ids)
+            return ids
+    
+    @STORE_COMMIT_LATENCY.timed(operation="save_solutions")
+    @traced("store.save_solutions")
+    def save_solutions(self, solutions: List[Dict]) -> List[str]:
+        """Validate and save many solutions (each carrying problem_id) with a single write"""
+        with self._lock:
+            generated_at = datetime.now().isoformat()
+            new_solutions = []
+            for solution in solutions:
+                solution["generated_at"] = generated_at
+                solution["status"] = "generated"
+                new_solutions.append(check_record(self._convert_datetime_to_string(solution), SOLUTION_SCHEMA))
+            
+            join = self._get_join()
+            stored = self._load_solutions()
+            stored.extend(new_solutions)
+            self._save_solutions(stored)
+            join.add_solutions(new_solutions)
+            self._commit_join(join)
+            
+            ids = [solution["id"] for solution in new_solutions]
+            self._update_metadata_many("solution_added", ids)
+            return ids
+    
+    @STORE_COMMIT_LATENCY.timed(operation="save_records")
+    @traced("store.save_records")
+    def save_records(self, problems: List[Dict], solutions: List[Dict]) -> Dict:
+        """Validate and save problems and their solutions together, rewriting each file once"""
+        with self._lock:
+            generated_at = datetime.now().isoformat()
+            new_problems, new_solutions = [], []
+            for records, validated, schema in ((problems, new_problems, PROBLEM_SCHEMA),
+                                               (solutions, new_solutions, SOLUTION_SCHEMA)):
+                for record in records:
+                    record["generated_at"] = generated_at
+                    record["status"] = "generated"
+                    validated.append(check_record(self._convert_datetime_to_string(record), schema))
+            
+            join = self._get_join()
+            index = self._get_dedup_index() if new_problems else None
+            stored_problems = self._load_problems()
+            stored_solutions = self._load_solutions()
+            metadata = self._load_metadata()
+            
+            stored_problems.extend(new_problems)
+            stored_solutions.extend(new_solutions)
+            if new_problems:
+                self._save_problems(stored_problems)
+            if new_solutions:
+                self._save_solutions(stored_solutions)
+            join.add_solutions(new_solutions)
+            self._commit_join(join)
+            if new_problems:
+                self._index_problems(index, new_problems)
+            
+            metadata["last_updated"] = generated_at
+            metadata["total_problems"] = len(stored_problems)
+            metadata["total_solutions"] = len(stored_solutions)
+            metadata.setdefault("generation_history", []).extend(
+                [{"timestamp": generated_at, "action": "problem_added", "item_id": p["id"]} for p in new_problems]
+                + [{"timestamp": generated_at, "action": "solution_added", "item_id": s["id"]} for s in new_solutions]
+            )
+            self._save_metadata(metadata)
+            
+            return {"problems": len(new_problems), "solutions": len(new_solutions)}
     
     def get_problem(self, problem_id: str) -> Optional[Dict]:
         """Get a specific problem by ID"""
@@ -89,9 +208,34 @@ class DataManager:
         return None
     
     def get_solutions_for_problem(self, problem_id: str) -> List[Dict]:
-        """Get all solutions for a specific problem"""
-        solutions = self._load_solutions()
-        return [sol for sol in solutions if sol.get("problem_id") == problem_id]
+        """Get all solutions for a specific problem, in the order they were stored"""
+        with self._lock:
+            solutions = self._load_solutions()
+            solution_ids = self._get_join().solution_ids(problem_id)
+        by_id = {solution["id"]: solution for solution in solutions}
+        return [by_id[solution_id] for solution_id in solution_ids if solution_id in by_id]
+    
+    def get_problem_with_solutions(self, problem_id: str) -> Optional[Tuple[Dict, List[Dict]]]:
+        """A problem and its solutions from the joined view, or None when the problem does not exist"""
+        problem = self.get_problem(problem_id)
+        if problem is None:
+            return None
+        return problem, self.get_solutions_for_problem(problem_id)
+    
+    def iter_problems_with_solutions(self) -> Iterator[Tuple[Dict, List[Dict]]]:
+        """Every problem, in store order, with its solutions in stored order.
+        
+        Each file is read once and the joined view supplies the pairing, so
+        callers get the join in a single pass instead of a solution scan per
+        problem. Solutions whose problem no longer exists are not yielded.
+        """
+        with self._lock:
+            problems = self._load_problems()
+            solutions = self._load_solutions()
+            refs = dict(self._get_join().refs)
+        by_id = {solution["id"]: solution for solution in solutions}
+        for problem in problems:
+            yield problem, [by_id[solution_id] for solution_id in refs.get(problem["id"], ()) if solution_id in by_id]
     
     def get_all_problems(self) -> List[Dict]:
         """Get all generated problems"""
@@ -117,35 +261,91 @@ class DataManager:
         problems = self._load_problems()
         return [p for p in problems if p.get("difficulty", "").lower() == difficulty.lower()]
     
+    def get_coverage_counts(self) -> Dict[Tuple[str, str, str], int]:
+        """Problem counts per (topic, difficulty, company), rebuilt only when the store changes"""
+        with self._lock:
+            try:
+                stat = os.stat(self.problems_file)
+                version = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                version = None
+            if self._coverage is None or self._coverage[0] != version:
+                counts = {}
+                for problem in self._load_problems():
+                    cell = (problem.get("topic", ""), problem.get("difficulty", ""), problem.get("company", ""))
+                    counts[cell] = counts.get(cell, 0) + 1
+                self._coverage = (version, counts)
+            return dict(self._coverage[1])
+    
+    def get_store_version(self) -> Tuple:
+        """(mtime_ns, size) of the problems and solutions files; changes whenever either is rewritten"""
+        version = []
+        for path in (self.problems_file, self.solutions_file):
+            try:
+                stat = os.stat(path)
+                version.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                version.append(None)
+        return tuple(version)
+    
+    @traced("store.build_read_index")
+    def get_read_index(self) -> ReadIndex:
+        """Lookups, facets and term postings for the current store, rebuilt only when the store changes"""
+        with self._lock:
+            version = self.get_store_version()
+            if self._read_index is None or self._read_index.version != version:
+                self._read_index = ReadIndex(version, self._load_problems(), self._load_solutions(),
+                                             self._load_metadata(), self._get_join().refs)
+            return self._read_index
+    
+    @STORE_COMMIT_LATENCY.timed(operation="update_problem_status")
     def update_problem_status(self, problem_id: str, status: str):
         """Update the status of a problem"""
-        problems = self._load_problems()
-        for problem in problems:
-            if problem["id"] == problem_id:
-                problem["status"] = status
-                problem["updated_at"] = datetime.now().isoformat()
-                break
-        self._save_problems(problems)
+        with self._lock:
+            join = self._get_join()
+            problems = self._load_problems()
+            for problem in problems:
+                if problem["id"] == problem_id:
+                    problem["status"] = status
+                    problem["updated_at"] = datetime.now().isoformat()
+                    break
+            self._save_problems(problems)
+            self._commit_join(join)
     
+    @STORE_COMMIT_LATENCY.timed(operation="delete_problem")
     def delete_problem(self, problem_id: str) -> bool:
         """Delete a problem and its associated solutions"""
-        problems = self._load_problems()
-        solutions = self._load_solutions()
-        
-        # Remove problem
-        original_count = len(problems)
-        problems = [p for p in problems if p["id"] != problem_id]
-        
-        if len(problems) < original_count:
-            # Remove associated solutions
-            solutions = [s for s in solutions if s.get("problem_id") != problem_id]
+        with self._lock:
+            join = self._get_join()
+            problems = self._load_problems()
+            solutions = self._load_solutions()
             
-            self._save_problems(problems)
-            self._save_solutions(solutions)
-            self._update_metadata("problem_deleted", problem_id)
-            return True
-        
-        return False
+            # Remove problem
+            original_count = len(problems)
+            problems = [p for p in problems if p["id"] != problem_id]
+            
+            if len(problems) < original_count:
+                # Remove associated solutions
+                solutions = [s for s in solutions if s.get("problem_id") != problem_id]
+                
+                self._save_problems(problems)
+                self._save_solutions(solutions)
+                join.remove_problem(problem_id)
+                self._commit_join(join)
+                if self._dedup_index is not None:
+                    self._dedup_index.remove(problem_id)
+                    self._dedup_index.save()
+                self._update_metadata("problem_deleted", problem_id)
+                return True
+            
+            return False
+    
+    @traced("store.find_near_duplicates")
+    def find_near_duplicates(self, problem: Dict) -> List[Dict]:
+        """Stored problems whose title, description and examples nearly match this one"""
+        with self._lock:
+            matches = self._get_dedup_index().find(problem)
+        return [{"id": problem_id, "similarity": round(similarity, 3)} for problem_id, similarity in matches]
     
     def get_statistics(self) -> Dict:
         """Get generation statistics"""
@@ -162,6 +362,52 @@ class DataManager:
             "generation_history": metadata.get("generation_history", [])[-10:]  # Last 10 entries
         }
     
+    @STORE_COMMIT_LATENCY.timed(operation="merge_shards")
+    @traced("store.merge_shards")
+    def merge_shards(self, shard_dirs: List[str]) -> Dict:
+        """Merge per-worker shard stores into this store with a k-way merge.
+        
+        Each shard is written by a single worker in generation order, so its
+        records are already sorted by ``generated_at``. The shards are merged
+        lazily with ``heapq.merge`` and each main file is rewritten once.
+        """
+        with self._lock:
+            shards = [DataManager(shard_dir) for shard_dir in shard_dirs]
+            
+            join = self._get_join()
+            index = self._get_dedup_index()
+            problems = self._load_problems()
+            solutions = self._load_solutions()
+            metadata = self._load_metadata()
+            
+            by_generated_at = lambda record: record.get("generated_at", "")
+            new_problems = list(heapq.merge(*[s._load_problems() for s in shards], key=by_generated_at))
+            new_solutions = list(heapq.merge(*[s._load_solutions() for s in shards], key=by_generated_at))
+            new_history = list(heapq.merge(
+                *[s._load_metadata().get("generation_history", []) for s in shards],
+                key=lambda entry: entry.get("timestamp", "")
+            ))
+            
+            problems.extend(new_problems)
+            solutions.extend(new_solutions)
+            self._save_problems(problems)
+            self._save_solutions(solutions)
+            join.add_solutions(new_solutions)
+            self._commit_join(join)
+            self._index_problems(index, new_problems)
+            
+            metadata["last_updated"] = datetime.now().isoformat()
+            metadata["total_problems"] = len(problems)
+            metadata["total_solutions"] = len(solutions)
+            metadata.setdefault("generation_history", []).extend(new_history)
+            self._save_metadata(metadata)
+            
+            return {
+                "shards": len(shards),
+                "problems": len(new_problems),
+                "solutions": len(new_solutions)
+            }
+    
     def export_data(self, export_file: str = None) -> str:
         """Export all data to a single JSON file"""
         if not export_file:
@@ -180,6 +426,7 @@ class DataManager:
         
         return export_file
     
+    @traced("store.read_problems")
     def _load_problems(self) -> List[Dict]:
         """Load problems from file"""
         try:
@@ -188,11 +435,14 @@ class DataManager:
         except (FileNotFoundError, json.JSONDecodeError):
             return []
     
+    @traced("store.write_problems")
     def _save_problems(self, problems: List[Dict]):
         """Save problems to file"""
         with open(self.problems_file, 'w') as f:
             json.dump(problems, f, indent=2)
+            STORE_BYTES.inc(f.tell(), file="problems")
     
+    @traced("store.read_solutions")
     def _load_solutions(self) -> List[Dict]:
         """Load solutions from file"""
         try:
@@ -201,11 +451,14 @@ class DataManager:
         except (FileNotFoundError, json.JSONDecodeError):
             return []
     
+    @traced("store.write_solutions")
     def _save_solutions(self, solutions: List[Dict]):
         """Save solutions to file"""
         with open(self.solutions_file, 'w') as f:
             json.dump(solutions, f, indent=2)
+            STORE_BYTES.inc(f.tell(), file="solutions")
     
+    @traced("store.read_metadata")
     def _load_metadata(self) -> Dict:
         """Load metadata from file"""
         try:
@@ -214,13 +467,20 @@ class DataManager:
         except (FileNotFoundError, json.JSONDecodeError):
             return {}
     
+    @traced("store.write_metadata")
     def _save_metadata(self, metadata: Dict):
         """Save metadata to file"""
         with open(self.metadata_file, 'w') as f:
             json.dump(metadata, f, indent=2)
+            STORE_BYTES.inc(f.tell(), file="metadata")
     
     def _update_metadata(self, action: str, item_id: str):
         """Update metadata with new action"""
+        self._update_metadata_many(action, [item_id])
+    
+    @traced("store.update_metadata")
+    def _update_metadata_many(self, action: str, item_ids: List[str]):
+        """Update metadata with one history entry per item, in a single write"""
         metadata = self._load_metadata()
         
         metadata["last_updated"] = datetime.now().isoformat()
@@ -231,14 +491,44 @@ class DataManager:
         if "generation_history" not in metadata:
             metadata["generation_history"] = []
         
-        metadata["generation_history"].append({
-            "timestamp": datetime.now().isoformat(),
-            "action": action,
-            "item_id": item_id
-        })
+        timestamp = datetime.now().isoformat()
+        metadata["generation_history"].extend(
+            {"timestamp": timestamp, "action": action, "item_id": item_id} for item_id in item_ids
+        )
         
         self._save_metadata(metadata)
     
+    def _get_join(self) -> SolutionJoin:
+        """The problem -> solution IDs view, rebuilt if the store was written behind its back"""
+        if self._join is None:
+            self._join = SolutionJoin(self.join_file)
+        version = self.get_store_version()
+        if not self._join.matches(version):
+            self._join.rebuild(self._load_solutions())
+            self._join.save(version)
+        return self._join
+    
+    def _commit_join(self, join: SolutionJoin):
+        """Save the view under the store version a write just produced"""
+        join.save(self.get_store_version())
+    
+    def _get_dedup_index(self) -> DuplicateIndex:
+        """The near-duplicate index, reloaded and signed up to date if the store was written behind its back"""
+        version = self.get_store_version()
+        if self._dedup_index is None or self._dedup_version != version:
+            index = DuplicateIndex(self.dedup_index_file)
+            index.sync(self._load_problems())
+            self._dedup_index = index
+            self._dedup_version = version
+        return self._dedup_index
+    
+    @traced("store.index_problems")
+    def _index_problems(self, index: DuplicateIndex, problems: List[Dict]):
+        """Add newly stored problems to the index fetched before the write and save it under the new store version"""
+        index.add(problems)
+        index.save()
+        self._dedup_version = self.get_store_version()
+    
     def _count_by_field(self, items: List[Dict], field: str) -> Dict:
         """Count items by a specific field"""
         counts = {}
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Index for ML/AI Problem Generation System
+MinHash signatures with LSH banding over problem title, description and examples
+"""
+
+import hashlib
+import json
+import re
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+# 16 bands of 4 rows put the LSH candidate threshold near Jaccard 0.5,
+# comfortably below the similarity at which a problem counts as a duplicate
+NUM_PERM = 64
+BANDS = 16
+DUPLICATE_THRESHOLD = 0.8
+
+SHINGLE_SIZE = 3
+_MERSENNE_PRIME = (1 << 61) - 1
+_WORDS = re.compile(r"[a-z0-9]+")
+# Hex digests and UUIDs vary between otherwise identical generations
+_NOISE = re.compile(r"\b[0-9a-f]{8}-[0-9a-f-]{27}\b|\b[0-9a-f]{8,}\b")
+
+class DuplicateProblemError(ValueError):
+    """Raised when a generated problem nearly matches one already stored"""
+    
+    def __init__(self, problem: Dict, matches: List[Dict]):
+        best = matches[0]
+        super().__init__(
+            f"'{problem.get('title')}' is a near-duplicate of {best['id']} (similarity {best['similarity']:.2f})"
+        )
+        self.problem = problem
+        self.matches = matches
+
+def problem_text(problem: Dict) -> str:
+    """The fields that make two problems the same problem"""
+    examples = problem.get("examples") or []
+    example_text = " ".join(
+        " ".join(str(example.get(key, "")) for key in ("input", "output")) if isinstance(example, dict) else str(example)
+        for example in examples
+    )
+    return " ".join([problem.get("title") or "", problem.get("description") or "", example_text])
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> List[str]:
+    """Overlapping word n-grams of the normalized text"""
+    words = _WORDS.findall(_NOISE.sub(" ", text.lower()))
+    if len(words) <= size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+class MinHashLSH:
+    """In-memory MinHash/LSH index keyed by problem ID.
+    
+    Signatures are computed with NumPy over 32-bit shingle hashes; a query
+    looks up one bucket per band and only compares signatures of the
+    candidates it finds, so checking a problem does not scan the store.
+    """
+    
+    def __init__(self, num_perm: int = NUM_PERM, bands: int = BANDS, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, 1 << 31, size=num_perm).astype(np.uint64)
+        self._b = generator.randint(0, 1 << 31, size=num_perm).astype(np.uint64)
+        self.signatures: Dict[str, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, set]] = [{} for _ in range(bands)]
+    
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of a text's shingle set"""
+        pieces = shingles(text)
+        if not pieces:
+            return np.full(self.num_perm, _MERSENNE_PRIME, dtype=np.uint64)
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(piece.encode("utf-8"), digest_size=4).digest(), "little")
+             for piece in set(pieces)),
+            dtype=np.uint64
+        )
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % np.uint64(_MERSENNE_PRIME)
+        return permuted.min(axis=1)
+    
+    def add(self, key: str, signature: np.ndarray):
+        self.remove(key)
+        self.signatures[key] = signature
+        for band, bucket in zip(self._band_keys(signature), self._buckets):
+            bucket.setdefault(band, set()).add(key)
+    
+    def remove(self, key: str):
+        signature = self.signatures.pop(key, None)
+        if signature is None:
+            return
+        for band, bucket in zip(self._band_keys(signature), self._buckets):
+            members = bucket.get(band)
+            if members:
+                members.discard(key)
+                if not members:
+                    del bucket[band]
+    
+    def query(self, signature: np.ndarray, threshold: float = DUPLICATE_THRESHOLD) -> List[Tuple[str, float]]:
+        """Indexed keys whose estimated Jaccard similarity reaches the threshold, most similar first"""
+        candidates = set()
+        for band, bucket in zip(self._band_keys(signature), self._buckets):
+            candidates.update(bucket.get(band, ()))
+        matches = []
+        for key in candidates:
+            similarity = float(np.mean(self.signatures[key] == signature))
+            if similarity >= threshold:
+                matches.append((key, similarity))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+    
+    def _band_keys(self, signature: np.ndarray) -> Iterable[bytes]:
+        for band in range(self.bands):
+            yield signature[band * self.rows:(band + 1) * self.rows].tobytes()
+    
+    def __len__(self):
+        return len(self.signatures)
+    
+    def __contains__(self, key: str):
+        return key in self.signatures
+
+class DuplicateIndex:
+    """A MinHashLSH index persisted next to the problem store"""
+    
+    def __init__(self, index_file: str, threshold: float = DUPLICATE_THRESHOLD):
+        self.index_file = index_file
+        self.threshold = threshold
+        self.lsh = MinHashLSH()
+    
+    def sync(self, problems: List[Dict]):
+        """Load saved signatures and bring them in line with the stored problems"""
+        saved = self._load()
+        changed = False
+        live_ids = set()
+        for problem in problems:
+            live_ids.add(problem["id"])
+            signature = saved.get(problem["id"])
+            if signature is None:
+                signature = self.lsh.signature(problem_text(problem))
+                changed = True
+            self.lsh.add(problem["id"], signature)
+        if changed or set(saved) - live_ids:
+            self.save()
+    
+    def find(self, problem: Dict) -> List[Tuple[str, float]]:
+        """Stored problems that are near-duplicates of the given one"""
+        matches = self.lsh.query(self.lsh.signature(problem_text(problem)), self.threshold)
+        return [match for match in matches if match[0] != problem.get("id")]
+    
+    def add(self, problems: List[Dict]):
+        for problem in problems:
+            self.lsh.add(problem["id"], self.lsh.signature(problem_text(problem)))
+    
+    def remove(self, problem_id: str):
+        self.lsh.remove(problem_id)
+    
+    def save(self):
+        data = {
+            "num_perm": self.lsh.num_perm,
+            "bands": self.lsh.bands,
+            "signatures": {key: signature.tolist() for key, signature in self.lsh.signatures.items()}
+        }
+        with open(self.index_file, 'w') as f:
+            json.dump(data, f, separators=(",", ":"))
+    
+    def _load(self) -> Dict[str, np.ndarray]:
+        try:
+            with open(self.index_file, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        # Signatures from different parameters are not comparable; rebuild them
+        if data.get("num_perm") != self.lsh.num_perm or data.get("bands") != self.lsh.bands:
+            return {}
+        return {key: np.array(values, dtype=np.uint64) for key, values in data.get("signatures", {}).items()}
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Event Log for ML/AI Problem Generation System
+Structured JSON-lines events written off the hot path through a logging queue
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import threading
+import time
+from typing import Optional
+
+EVENT_LOGGER = "problem_generator.events"
+
+_logger = logging.getLogger(EVENT_LOGGER)
+_logger.addHandler(logging.NullHandler())
+_logger.propagate = False
+_logger.setLevel(logging.INFO)
+
+class JsonLinesHandler(logging.Handler):
+    """Appends one JSON object per event to a file through a large write buffer"""
+    
+    def __init__(self, path: str, buffer_size: int = 1 << 16):
+        super().__init__()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.stream = open(path, 'a', buffering=buffer_size)
+    
+    def emit(self, record: logging.LogRecord):
+        try:
+            raw_lines = getattr(record, "raw_lines", None)
+            if raw_lines is not None:
+                self.stream.writelines(raw_lines)
+                return
+            event = dict(getattr(record, "event_fields", {}), ts=round(record.created, 6), event=record.getMessage())
+            self.stream.write(json.dumps(event, separators=(",", ":"), default=str))
+            self.stream.write("\n")
+        except Exception:
+            self.handleError(record)
+    
+    def flush(self):
+        self.stream.flush()
+    
+    def close(self):
+        try:
+            self.stream.close()
+        finally:
+            super().close()
+
+class EventLog:
+    """Owns the queue listener that drains events into a JSON-lines file.
+    
+    Callers only pay for putting a record on an in-memory queue; formatting
+    and file I/O happen on the listener's thread. Without an EventLog,
+    `log_event` returns after a single handler check.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._queue = queue.SimpleQueue()
+        self._handler = logging.handlers.QueueHandler(self._queue)
+        self._file_handler = JsonLinesHandler(path)
+        self._listener = logging.handlers.QueueListener(self._queue, self._file_handler)
+    
+    def start(self) -> "EventLog":
+        _logger.addHandler(self._handler)
+        self._listener.start()
+        return self
+    
+    def close(self):
+        """Drain pending events and close the file"""
+        _logger.removeHandler(self._handler)
+        self._listener.stop()
+        self._file_handler.close()
+    
+    def append_file(self, path: str):
+        """Copy another event file (e.g. a worker's) into this log, in order, then delete it"""
+        try:
+            with open(path, 'r') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        if lines:
+            _logger.info("raw", extra={"raw_lines": lines})
+        os.remove(path)
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.close()
+
+def events_enabled() -> bool:
+    return len(_logger.handlers) > 1
+
+def log_event(event: str, **fields):
+    """Record a structured event (stage, topic, durations, sizes...) if an event log is open"""
+    if len(_logger.handlers) > 1:
+        _logger.info(event, extra={"event_fields": fields})
+
+class PromptArchive:
+    """Writes each rendered prompt to its own file under a per-run directory"""
+    
+    def __init__(self, run_dir: str):
+        self.run_dir = run_dir
+        self._counter = 0
+        self._lock = threading.Lock()
+        os.makedirs(run_dir, exist_ok=True)
+    
+    def save(self, stage: str, topic: str, prompt: str) -> str:
+        with self._lock:
+            self._counter += 1
+            number = self._counter
+        slug = re.sub(r"[^a-z0-9]+", "-", topic.lower()).strip("-") or "topic"
+        path = os.path.join(self.run_dir, f"{number:05d}-{stage}-{slug}.txt")
+        with open(path, 'w') as f:
+            f.write(prompt)
+        return path
+
+class Stopwatch:
+    """Monotonic elapsed time in milliseconds for event durations"""
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+    
+    @property
+    def ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000.0, 3)
+
+def open_event_log(path: Optional[str]) -> Optional[EventLog]:
+    """Start an event log when a path is given"""
+    return EventLog(path).start() if path else None
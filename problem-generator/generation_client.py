@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Generation Client for ML/AI Problem Generation System
+Deadline-aware requests with hedging, retries and latency histograms
+"""
+
+import bisect
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Dict, List, Optional, Tuple, Union
+
+from providers import RateLimitError
+from response_parser import ParsedResponse
+from scheduler import PRIORITY_BATCH, GenerationScheduler
+
+# Per-attempt timeout for each generation stage, in seconds
+DEFAULT_STAGE_TIMEOUTS = {
+    "problem": 120.0,
+    "full_solution": 180.0,
+    "practice_solution": 120.0
+}
+
+# Errors worth retrying; anything else is a bug or a bad response
+RETRYABLE_ERRORS = (TimeoutError, RateLimitError, ConnectionError)
+
+# Log-spaced histogram bucket bounds from 10ms to ~15 minutes
+_BUCKET_BOUNDS = [0.01 * 1.25 ** i for i in range(52)]
+
+class LatencyHistogram:
+    """Fixed log-bucket latency histogram with percentile estimates"""
+    
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+    
+    def record(self, seconds: float):
+        self.counts[bisect.bisect_left(_BUCKET_BOUNDS, seconds)] += 1
+        self.total += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+    
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given percentile, capped at the max seen"""
+        if not self.total:
+            return None
+        target = fraction * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(_BUCKET_BOUNDS[index], self.max) if index < len(_BUCKET_BOUNDS) else self.max
+        return self.max
+
+class GenerationClient:
+    """Wraps a scheduler with per-stage timeouts, hedging and jittered retries.
+    
+    When hedging is on and a request has not answered within the p95 latency
+    seen for its stage, a duplicate is submitted; whichever finishes first
+    wins and the other is cancelled.
+    """
+    
+    def __init__(self, scheduler: GenerationScheduler, stage_timeouts: Optional[Dict[str, float]] = None,
+                 hedge: bool = False, hedge_min_samples: int = 20, max_attempts: int = 3,
+                 backoff_base: float = 1.0, backoff_cap: float = 30.0):
+        self.scheduler = scheduler
+        self.stage_timeouts = dict(DEFAULT_STAGE_TIMEOUTS, **(stage_timeouts or {}))
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "timeouts": 0, "retries": 0}
+        self._random = random.Random()
+        self._lock = threading.Lock()
+    
+    def request(self, prompt: str, stage: str, topic: str, priority: int = PRIORITY_BATCH,
+                deadline: Optional[float] = None, report: Optional[Dict] = None,
+                required_fields: Optional[Dict[str, type]] = None) -> Union[str, ParsedResponse]:
+        """Return the response text, retrying until `deadline` (monotonic seconds).
+        
+        When given, `report` receives this call's retry count. With
+        `required_fields` the scheduler parses the response as it streams and
+        a ParsedResponse is returned; a malformed one is not retried.
+        """
+        with self._lock:
+            self.stats["requests"] += 1
+        
+        for attempt in range(self.max_attempts):
+            if report is not None:
+                report["retries"] = attempt
+            timeout = self.stage_timeouts.get(stage, max(DEFAULT_STAGE_TIMEOUTS.values()))
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+                if timeout <= 0:
+                    raise TimeoutError(f"Deadline exceeded for {stage} '{topic}'")
+            try:
+                return self._attempt(prompt, stage, topic, priority, timeout, required_fields)
+            except RETRYABLE_ERRORS:
+                if attempt == self.max_attempts - 1:
+                    raise
+                self._backoff(attempt, deadline)
+                with self._lock:
+                    self.stats["retries"] += 1
+    
+    def _attempt(self, prompt: str, stage: str, topic: str, priority: int, timeout: float,
+                 required_fields: Optional[Dict[str, type]] = None) -> Union[str, ParsedResponse]:
+        started = time.monotonic()
+        primary = self.scheduler.submit(prompt, stage, topic, priority, required_fields)
+        futures = [primary]
+        
+        hedge_delay = self.hedge_delay(stage, topic) if self.hedge else None
+        if hedge_delay is not None and hedge_delay < timeout:
+            done, _ = wait(futures, timeout=hedge_delay)
+            if not done:
+                futures.append(self.scheduler.submit(prompt, stage, topic, priority, required_fields))
+                with self._lock:
+                    self.stats["hedged"] += 1
+        
+        # Take the first successful response; a failed copy leaves the other running
+        expires = started + timeout
+        pending = set(futures)
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, expires - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.cancelled():
+                    continue
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                for loser in pending:
+                    loser.cancel()
+                self._record(stage, topic, time.monotonic() - started)
+                if future is not primary:
+                    with self._lock:
+                        self.stats["hedge_wins"] += 1
+                return future.result()
+        
+        if error is not None and not pending:
+            raise error
+        for future in pending:
+            future.cancel()
+        with self._lock:
+            self.stats["timeouts"] += 1
+        raise TimeoutError(f"{stage} for '{topic}' timed out after {timeout:.1f}s")
+    
+    def _backoff(self, attempt: int, deadline: Optional[float]):
+        """Sleep for a capped exponential delay with full jitter"""
+        delay = self._random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        if deadline is not None:
+            delay = min(delay, max(0.0, deadline - time.monotonic()))
+        time.sleep(delay)
+    
+    def hedge_delay(self, stage: str, topic: str) -> Optional[float]:
+        """p95 latency for the topic and stage, falling back to the whole stage"""
+        with self._lock:
+            histogram = self.histograms.get((topic, stage))
+            if histogram is None or histogram.total < self.hedge_min_samples:
+                histogram = self.histograms.get(("*", stage))
+            if histogram is None or histogram.total < self.hedge_min_samples:
+                return None
+            return histogram.percentile(0.95)
+    
+    def _record(self, stage: str, topic: str, seconds: float):
+        with self._lock:
+            for key in ((topic, stage), ("*", stage)):
+                if key not in self.histograms:
+                    self.histograms[key] = LatencyHistogram()
+                self.histograms[key].record(seconds)
+    
+    def latency_report(self) -> List[Dict]:
+        """Per-topic/stage latency summary, slowest p95 first"""
+        with self._lock:
+            rows = [
+                {
+                    "topic": topic,
+                    "stage": stage,
+                    "count": histogram.total,
+                    "p50": histogram.percentile(0.5),
+                    "p95": histogram.percentile(0.95),
+                    "max": histogram.max
+                }
+                for (topic, stage), histogram in self.histograms.items()
+            ]
+        return sorted(rows, key=lambda row: row["p95"] or 0.0, reverse=True)
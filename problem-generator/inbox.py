@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Response Inbox for ML/AI Problem Generation System
+Model responses dropped as JSON files, parsed into validated problems and solutions
+"""
+
+import json
+import os
+import signal
+import time
+import uuid
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from integration_manifest import content_hash
+from schema import PROBLEM_SCHEMA, SOLUTION_SCHEMA, SOLUTION_TYPES, SchemaValidationError, check_record, repair_json_text
+
+INBOX_DIR = "inbox"
+DONE_DIR = "done"
+FAILED_DIR = "failed"
+INBOX_SUFFIXES = (".json", ".ndjson", ".jsonl")
+LINE_SUFFIXES = (".ndjson", ".jsonl")
+
+# Files modified more recently than this may still be being written
+SETTLE_SECONDS = 0.2
+
+class Inbox:
+    """A directory of dropped response files and where they go once handled.
+    
+    Writers should write to a dotfile or a *.tmp name and rename into place;
+    as a fallback, files are left alone until they have been unmodified for
+    a moment. A handled file moves to done/, or to failed/ beside an
+    .errors.txt listing the items that did not validate. Valid items from a
+    failed file are still committed, and records carry their own or a
+    content-derived ID, so a fixed file can simply be dropped in again.
+    """
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.done_dir = os.path.join(directory, DONE_DIR)
+        self.failed_dir = os.path.join(directory, FAILED_DIR)
+        os.makedirs(self.done_dir, exist_ok=True)
+        os.makedirs(self.failed_dir, exist_ok=True)
+    
+    def pending(self, exclude=(), settle: float = SETTLE_SECONDS) -> List[str]:
+        """Paths of settled response files not in `exclude`, oldest first"""
+        now = time.time()
+        found = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.startswith(".") or not entry.name.endswith(INBOX_SUFFIXES):
+                    continue
+                if entry.path in exclude or not entry.is_file():
+                    continue
+                mtime = entry.stat().st_mtime
+                if now - mtime >= settle:
+                    found.append((mtime, entry.path))
+        return [path for _, path in sorted(found)]
+    
+    def finish(self, path: str, errors: List[str]) -> str:
+        """Move a handled file to done/ or failed/ and return its new path"""
+        destination = _free_path(os.path.join(self.failed_dir if errors else self.done_dir, os.path.basename(path)))
+        os.replace(path, destination)
+        if errors:
+            with open(destination + ".errors.txt", 'w') as f:
+                f.write("\n".join(errors) + "\n")
+        return destination
+
+def parse_file(path: str) -> Dict:
+    """Parse and validate every item in one response file.
+    
+    Runs in a worker process, so it returns plain data, with item errors
+    as messages, instead of raising.
+    """
+    result = {"path": path, "problems": [], "solutions": [], "errors": []}
+    name = os.path.basename(path)
+    try:
+        items = list(_read_items(path))
+    except (OSError, UnicodeDecodeError) as e:
+        result["errors"].append(f"{name}: {e}")
+        return result
+    
+    for where, item in items:
+        try:
+            problems, solutions = parse_item(item)
+        except SchemaValidationError as e:
+            result["errors"].append(f"{name}{where}: {e}")
+            continue
+        result["problems"].extend(problems)
+        result["solutions"].extend(solutions)
+    return result
+
+def parse_item(item) -> Tuple[List[Dict], List[Dict]]:
+    """Validate one item: a problem, a solution, or {"problem": ..., "solutions": [...]}.
+    
+    Any record may also be a raw model response string, fenced or not.
+    """
+    item = _decode(item)
+    if "problem" in item:
+        problem = _problem(_decode(item["problem"]))
+        solutions = [_solution(_decode(solution), problem["id"]) for solution in item.get("solutions") or []]
+        for solution_type in SOLUTION_TYPES:
+            if item.get(solution_type):
+                solutions.append(_solution(_decode(item[solution_type]), problem["id"], solution_type))
+        return [problem], solutions
+    if "problem_id" in item:
+        return [], [_solution(item, item["problem_id"])]
+    return [_problem(item)], []
+
+def ignore_interrupts():
+    """Pool initializer: leave Ctrl+C to the parent, which drains its workers before exiting"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def _read_items(path: str) -> Iterator[Tuple[str, object]]:
+    """(location, item) pairs: one per line of an NDJSON file, one per element of a JSON list"""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    if path.endswith(LINE_SUFFIXES):
+        for number, line in enumerate(text.splitlines(), 1):
+            if line.strip():
+                yield f":{number}", line
+        return
+    
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        try:
+            # Fenced or chatty model output around a single object
+            data = json.loads(repair_json_text(text))
+        except json.JSONDecodeError:
+            # Let the item report it
+            yield "", text
+            return
+    if isinstance(data, list):
+        for index, item in enumerate(data):
+            yield f"[{index}]", item
+    else:
+        yield "", data
+
+def _decode(item) -> Dict:
+    if isinstance(item, str):
+        try:
+            item = json.loads(repair_json_text(item))
+        except json.JSONDecodeError as e:
+            raise SchemaValidationError([f"invalid JSON: {e.msg}"])
+    if not isinstance(item, dict):
+        raise SchemaValidationError([f"expected a JSON object, got {type(item).__name__}"])
+    return item
+
+def _problem(record: Dict) -> Dict:
+    record = dict(record)
+    if not record.get("id"):
+        record["id"] = _derived_id(record)
+    return check_record(record, PROBLEM_SCHEMA)
+
+def _solution(record: Dict, problem_id: str, solution_type: Optional[str] = None) -> Dict:
+    record = dict(record, problem_id=problem_id)
+    if solution_type:
+        record.setdefault("type", solution_type)
+    if not record.get("id"):
+        record["id"] = _derived_id(record)
+    return check_record(record, SOLUTION_SCHEMA)
+
+def _derived_id(record: Dict) -> str:
+    """An ID from the record's content, so picking the same response up twice yields the same record"""
+    return str(uuid.uuid5(uuid.NAMESPACE_OID, content_hash(record)))
+
+def _free_path(path: str) -> str:
+    """`path`, or `name-N.ext` when an earlier file of the same name is already there"""
+    root, extension = os.path.splitext(path)
+    candidate, number = path, 1
+    while os.path.exists(candidate):
+        candidate = f"{root}-{number}{extension}"
+        number += 1
+    return candidate
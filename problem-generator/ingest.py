@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Bulk Ingest for ML/AI Problem Generation System
+Backfills the store from archives of problem and solution files, parsed in parallel
+"""
+
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from data_manager import DataManager
+from inbox import INBOX_SUFFIXES, ignore_interrupts, parse_file
+from integration_manifest import content_hash
+from read_index import ReadIndex
+from schema import PROBLEM_SCHEMA, SOLUTION_SCHEMA, repair_record
+
+# Bookkeeping the store adds to every record; two records differing only here are the same
+VOLATILE_FIELDS = ("id", "generated_at", "status")
+
+# Files handed to a worker at a time; archives are many small files
+CHUNK_SIZE = 16
+
+def fingerprint(record: Dict, schema: Dict[str, Dict]) -> str:
+    """Content hash of a record without its ID and store bookkeeping.
+    
+    The record is repaired against its schema first: incoming records have
+    been through check_record, but stored ones may predate fields it fills
+    with defaults, and must hash the same.
+    """
+    repaired = repair_record(record, schema)
+    return content_hash({key: value for key, value in repaired.items() if key not in VOLATILE_FIELDS})
+
+class Deduplicator:
+    """Which problems and solutions are new to the store, by ID and by content.
+    
+    Seeded from a read index and updated with every record it accepts, so
+    it also catches duplicates within a batch. A problem whose content is
+    already stored under another ID is dropped and its solutions are moved
+    onto the stored problem before they are checked in turn.
+    """
+    
+    def __init__(self, index: ReadIndex):
+        self.problem_ids = set(index.position)
+        self.solution_ids = set(index.solution_position)
+        self.problem_hashes = {fingerprint(problem, PROBLEM_SCHEMA): problem["id"] for problem in index.problems}
+        self.solution_hashes = {fingerprint(solution, SOLUTION_SCHEMA) for solution in index.solutions}
+        self.aliases: Dict[str, str] = {}
+    
+    def check_problem(self, problem: Dict) -> Optional[str]:
+        """Why a problem is a duplicate, or None when it is new; records nothing"""
+        if problem["id"] in self.problem_ids:
+            return "id"
+        if fingerprint(problem, PROBLEM_SCHEMA) in self.problem_hashes:
+            return "content"
+        return None
+    
+    def add_problem(self, problem: Dict) -> Optional[str]:
+        """Accept a problem and return None, or return why it is a duplicate"""
+        if problem["id"] in self.problem_ids:
+            return "id"
+        digest = fingerprint(problem, PROBLEM_SCHEMA)
+        if digest in self.problem_hashes:
+            self.aliases[problem["id"]] = self.problem_hashes[digest]
+            return "content"
+        self.problem_ids.add(problem["id"])
+        self.problem_hashes[digest] = problem["id"]
+        return None
+    
+    def add_solution(self, solution: Dict) -> Optional[str]:
+        """Accept a solution (repointing it at its surviving problem) and return None, or return why not"""
+        solution["problem_id"] = self.aliases.get(solution["problem_id"], solution["problem_id"])
+        if solution["id"] in self.solution_ids:
+            return "id"
+        if solution["problem_id"] not in self.problem_ids:
+            return "orphan"
+        digest = fingerprint(solution, SOLUTION_SCHEMA)
+        if digest in self.solution_hashes:
+            return "content"
+        self.solution_ids.add(solution["id"])
+        self.solution_hashes.add(digest)
+        return None
+
+def expand_sources(sources: List[str]) -> List[str]:
+    """Response files under each directory (recursively) or matching each glob, in a stable order"""
+    paths = set()
+    for source in sources:
+        if os.path.isdir(source):
+            for root, _, names in os.walk(source):
+                paths.update(os.path.join(root, name) for name in names
+                             if name.endswith(INBOX_SUFFIXES) and not name.startswith("."))
+        else:
+            paths.update(path for path in glob.glob(source, recursive=True) if os.path.isfile(path))
+    return sorted(paths)
+
+def ingest_files(data_manager: DataManager, paths: List[str], workers: Optional[int] = None,
+                 dry_run: bool = False) -> Dict:
+    """Parse and validate files in a process pool, drop duplicates and store the rest with one bulk write"""
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=ignore_interrupts) as executor:
+        # Results come back in file order, so the first copy of a duplicate is the one kept
+        for result in executor.map(parse_file, paths, chunksize=CHUNK_SIZE):
+            results.append(result)
+    parsed = time.perf_counter()
+    
+    dedup = Deduplicator(data_manager.get_read_index())
+    problems, solutions, errors = [], [], []
+    duplicates = {"id": 0, "content": 0}
+    for result in results:
+        errors.extend(result["errors"])
+        for problem in result["problems"]:
+            reason = dedup.add_problem(problem)
+            if reason is None:
+                problems.append(problem)
+            else:
+                duplicates[reason] += 1
+    for result in results:
+        for solution in result["solutions"]:
+            reason = dedup.add_solution(solution)
+            if reason is None:
+                solutions.append(solution)
+            elif reason == "orphan":
+                errors.append(f"{os.path.basename(result['path'])}: solution {solution['id']} "
+                              f"has unknown problem {solution['problem_id']}")
+            else:
+                duplicates[reason] += 1
+    
+    if not dry_run and (problems or solutions):
+        data_manager.save_records(problems, solutions)
+    elapsed = time.perf_counter() - started
+    
+    records = sum(len(result["problems"]) + len(result["solutions"]) for result in results)
+    return {
+        "files": len(paths),
+        "records": records,
+        "problems": len(problems),
+        "solutions": len(solutions),
+        "duplicate_ids": duplicates["id"],
+        "duplicate_content": duplicates["content"],
+        "errors": errors,
+        "parse_seconds": parsed - started,
+        "seconds": elapsed,
+        "records_per_second": records / max(elapsed, 1e-9)
+    }
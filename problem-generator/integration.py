@@ -3,82 +3,441 @@
 Integration script to update backend and frontend with generated problems and solutions
 """
 
+import argparse
 import json
 import os
-from datetime import datetime
+import signal
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set, Tuple
 from data_manager import DataManager
+from dedup_index import MinHashLSH, problem_text
+from events import Stopwatch, log_event
+from inbox import INBOX_DIR, SETTLE_SECONDS, Inbox, ignore_interrupts, parse_file
+from ingest import Deduplicator
+from integration_manifest import MANIFEST_FILE, IntegrationManifest, content_hash, file_stamp
+from precompress import PRECOMPRESS_MANIFEST_FILE, Precompressor, compression_summary
+from publish import PHASE_DEFAULT, PHASE_REFERENCED, Publisher
+from search_index import SEARCH_INDEX_VERSION, SEARCH_STATE_FILE, STOP_WORDS, SearchIndex
+from schema import PROBLEM_SCHEMA, SOLUTION_SCHEMA, repair_record
+from ts_emitter import TS_NEW_DATE, write_ts_module
+
+# Generated modules the integration owns: (output file, export name, header, element type import)
+TARGETS = {
+    "backend_problems": ("../backend/src/config/generated-problems.ts", "generatedProblems",
+                         "// Generated LLM Problems", None),
+    "backend_solutions": ("../backend/src/config/generated-solutions.ts", "generatedSolutions",
+                          "// Generated LLM Solutions", None),
+    "frontend_index": ("../frontend/src/data/generated-question-index.ts", "generatedQuestionIndex",
+                       "// Generated LLM Question Index", ("QuestionSummary", None))
+}
+
+GENERATED_NOTICE = "// This file is generated by problem-generator/integration.py; do not edit it by hand."
+
+# Seconds the watcher waits before retrying a failed publish of an unchanged store
+PUBLISH_RETRY_SECONDS = 30.0
+
+# Full questions are served as static JSON files named by content hash; the
+# index module carries only what lists and filters need plus each shard's path.
+# The app's question list and details still come from the backend API (which
+# serves generated-problems.ts); these files are for static and type-ahead
+# consumers, and no component imports them yet.
+FRONTEND_SHARD_DIR = "../frontend/public/questions"
+FRONTEND_SHARD_URL = "questions"
+FRONTEND_SEARCH_FILE = "../frontend/public/search-index.json"
+FRONTEND_SEARCH_URL = "search-index.json"
+FRONTEND_INDEX_PRELUDE = """import type { Question } from './questions';
+
+export interface QuestionSummary {
+  id: string;
+  title: string;
+  difficulty: 'easy' | 'medium' | 'hard';
+  company?: string;
+  categories: string[];
+  tags: string[];
+  shard: string;
+}
+
+// Shard files are immutable (their names change with their content), so they cache indefinitely
+export async function loadGeneratedQuestion(summary: QuestionSummary): Promise<Question> {
+  const response = await fetch(`${process.env.PUBLIC_URL || ''}/${summary.shard}`);
+  if (!response.ok) {
+    throw new Error(`Failed to load question ${summary.id}: ${response.status}`);
+  }
+  return response.json();
+}
+
+// Prebuilt by integration.py: sorted terms over titles, tags and companies with delta-encoded postings
+interface GeneratedSearchIndex {
+  version: number;
+  docs: [string, string, 'easy' | 'medium' | 'hard', string][];
+  terms: string[];
+  postings: number[][];
+}
+
+export interface QuestionSuggestion {
+  id: string;
+  title: string;
+  difficulty: 'easy' | 'medium' | 'hard';
+  shard: string;
+}
+
+let searchIndex: Promise<GeneratedSearchIndex> | null = null;
+
+function loadSearchIndex(): Promise<GeneratedSearchIndex> {
+  if (!searchIndex) {
+    searchIndex = fetch(`${process.env.PUBLIC_URL || ''}/search-index.json`).then(response => {
+      if (!response.ok) {
+        throw new Error(`Failed to load the search index: ${response.status}`);
+      }
+      return response.json();
+    });
+    searchIndex.catch(() => { searchIndex = null; });
+  }
+  return searchIndex;
+}
+
+// Ordinals of every document with a term starting with `prefix`
+function prefixMatches(index: GeneratedSearchIndex, prefix: string): Set<number> {
+  let low = 0;
+  let high = index.terms.length;
+  while (low < high) {
+    const middle = (low + high) >> 1;
+    if (index.terms[middle] < prefix) {
+      low = middle + 1;
+    } else {
+      high = middle;
+    }
+  }
+  const matches = new Set<number>();
+  for (let i = low; i < index.terms.length && index.terms[i].startsWith(prefix); i++) {
+    let ordinal = 0;
+    for (const gap of index.postings[i]) {
+      ordinal += gap;
+      matches.add(ordinal);
+    }
+  }
+  return matches;
+}
+
+// Dropped from titles, tags and companies when the index is built (search_index.STOP_WORDS)
+const STOP_WORDS = new Set<string>(__STOP_WORDS__);
+
+// Type-ahead over generated questions: every query word must prefix-match a title word, tag or company
+export async function searchGeneratedQuestions(query: string, limit = 10): Promise<QuestionSuggestion[]> {
+  // A stop word still being typed may be the start of a real word ("in" -> "inference")
+  const typing = /[a-z0-9]$/i.test(query);
+  const words = (query.toLowerCase().match(/[a-z0-9]+/g) || [])
+    .filter((word, i, all) => !STOP_WORDS.has(word) || (typing && i === all.length - 1));
+  if (words.length === 0) {
+    return [];
+  }
+  const index = await loadSearchIndex();
+  let matches: Set<number> | null = null;
+  for (const word of words) {
+    const found = prefixMatches(index, word);
+    matches = matches === null ? found : new Set(Array.from(matches).filter(ordinal => found.has(ordinal)));
+    if (matches.size === 0) {
+      return [];
+    }
+  }
+  return Array.from(matches || []).sort((a, b) => a - b).slice(0, limit).map(ordinal => {
+    const [id, title, difficulty, shard] = index.docs[ordinal];
+    return { id, title, difficulty, shard };
+  });
+}""".replace("__STOP_WORDS__", json.dumps(sorted(STOP_WORDS)))
 
 class IntegrationManager:
-    """Manages integration of generated content with backend and frontend"""
+    """Manages integration of generated content with backend and frontend.
+    
+    Each target is a generated module owned by this class; hand-written files
+    such as database-mock.ts only import it. A manifest of per-record content
+    hashes decides whether a module needs rewriting, so a run with nothing
+    new does a few stat calls and exits. Targets are built concurrently into
+    a staging directory and published together by `publish()`.
+    """
     
-    def __init__(self):
-        self.data_manager = DataManager()
+    def __init__(self, data_manager: Optional[DataManager] = None, force: bool = False, precompress: bool = True):
+        self.data_manager = data_manager or DataManager()
         self.backend_dir = "../backend/src/config"
         self.frontend_dir = "../frontend/src/data"
+        self.force = force
+        self.precompress = precompress
+        self.manifest = IntegrationManifest(os.path.join(self.data_manager.data_dir, MANIFEST_FILE))
+        self._store_stamp = None
+        self._records = {}
+        # Builders run on a thread pool and share the loaded records
+        self._records_lock = threading.RLock()
+        self._print_lock = threading.Lock()
+        self._publisher: Optional[Publisher] = None
+        # Saved only once its artifact is published, like the precompress manifest
+        self._search_index: Optional[SearchIndex] = None
         
-    def integrate_with_backend(self):
-        """Update backend mock database with generated problems"""
+    def integrate_with_backend(self) -> Optional[int]:
+        """Update the generated backend problem and solution modules"""
         print("🔄 Integrating with backend...")
-        
-        # Load generated problems
-        problems = self.data_manager.get_all_problems()
-        solutions = self.data_manager.get_all_solutions()
-        
-        # Read current backend mock data
-        backend_file = os.path.join(self.backend_dir, "database-mock.ts")
-        
-        try:
-            with open(backend_file, 'r') as f:
-                content = f.read()
-            
-            # Find the mockProblems array and add our generated problems
-            new_problems = self._convert_to_backend_format(problems)
-            new_solutions = self._convert_to_backend_solutions_format(solutions)
-            
-            # Update the file
-            updated_content = self._update_backend_content(content, new_problems, new_solutions)
-            
-            with open(backend_file, 'w') as f:
-                f.write(updated_content)
-            
-            print(f"✅ Updated backend: {len(new_problems)} problems, {len(new_solutions)} solutions")
-            
-        except Exception as e:
-            print(f"❌ Error updating backend: {e}")
-    
-    def integrate_with_frontend(self):
-        """Update frontend data with generated problems"""
+        return self.publish(["backend_problems", "backend_solutions"])
+    
+    def integrate_with_frontend(self) -> Optional[int]:
+        """Update the frontend question shards, the index module that points at them and the search index"""
         print("🔄 Integrating with frontend...")
+        return self.publish(["frontend_shards", "frontend_index", "frontend_search"])
+    
+    def _builders(self) -> Dict[str, Callable[[], Dict]]:
+        return {
+            "backend_problems": lambda: self._integrate_target(
+                "backend_problems", lambda: self._convert_to_backend_format(self._load("problems"))),
+            "backend_solutions": lambda: self._integrate_target(
+                "backend_solutions", lambda: self._convert_to_backend_solutions_format(self._load("solutions"))),
+            "frontend_shards": lambda: self._integrate_shards(
+                "frontend_shards", FRONTEND_SHARD_DIR, self._frontend_questions),
+            "frontend_index": lambda: self._integrate_target(
+                "frontend_index", self._frontend_summaries, prelude=FRONTEND_INDEX_PRELUDE),
+            "frontend_search": lambda: self._integrate_search_index("frontend_search", FRONTEND_SEARCH_FILE)
+        }
+    
+    def publish(self, names: Optional[List[str]] = None) -> Optional[int]:
+        """Build targets concurrently in a staging directory, then swap them in as one generation.
+        
+        Returns the generation now in place, or None when a target failed;
+        a failed build publishes nothing and leaves the manifests as they were.
+        """
+        builders = self._builders()
+        names = names or list(builders)
+        publisher = self._publisher = Publisher(self.data_manager.data_dir)
+        self._search_index = None
+        generation = publisher.begin()
+        started = time.perf_counter()
+        
+        failed = []
+        with ThreadPoolExecutor(max_workers=len(names)) as executor:
+            futures = {name: executor.submit(builders[name]) for name in names}
+            for name, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    failed.append(name)
+                    print(f"❌ Error building {name.replace('_', ' ')}: {e}")
+        precompressor = None
+        if not failed and self.precompress:
+            try:
+                precompressor = self.precompress_artifacts(publisher)
+            except Exception as e:
+                failed.append("precompressed")
+                print(f"❌ Error precompressing: {e}")
+        self._publisher = None
+        
+        if failed:
+            publisher.abort()
+            self._search_index = None
+            self.manifest = IntegrationManifest(self.manifest.manifest_file)
+            print(f"❌ Generation {generation} not published; {', '.join(failed)} failed")
+            return None
+        if not publisher.has_changes():
+            publisher.abort()
+            self.manifest.save()
+            self._save_deferred(precompressor)
+            print(f"✅ Nothing to publish; generation {publisher.state.get('generation', 0)} is current")
+            return publisher.state.get("generation", 0)
+        
+        state = publisher.commit()
+        if "frontend_shards" in names:
+            # Renaming shards in moves the directory's stamp, but not what the manifest says is in it
+            self.manifest.restamp("frontend_shards", FRONTEND_SHARD_DIR)
+        self.manifest.save()
+        self._save_deferred(precompressor)
+        print(f"📦 Published generation {generation}: {len(state['changed'])} files swapped in, "
+              f"{state['retired']} retired, built in {time.perf_counter() - started:.2f}s")
+        return generation
+    
+    def _save_deferred(self, precompressor: Optional[Precompressor]):
+        """Save the state files that must only move forward with a published generation"""
+        if self._search_index is not None:
+            self._search_index.save()
+            self._search_index = None
+        if precompressor is not None:
+            precompressor.save()
+    
+    def _output(self, destination: str, phase: int = PHASE_DEFAULT) -> str:
+        """Where a builder should write `destination`: its staging path while publishing"""
+        if self._publisher is None:
+            return destination
+        return self._publisher.stage(destination, phase)
+    
+    def _report(self, message: str):
+        """Print from a builder thread without interleaving with the others"""
+        with self._print_lock:
+            print(message)
+    
+    def _retire(self, destination: str):
+        if self._publisher is None:
+            try:
+                os.remove(destination)
+            except FileNotFoundError:
+                pass
+        else:
+            self._publisher.retire(destination)
+    
+    def _integrate_shards(self, name: str, shard_dir: str, convert: Callable[[], List[Dict]]) -> Dict:
+        """Write a JSON file per new or changed record and delete the files of changed or removed ones"""
+        label = name.replace("_", " ")
+        store_stamp = self._get_store_stamp()
+        if not self.force and self.manifest.is_fresh(name, store_stamp, shard_dir):
+            self._report(f"✅ {label}: up to date")
+            return {"added": [], "changed": [], "removed": []}
+        
+        records = convert()
+        diff = self.manifest.diff(name, records)
+        previous = self.manifest.target(name)["records"]
+        written = 0
+        for record in records:
+            path = os.path.join(shard_dir, self._shard_name(record["id"], diff["hashes"][record["id"]]))
+            if self.force or not os.path.exists(path):
+                _write_json_atomic(self._output(path, PHASE_REFERENCED), record)
+                written += 1
+        # Old shards go only after the index that stops pointing at them is in place
+        for record_id in diff["changed"] + diff["removed"]:
+            self._retire(os.path.join(shard_dir, self._shard_name(record_id, previous[record_id])))
+        
+        self.manifest.update(name, diff, store_stamp, shard_dir)
+        self._report(f"✅ {label}: {len(records)} shards, {written} written "
+              f"(+{len(diff['added'])} ~{len(diff['changed'])} -{len(diff['removed'])}) in {shard_dir}")
+        return diff
+    
+    def _integrate_search_index(self, name: str, output_file: str) -> Dict:
+        """Re-tokenize added and changed questions into the search postings and republish the artifact"""
+        label = name.replace("_", " ")
+        store_stamp = self._get_store_stamp()
+        template = str(SEARCH_INDEX_VERSION)
+        if not self.force and self.manifest.is_fresh(name, store_stamp, output_file, template):
+            self._report(f"✅ {label}: up to date")
+            return {"added": [], "changed": [], "removed": []}
+        
+        summaries = self._frontend_summaries()
+        diff = self.manifest.diff(name, summaries)
+        if not self.force and self.manifest.is_unchanged(name, diff, output_file, template):
+            self.manifest.touch(name, store_stamp)
+            self._report(f"✅ {label}: up to date ({len(summaries)} records)")
+            return diff
+        
+        index = SearchIndex(os.path.join(self.data_manager.data_dir, SEARCH_STATE_FILE))
+        if self.force:
+            diff = dict(diff, changed=diff["order"], added=[])
+        reindexed = index.apply(diff, summaries)
+        artifact = index.artifact(diff["order"])
+        staged = self._output(output_file)
+        _write_json_atomic(staged, artifact)
+        if self._publisher is None:
+            index.save()
+        else:
+            self._search_index = index
+        self.manifest.update(name, diff, store_stamp, staged, template)
+        self._report(f"✅ Updated {label}: {len(artifact['terms'])} terms over {len(artifact['docs'])} records, "
+              f"{reindexed} re-tokenized, in {output_file}")
+        return diff
+    
+    def precompress_artifacts(self, publisher: Publisher) -> Precompressor:
+        """Stage .gz/.br copies of the generated modules and shards so they can be served as-is"""
+        precompressor = Precompressor(os.path.join(self.data_manager.data_dir, PRECOMPRESS_MANIFEST_FILE),
+                                      locate=publisher.locate, stage=publisher.stage, remove=publisher.retire)
+        shards = [os.path.join(FRONTEND_SHARD_DIR, self._shard_name(record_id, digest))
+                  for record_id, digest in self.manifest.target("frontend_shards")["records"].items()]
+        paths = [target[0] for target in TARGETS.values()] + [FRONTEND_SEARCH_FILE] + shards
+        counts = precompressor.run(paths)
+        pruned = precompressor.prune(FRONTEND_SHARD_DIR, shards)
+        
+        totals = compression_summary(precompressor.entries, paths)
+        sizes = ", ".join(f"{name} {size / 1024:.1f}KB" for name, size in totals.items() if name != "source")
+        print(f"✅ precompressed: {counts['compressed']} compressed, {counts['unchanged']} unchanged, "
+              f"{pruned} pruned ({totals['source'] / 1024:.1f}KB -> {sizes or 'nothing'})")
+        return precompressor
+    
+    def _frontend_questions(self) -> List[Dict]:
+        with self._records_lock:
+            if "frontend_questions" not in self._records:
+                self._records["frontend_questions"] = self._convert_to_frontend_format(self._load("problems"))
+            return self._records["frontend_questions"]
+    
+    def _frontend_summaries(self) -> List[Dict]:
+        with self._records_lock:
+            if "frontend_summaries" not in self._records:
+                self._records["frontend_summaries"] = [
+                    self._question_summary(question, self._shard_name(question["id"], digest))
+                    for question, digest in self._hashed(self._frontend_questions())
+                ]
+            return self._records["frontend_summaries"]
+    
+    def _hashed(self, records: List[Dict]):
+        for record in records:
+            yield record, content_hash(record)
+    
+    def _shard_name(self, record_id: str, digest: str) -> str:
+        return f"{record_id}.{digest[:12]}.json"
+    
+    def _question_summary(self, question: Dict, shard_name: str) -> Dict:
+        """The index entry for a question: list and filter fields plus its shard path"""
+        return {
+            "id": question["id"],
+            "title": question["title"],
+            "difficulty": question["difficulty"],
+            "company": question["company"],
+            "categories": question["categories"],
+            "tags": question["tags"],
+            "shard": f"{FRONTEND_SHARD_URL}/{shard_name}"
+        }
+    
+    def _integrate_target(self, name: str, convert: Callable[[], List[Dict]], prelude: Optional[str] = None) -> Dict:
+        """Rewrite one generated module if its records were added, changed or removed"""
+        output_file, export_name, header, element_type = TARGETS[name]
+        label = name.replace("_", " ")
+        store_stamp = self._get_store_stamp()
+        template = content_hash({"export": export_name, "header": header, "prelude": prelude,
+                                 "element_type": element_type})
+        if not self.force and self.manifest.is_fresh(name, store_stamp, output_file, template):
+            self._report(f"✅ {label}: up to date")
+            return {"added": [], "changed": [], "removed": []}
         
-        # Load generated problems
-        problems = self.data_manager.get_all_problems()
-        
-        # Read current frontend data
-        frontend_file = os.path.join(self.frontend_dir, "questions.ts")
-        
-        try:
-            with open(frontend_file, 'r') as f:
-                content = f.read()
-            
-            # Convert to frontend format
-            new_questions = self._convert_to_frontend_format(problems)
-            
-            # Update the file
-            updated_content = self._update_frontend_content(content, new_questions)
-            
-            with open(frontend_file, 'w') as f:
-                f.write(updated_content)
-            
-            print(f"✅ Updated frontend: {len(new_questions)} questions")
-            
-        except Exception as e:
-            print(f"❌ Error updating frontend: {e}")
+        records = convert()
+        diff = self.manifest.diff(name, records)
+        if not self.force and self.manifest.is_unchanged(name, diff, output_file, template):
+            self.manifest.touch(name, store_stamp)
+            self._report(f"✅ {label}: up to date ({len(records)} records)")
+            return diff
+        
+        staged = self._output(output_file)
+        write_ts_module(staged, export_name, records,
+                        header=[header, GENERATED_NOTICE] + ([prelude] if prelude else []), element_type=element_type)
+        self.manifest.update(name, diff, store_stamp, staged, template)
+        self._report(f"✅ Updated {label}: {len(records)} records "
+              f"(+{len(diff['added'])} ~{len(diff['changed'])} -{len(diff['removed'])}) in {output_file}")
+        return diff
+    
+    def _get_store_stamp(self) -> List:
+        with self._records_lock:
+            if self._store_stamp is None:
+                self._store_stamp = [file_stamp(self.data_manager.problems_file),
+                                     file_stamp(self.data_manager.solutions_file)]
+            return self._store_stamp
+    
+    def _load(self, kind: str) -> List[Dict]:
+        """Problems, or solutions grouped under their problems, from one pass over the joined view"""
+        with self._records_lock:
+            if kind not in self._records:
+                problems, solutions = [], []
+                for problem, problem_solutions in self.data_manager.iter_problems_with_solutions():
+                    problems.append(problem)
+                    solutions.extend(problem_solutions)
+                self._records["problems"] = problems
+                self._records["solutions"] = solutions
+            return self._records[kind]
     
     def _convert_to_backend_format(self, problems):
         """Convert generated problems to backend format"""
         backend_problems = []
         
         for problem in problems:
+            problem = repair_record(problem, PROBLEM_SCHEMA)
             backend_problem = {
                 "id": problem["id"],
                 "title": problem["title"],
@@ -89,9 +448,9 @@ class IntegrationManager:
                 "tags": problem["tags"],
                 "status": "published",
                 "created_by": "1",
-                "created_at": "new Date()",
-                "updated_at": "new Date()",
-                "published_at": "new Date()"
+                "created_at": TS_NEW_DATE,
+                "updated_at": TS_NEW_DATE,
+                "published_at": TS_NEW_DATE
             }
             backend_problems.append(backend_problem)
         
@@ -103,6 +462,7 @@ class IntegrationManager:
         
         for solution in solutions:
             if solution.get("code"):  # Only include solutions with actual code
+                solution = repair_record(solution, SOLUTION_SCHEMA)
                 backend_solution = {
                     "id": solution["id"],
                     "problem_id": solution["problem_id"],
@@ -114,8 +474,8 @@ class IntegrationManager:
                     "time_complexity": solution.get("time_complexity", ""),
                     "space_complexity": solution.get("space_complexity", ""),
                     "created_by": "1",
-                    "created_at": "new Date()",
-                    "updated_at": "new Date()"
+                    "created_at": TS_NEW_DATE,
+                    "updated_at": TS_NEW_DATE
                 }
                 backend_solutions.append(backend_solution)
         
@@ -126,6 +486,7 @@ class IntegrationManager:
         frontend_questions = []
         
         for problem in problems:
+            problem = repair_record(problem, PROBLEM_SCHEMA)
             frontend_question = {
                 "id": problem["id"],
                 "title": problem["title"],
@@ -134,62 +495,18 @@ class IntegrationManager:
                 "description": problem["description"],
                 "difficulty": problem["difficulty"],
                 "company": problem["company"],
-                "tags": problem["tags"]
+                "tags": problem["tags"],
+                # Required by the frontend's Question type
+                "examples": [
+                    {key: str(example.get(key, "")) for key in ("input", "output", "explanation")}
+                    for example in problem["examples"]
+                ],
+                "testCases": []
             }
             frontend_questions.append(frontend_question)
         
         return frontend_questions
     
-    def _update_backend_content(self, content, new_problems, new_solutions):
-        """Update backend TypeScript content"""
-        # This is a simplified approach - in practice, you'd want to parse and modify the TypeScript AST
-        # For now, we'll append to the existing arrays
-        
-        # Add new problems to mockProblems array
-        problems_ts = ",\n  ".join([self._dict_to_ts_object(p) for p in new_problems])
-        
-        # Add new solutions (we'll add them as a new mockSolutions array)
-        solutions_ts = ",\n  ".join([self._dict_to_ts_object(s) for s in new_solutions])
-        
-        # Insert before the closing bracket of mockProblems
-        if "];" in content:
-            content = content.replace("];", f",\n  {problems_ts}\n];")
-        
-        # Add mockSolutions export if it doesn't exist
-        if "export const mockSolutions" not in content:
-            solutions_export = f"\n\nexport const mockSolutions = [\n  {solutions_ts}\n];"
-            content += solutions_export
-        
-        return content
-    
-    def _update_frontend_content(self, content, new_questions):
-        """Update frontend TypeScript content"""
-        # Convert questions to TypeScript format
-        questions_ts = ",\n  ".join([self._dict_to_ts_object(q) for q in new_questions])
-        
-        # Insert before the closing bracket of sampleQuestions
-        if "];" in content:
-            content = content.replace("];", f",\n  {questions_ts}\n];")
-        
-        return content
-    
-    def _dict_to_ts_object(self, obj):
-        """Convert Python dict to TypeScript object string"""
-        ts_parts = []
-        for key, value in obj.items():
-            if isinstance(value, str):
-                ts_parts.append(f'    {key}: "{value}"')
-            elif isinstance(value, list):
-                if all(isinstance(item, str) for item in value):
-                    items = ", ".join([f'"{item}"' for item in value])
-                    ts_parts.append(f'    {key}: [{items}]')
-                else:
-                    ts_parts.append(f'    {key}: {json.dumps(value)}')
-            else:
-                ts_parts.append(f'    {key}: {json.dumps(value)}')
-        
-        return "{\n" + ",\n".join(ts_parts) + "\n  }"
-    
     def run_integration(self):
         """Run complete integration"""
         print("🚀 Starting integration with backend and frontend...")
@@ -199,11 +516,11 @@ class IntegrationManager:
         stats = self.data_manager.get_statistics()
         print(f"📊 Current data: {stats['total_problems']} problems, {stats['total_solutions']} solutions")
         
-        # Integrate with backend
-        self.integrate_with_backend()
-        
-        # Integrate with frontend
-        self.integrate_with_frontend()
+        # Build backend and frontend targets together and publish them as one generation
+        print("🔄 Integrating with backend and frontend...")
+        if self.publish() is None:
+            print("\n❌ Integration failed; the previously published files are unchanged")
+            return
         
         print("\n✅ Integration completed!")
         print("🎯 Next steps:")
@@ -211,9 +528,245 @@ class IntegrationManager:
         print("   2. Start the frontend development server")
         print("   3. Test the integration")
 
+class IntegrationWatcher:
+    """Keeps the published files in step with the store and an inbox of model responses.
+    
+    Each poll hands newly settled inbox files to a process pool for parsing
+    and validation, and commits the finished results as one group: a single
+    `save_records` for however many files arrived together, less records
+    already stored under the same ID or content. This is where pasted
+    responses reach the store, so new problems also get the near-duplicate
+    check that manual generation skips for its placeholders. It then
+    compares the store version with the one last published. A new version,
+    whether from this commit or from another writer such as `main.py
+    generate`, gets a fresh IntegrationManager whose manifests rebuild only
+    the records and targets that changed; versions written by others are
+    published once they stop moving.
+    """
+    
+    def __init__(self, data_manager: Optional[DataManager] = None, inbox_dir: Optional[str] = None,
+                 interval: float = 0.5, batch_window: float = 1.0, batch_size: int = 1000,
+                 workers: Optional[int] = None, precompress: bool = True, on_duplicate: str = "reject"):
+        self.data_manager = data_manager or DataManager()
+        self.inbox = Inbox(inbox_dir or os.path.join(self.data_manager.data_dir, INBOX_DIR))
+        self.interval = interval
+        self.batch_window = batch_window
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.precompress = precompress
+        self.on_duplicate = on_duplicate
+        self.stats = {"files": 0, "problems": 0, "solutions": 0, "skipped": 0, "rejected": 0, "generations": 0}
+        self._stop = threading.Event()
+        self._in_flight: Dict[Future, str] = {}
+        # Files parsing or parsed but not yet moved out of the inbox
+        self._picked_up: Set[str] = set()
+        self._batch: List[Dict] = []
+        self._batch_started = 0.0
+        self._seen_version = None
+        self._published_version = None
+        self._committed_version = None
+        self._dedup: Optional[Deduplicator] = None
+        self._retry_at = 0.0
+    
+    def run(self, once: bool = False) -> Dict:
+        """Watch until stopped or interrupted; with `once`, handle what is there now, publish and return"""
+        if once:
+            print(f"📥 Processing {self.inbox.directory}")
+        else:
+            print(f"👀 Watching {self.inbox.directory} and the store with {self.workers} workers (Ctrl+C to stop)")
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=ignore_interrupts) as executor:
+            try:
+                while not self._stop.is_set():
+                    try:
+                        picked_up = self._poll(executor, settle=0.0 if once else SETTLE_SECONDS)
+                    except Exception as e:
+                        # Files of a batch that failed stay in the inbox and are picked up again
+                        picked_up = 0
+                        print(f"❌ Watch cycle failed: {e}")
+                        log_event("watch_failed", error=str(e))
+                    if once and not picked_up and not self._in_flight:
+                        break
+                    self._stop.wait(self.interval)
+            except KeyboardInterrupt:
+                print("\n🛑 Stopping; finishing the files already picked up...")
+            try:
+                self._drain()
+            except Exception as e:
+                print(f"❌ Final commit failed; its files stay in the inbox: {e}")
+        return self.stats
+    
+    def stop(self):
+        self._stop.set()
+    
+    def _poll(self, executor: ProcessPoolExecutor, settle: float) -> int:
+        """One pass: pick up new files, commit a due batch, publish a new store version"""
+        pending = self.inbox.pending(exclude=self._picked_up, settle=settle)
+        for path in pending:
+            self._picked_up.add(path)
+            self._in_flight[executor.submit(parse_file, path)] = path
+        self._collect([future for future in self._in_flight if future.done()])
+        
+        records = sum(len(result["problems"]) + len(result["solutions"]) for result in self._batch)
+        if self._batch and (not self._in_flight or records >= self.batch_size
+                            or time.monotonic() - self._batch_started >= self.batch_window):
+            self._commit()
+        self._publish_if_changed()
+        return len(pending)
+    
+    def _collect(self, futures: List[Future]):
+        for future in futures:
+            path = self._in_flight.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"path": path, "problems": [], "solutions": [], "errors": [f"{os.path.basename(path)}: {e}"]}
+            if not self._batch:
+                self._batch_started = time.monotonic()
+            self._batch.append(result)
+    
+    def _commit(self):
+        """Store a batch's new records with one bulk write, then move its files out of the inbox"""
+        batch, self._batch = self._batch, []
+        timer = Stopwatch()
+        # Kept between batches while nobody else writes the store
+        if self._dedup is None or self.data_manager.get_store_version() != self._committed_version:
+            self._dedup = Deduplicator(self.data_manager.get_read_index())
+        
+        problems, solutions, skipped = [], [], 0
+        # Near-duplicates within this batch are not in the store's index yet
+        batch_index = MinHashLSH()
+        for result in batch:
+            for problem in result["problems"]:
+                signature, near_duplicate = None, None
+                if self.on_duplicate != "off" and self._dedup.check_problem(problem) is None:
+                    signature = batch_index.signature(problem_text(problem))
+                    near_duplicate = self._near_duplicate(problem, batch_index.query(signature))
+                if near_duplicate:
+                    result["errors"].append(near_duplicate)
+                elif self._dedup.add_problem(problem) is None:
+                    if signature is not None:
+                        batch_index.add(problem["id"], signature)
+                    problems.append(problem)
+                else:
+                    skipped += 1
+        for result in batch:
+            for solution in result["solutions"]:
+                reason = self._dedup.add_solution(solution)
+                if reason is None:
+                    solutions.append(solution)
+                elif reason == "orphan":
+                    result["errors"].append(f"solution {solution['id']}: unknown problem {solution['problem_id']}")
+                else:
+                    skipped += 1
+        
+        if problems or solutions:
+            try:
+                self.data_manager.save_records(problems, solutions)
+            except Exception:
+                # It already counts these records as stored
+                self._dedup = None
+                self._picked_up.difference_update(result["path"] for result in batch)
+                raise
+        self._committed_version = self.data_manager.get_store_version()
+        
+        rejected = 0
+        for result in batch:
+            rejected += len(result["errors"])
+            try:
+                destination = self.inbox.finish(result["path"], result["errors"])
+            except OSError as e:
+                print(f"⚠️  Could not move {result['path']} out of the inbox: {e}")
+                continue
+            finally:
+                self._picked_up.discard(result["path"])
+            if result["errors"]:
+                print(f"⚠️  {os.path.basename(result['path'])}: {len(result['errors'])} items rejected, see {destination}.errors.txt")
+        
+        for key, value in (("files", len(batch)), ("problems", len(problems)), ("solutions", len(solutions)),
+                           ("skipped", skipped), ("rejected", rejected)):
+            self.stats[key] += value
+        log_event("inbox_committed", files=len(batch), problems=len(problems), solutions=len(solutions),
+                  skipped=skipped, rejected=rejected, ms=timer.ms)
+        print(f"📥 Committed {len(problems)} problems and {len(solutions)} solutions from {len(batch)} files "
+              f"({skipped} already stored, {rejected} rejected) in {timer.ms:.0f}ms")
+    
+    def _near_duplicate(self, problem: Dict, batch_matches: List[Tuple[str, float]]) -> Optional[str]:
+        """Why a new problem is rejected as nearly matching a stored or earlier batched one; flags it if configured"""
+        matches = self.data_manager.find_near_duplicates(problem)
+        matches.extend({"id": key, "similarity": round(similarity, 3)} for key, similarity in batch_matches)
+        if not matches:
+            return None
+        best = max(matches, key=lambda match: match["similarity"])
+        log_event("duplicate_rejected" if self.on_duplicate == "reject" else "duplicate_flagged",
+                  topic=problem.get("topic"), duplicate_of=best["id"], similarity=best["similarity"])
+        if self.on_duplicate == "reject":
+            return f"problem {problem['id']}: near-duplicate of {best['id']} (similarity {best['similarity']:.2f})"
+        problem["near_duplicate_of"] = best["id"]
+        return None
+    
+    def _publish_if_changed(self, settled: bool = False):
+        version = self.data_manager.get_store_version()
+        seen, self._seen_version = self._seen_version, version
+        if version == self._published_version or time.monotonic() < self._retry_at:
+            return
+        # Another writer may still be mid-way through a problem and its solutions
+        if not settled and version != seen and version != self._committed_version:
+            return
+        
+        timer = Stopwatch()
+        generation = IntegrationManager(self.data_manager, precompress=self.precompress).publish()
+        if generation is None:
+            self._retry_at = time.monotonic() + PUBLISH_RETRY_SECONDS
+            print(f"⚠️  Publish failed; retrying in {PUBLISH_RETRY_SECONDS:.0f}s or on the next change")
+            return
+        self._published_version = version
+        self._retry_at = 0.0
+        self.stats["generations"] += 1
+        log_event("watch_published", generation=generation, ms=timer.ms)
+    
+    def _drain(self):
+        """Finish the files in flight, commit them and publish"""
+        self._collect(list(self._in_flight))
+        if self._batch:
+            self._commit()
+        self._publish_if_changed(settled=True)
+
+def _write_json_atomic(path: str, data):
+    temp_file = f"{path}.{os.getpid()}.tmp"
+    with open(temp_file, 'w', encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(temp_file, path)
+
 def main():
     """Main integration function"""
-    integrator = IntegrationManager()
+    parser = argparse.ArgumentParser(description="Integrate generated problems with the backend and frontend")
+    parser.add_argument('command', nargs='?', choices=['run', 'watch'], default='run',
+                        help='run: publish once (default); watch: keep publishing as the store and inbox change')
+    parser.add_argument('--force', action='store_true', help='Rewrite every generated module even if unchanged')
+    parser.add_argument('--no-precompress', dest='precompress', action='store_false',
+                        help='Skip writing .gz/.br copies of the generated files')
+    watch_options = parser.add_argument_group('watch options')
+    watch_options.add_argument('--inbox', help=f'Directory model responses are dropped into (default: data/{INBOX_DIR})')
+    watch_options.add_argument('--interval', type=float, default=0.5, help='Seconds between inbox and store checks')
+    watch_options.add_argument('--batch-window', type=float, default=1.0,
+                               help='Longest a parsed file waits for others to commit with')
+    watch_options.add_argument('--batch-size', type=int, default=1000, help='Records that commit a batch early')
+    watch_options.add_argument('--workers', type=int, help='Parser processes (default: CPU count)')
+    watch_options.add_argument('--on-duplicate', choices=['reject', 'flag', 'off'], default='reject',
+                               help='What to do with a dropped problem that nearly matches a stored one')
+    watch_options.add_argument('--once', action='store_true', help='Handle the current inbox, publish and exit')
+    args = parser.parse_args()
+    
+    if args.command == 'watch':
+        watcher = IntegrationWatcher(inbox_dir=args.inbox, interval=args.interval, batch_window=args.batch_window,
+                                     batch_size=args.batch_size, workers=args.workers, precompress=args.precompress,
+                                     on_duplicate=args.on_duplicate)
+        signal.signal(signal.SIGTERM, lambda *_: watcher.stop())
+        stats = watcher.run(once=args.once)
+        print(f"\n📊 Watch: {stats}")
+        return
+    
+    integrator = IntegrationManager(force=args.force, precompress=args.precompress)
     integrator.run_integration()
 
 if __name__ == "__main__":
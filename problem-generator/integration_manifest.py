@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Integration Manifest for ML/AI Problem Generation System
+Tracks what each generated frontend/backend module was built from
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+MANIFEST_FILE = "integration_manifest.json"
+
+def content_hash(record: Dict) -> str:
+    """Stable hash of a converted record's content"""
+    canonical = json.dumps(record, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+def file_stamp(path: str) -> Optional[List[int]]:
+    """[mtime_ns, size] of a file, or None when it does not exist"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+class IntegrationManifest:
+    """Per-target record hashes plus the store and output stamps they were built from.
+    
+    A target is fresh when the store files, its generated module and the
+    fixed text written around the records (the template fingerprint) are
+    exactly as they were at the last run, which is checked with a few stat
+    calls and no reads. Otherwise the converted records are hashed and only
+    a real added/changed/removed difference causes the module to be rewritten.
+    """
+    
+    def __init__(self, manifest_file: str):
+        self.manifest_file = manifest_file
+        self.data = self._load()
+    
+    def target(self, name: str) -> Dict:
+        return self.data["targets"].get(name) or {"records": {}, "order": [], "store": None, "file": None}
+    
+    def is_fresh(self, name: str, store_stamp: List, output_file: str, template: Optional[str] = None) -> bool:
+        entry = self.data["targets"].get(name)
+        return (entry is not None and entry["store"] == store_stamp and entry.get("template") == template
+                and entry["file"] is not None and entry["file"] == file_stamp(output_file))
+    
+    def diff(self, name: str, records: List[Dict]) -> Dict:
+        """Added, changed and removed record IDs against the last run, with the new hashes and order"""
+        previous = self.target(name)["records"]
+        hashes = {}
+        order = []
+        added, changed = [], []
+        for record in records:
+            record_id = record["id"]
+            digest = content_hash(record)
+            hashes[record_id] = digest
+            order.append(record_id)
+            old = previous.get(record_id)
+            if old is None:
+                added.append(record_id)
+            elif old != digest:
+                changed.append(record_id)
+        removed = [record_id for record_id in previous if record_id not in hashes]
+        return {"added": added, "changed": changed, "removed": removed, "hashes": hashes, "order": order}
+    
+    def is_unchanged(self, name: str, diff: Dict, output_file: str, template: Optional[str] = None) -> bool:
+        """True when the diff is empty and the module on disk is the one last written"""
+        entry = self.target(name)
+        return (not (diff["added"] or diff["changed"] or diff["removed"])
+                and diff["order"] == entry["order"] and entry.get("template") == template
+                and entry["file"] is not None and entry["file"] == file_stamp(output_file))
+    
+    def update(self, name: str, diff: Dict, store_stamp: List, output_file: str, template: Optional[str] = None):
+        self.data["targets"][name] = {
+            "records": diff["hashes"],
+            "order": diff["order"],
+            "store": store_stamp,
+            "file": file_stamp(output_file),
+            "template": template
+        }
+    
+    def touch(self, name: str, store_stamp: List):
+        """Record that the target matches a new store state without being rewritten"""
+        entry = self.data["targets"].get(name)
+        if entry is not None:
+            entry["store"] = store_stamp
+    
+    def restamp(self, name: str, output_file: str):
+        """Record the output's current stamp after a change that leaves its records as they were"""
+        entry = self.data["targets"].get(name)
+        if entry is not None:
+            entry["file"] = file_stamp(output_file)
+    
+    def save(self):
+        directory = os.path.dirname(self.manifest_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_file = self.manifest_file + ".tmp"
+        with open(temp_file, 'w') as f:
+            json.dump(self.data, f, separators=(",", ":"))
+        os.replace(temp_file, self.manifest_file)
+    
+    def _load(self) -> Dict:
+        try:
+            with open(self.manifest_file, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+        data.setdefault("targets", {})
+        return data
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Generation Ledger for ML/AI Problem Generation System
+Append-only record of every generation call's tokens, latency and outcome
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+LEDGER_FILE = "generation_ledger.jsonl"
+
+# Dimensions the throughput report can group by
+GROUPINGS = ("topic", "stage", "provider", "day")
+
+class GenerationLedger:
+    """One compact JSON line per generation call, next to generation_metadata.json.
+    
+    Each line is written with a single O_APPEND write, so batch workers in
+    other processes can share the file without a lock. A call served without
+    a model request (e.g. a locally derived practice skeleton) is a cache hit.
+    Token counts are estimates from the prompt and response text.
+    """
+    
+    def __init__(self, data_dir: str = "data"):
+        self.ledger_file = os.path.join(data_dir, LEDGER_FILE)
+        os.makedirs(data_dir, exist_ok=True)
+    
+    def record(self, topic: str, stage: str, provider: str, prompt_tokens: int, completion_tokens: int,
+               latency_ms: float, cache_hit: bool = False, retries: int = 0, outcome: str = "ok",
+               error: Optional[str] = None):
+        entry = {
+            "ts": round(time.time(), 3),
+            "topic": topic,
+            "stage": stage,
+            "provider": provider,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "ms": round(latency_ms, 1),
+            "cache": int(cache_hit),
+            "retries": retries,
+            "outcome": outcome
+        }
+        if error:
+            entry["error"] = error
+        line = (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+        fd = os.open(self.ledger_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+    
+    def read(self) -> Iterator[Dict]:
+        """Ledger records in order, skipping any torn or malformed lines"""
+        try:
+            with open(self.ledger_file, 'r') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+        except FileNotFoundError:
+            return
+
+def throughput_report(records: Iterable[Dict], by: str) -> List[Dict]:
+    """Aggregate ledger records by one of GROUPINGS, most total latency first.
+    
+    Records per minute are measured over the wall-clock window the group's
+    calls span, from the start of the first to the end of the last.
+    """
+    if by not in GROUPINGS:
+        raise ValueError(f"Unknown grouping '{by}'. Available: {', '.join(GROUPINGS)}")
+    groups = {}
+    for record in records:
+        if by == "day":
+            key = datetime.fromtimestamp(record["ts"]).strftime("%Y-%m-%d")
+        else:
+            key = record.get(by) or "unknown"
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                "key": key, "records": 0, "ok": 0, "cache_hits": 0, "retries": 0,
+                "prompt_tokens": 0, "completion_tokens": 0, "total_ms": 0.0,
+                "first": float("inf"), "last": 0.0
+            }
+        group["records"] += 1
+        group["ok"] += record.get("outcome") == "ok"
+        group["cache_hits"] += record.get("cache", 0)
+        group["retries"] += record.get("retries", 0)
+        group["prompt_tokens"] += record.get("prompt_tokens", 0)
+        group["completion_tokens"] += record.get("completion_tokens", 0)
+        group["total_ms"] += record.get("ms", 0.0)
+        group["first"] = min(group["first"], record["ts"] - record.get("ms", 0.0) / 1000.0)
+        group["last"] = max(group["last"], record["ts"])
+    
+    rows = []
+    for group in groups.values():
+        count = group["records"]
+        minutes = max(group["last"] - group["first"], 1e-3) / 60.0
+        rows.append(dict(
+            group,
+            records_per_minute=count / minutes,
+            tokens_per_record=(group["prompt_tokens"] + group["completion_tokens"]) / count,
+            cache_hit_rate=group["cache_hits"] / count,
+            success_rate=group["ok"] / count,
+            mean_ms=group["total_ms"] / count
+        ))
+    return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
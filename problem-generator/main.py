@@ -6,8 +6,28 @@ Main execution script for ML/AI Problem Generation System
 import argparse
 import sys
 import os
+import multiprocessing
+import queue
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+import batch_jobs
+from coverage_planner import DEFAULT_CELL_TARGET, CoveragePlanner, summarize_plan
+from data_manager import DataManager
+from ingest import expand_sources, ingest_files
+from dedup_index import DuplicateProblemError
+from ledger import GenerationLedger
+from metrics import REGISTRY, TOPICS, record_cache, start_exporters, stop_exporters
+from events import PromptArchive, Stopwatch, log_event, open_event_log
+from tracing import current_tracer, start_tracing, stop_tracing
 from ml_problem_generator import MLProblemGenerator
 from config.ml_topics_config import MLTopicsConfig
+from problem_inventory import DEFAULT_TARGET, InventoryRefiller, ProblemInventory
+from providers import get_provider
+from scheduler import PRIORITY_BATCH, PRIORITY_INTERACTIVE, GenerationScheduler
+from generation_client import DEFAULT_STAGE_TIMEOUTS, GenerationClient
 
 def list_topics(args):
     """List available LLM implementation topics"""
@@ -39,9 +59,45 @@ def list_topics(args):
         else:
             print(f"{i:2d}. {topic}")
 
+def _generator_options(args, share=1):
+    """Provider and rate-limit settings, split evenly across `share` processes"""
+    return {
+        "provider": args.provider,
+        "requests_per_minute": args.rpm / share if args.rpm else None,
+        "tokens_per_minute": args.tpm / share if args.tpm else None,
+        "max_concurrency": args.max_concurrency,
+        "hedge": args.hedge,
+        "timeout": args.timeout,
+        "on_duplicate": args.on_duplicate,
+        "local_practice": args.local_practice,
+        "quiet": getattr(args, "quiet", False),
+        "prompts_dir": getattr(args, "prompts_dir", None),
+        "metrics_port": getattr(args, "metrics_port", None),
+        "metrics_file": getattr(args, "metrics_file", None)
+    }
+
+def _build_generator(options, priority=PRIORITY_BATCH, data_dir="data", duplicate_stores=None, ledger=None):
+    """Create a generator, with a rate-limited scheduler when a provider is configured"""
+    provider = get_provider(options["provider"])
+    client = None
+    if provider:
+        scheduler = GenerationScheduler(
+            provider,
+            requests_per_minute=options["requests_per_minute"],
+            tokens_per_minute=options["tokens_per_minute"],
+            max_concurrency=options["max_concurrency"]
+        )
+        stage_timeouts = dict.fromkeys(DEFAULT_STAGE_TIMEOUTS, options["timeout"]) if options["timeout"] else None
+        client = GenerationClient(scheduler, stage_timeouts=stage_timeouts, hedge=options["hedge"])
+    return MLProblemGenerator(data_dir=data_dir, client=client, priority=priority,
+                              on_duplicate=options["on_duplicate"], duplicate_stores=duplicate_stores,
+                              local_practice=options["local_practice"], quiet=options["quiet"],
+                              prompt_archive=PromptArchive(options["prompts_dir"]) if options["prompts_dir"] else None,
+                              ledger=ledger)
+
 def generate_problem(args):
     """Generate a problem for a specific topic"""
-    generator = MLProblemGenerator()
+    generator = _build_generator(_generator_options(args), priority=PRIORITY_INTERACTIVE)
     
     # Validate topic exists
     all_topics = generator.topics_config.get_all_topics()
@@ -50,52 +106,434 @@ def generate_problem(args):
         print(f"Available topics: {', '.join(all_topics[:10])}...")
         return
     
+    if args.inventory and _serve_from_inventory(generator, args):
+        return
+    
     print(f"🚀 Generating problem for: {args.topic}")
     print("=" * 60)
     
     # Generate problem
-    problem = generator.generate_problem(args.topic)
+    try:
+        problem = generator.generate_problem(args.topic)
+    except DuplicateProblemError as e:
+        print(f"❌ {e}")
+        print("   Use --on-duplicate flag to keep it anyway")
+        if generator.scheduler:
+            generator.scheduler.shutdown()
+        return
     
     # Generate solutions
     full_solution = generator.generate_full_solution(problem)
-    practice_solution = generator.generate_practice_solution(problem)
+    practice_solution = generator.generate_practice_solution(problem, full_solution)
     
     # Integrate to database
     generator.integrate_to_database(problem, full_solution, practice_solution)
+    if generator.scheduler:
+        generator.scheduler.shutdown()
     
     print(f"\n✅ Successfully generated problem: {problem['title']}")
 
+def _serve_from_inventory(generator, args):
+    """Integrate a ready problem from the inventory; returns False when none is stocked"""
+    inventory = ProblemInventory(generator.data_manager.data_dir)
+    while True:
+        entry = inventory.take(args.topic, args.difficulty)
+        record_cache("inventory", entry is not None)
+        if entry is None:
+            print(f"📭 No ready problem for '{args.topic}' in the inventory, generating one now")
+            return False
+        try:
+            generator.check_duplicate(entry["problem"])
+        except DuplicateProblemError as e:
+            print(f"♻️  Discarding stale inventory entry: {e}")
+            continue
+        break
+    
+    print(f"⚡ Serving '{entry['problem']['title']}' from the inventory")
+    generator.integrate_to_database(entry["problem"], entry["full_solution"], entry["practice_solution"])
+    if generator.scheduler:
+        generator.scheduler.shutdown()
+    return True
+
+def manage_inventory(args):
+    """Show or refill the pre-generated problem inventory"""
+    generator = _build_generator(_generator_options(args))
+    inventory = ProblemInventory(generator.data_manager.data_dir, target=args.target)
+    topics = _resolve_topics(generator, args) or generator.topics_config.get_all_topics()
+    
+    if args.action == "status":
+        counts = inventory.counts()
+        print(f"\n📦 Inventory: {sum(counts.values())} ready problems (target {args.target} per topic/difficulty)")
+        for (topic, difficulty), count in sorted(counts.items()):
+            print(f"   {topic} [{difficulty}]: {count}")
+        plan = inventory.refill_plan(topics)
+        print(f"\n🔧 {sum(row[3] for row in plan)} problems needed; most urgent:")
+        for priority, topic, difficulty, missing in plan[:10]:
+            print(f"   {topic} [{difficulty}]: {missing} missing (priority {priority:.1f})")
+        return
+    
+    try:
+        refiller = InventoryRefiller(generator, inventory, topics, interval=args.interval)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    if args.watch:
+        print(f"🔁 Refilling inventory for {len(topics)} topics (Ctrl+C to stop)")
+        refiller.start()
+        try:
+            while True:
+                refiller.join(timeout=1.0)
+        except KeyboardInterrupt:
+            refiller.stop(wait=False)
+    else:
+        refiller.refill_once()
+    print(f"\n📦 Refill: {refiller.stats}")
+    generator.scheduler.shutdown(wait=not args.watch)
+
 def generate_batch(args):
     """Generate problems for multiple topics"""
-    generator = MLProblemGenerator()
+    generator = MLProblemGenerator(on_duplicate=args.on_duplicate, local_practice=args.local_practice)
+    options = _generator_options(args)
     
-    if args.topics:
-        topics = [t.strip() for t in args.topics.split(',')]
-    elif args.category:
-        topics = generator.topics_config.get_topics_by_category(args.category)
-    elif args.company:
-        topics = generator.topics_config.get_company_topics(args.company)
-    else:
+    if args.import_results:
+        _import_batch_results(generator, args)
+        return
+    
+    topics = _resolve_topics(generator, args)
+    if args.plan:
+        topics = _plan_coverage(generator, topics or generator.topics_config.get_all_topics(), args)
+        if not topics or args.dry_run:
+            return
+    elif not topics:
         print("❌ Error: Please specify topics, category, or company")
         return
     
+    if args.export_jobs:
+        count = batch_jobs.export_problem_jobs(generator, topics, args.export_jobs)
+        print(f"📦 Exported {count} problem jobs to {args.export_jobs}")
+        _print_prompt_report(generator)
+        print(f"   Run them offline, then: python main.py batch --import-results <results.jsonl>")
+        return
+    
     print(f"🚀 Generating problems for {len(topics)} topics...")
     print("=" * 60)
     
-    for i, topic in enumerate(topics, 1):
-        print(f"\n📝 [{i}/{len(topics)}] Generating problem for: {topic}")
+    event_log = open_event_log(args.events)
+    log_event("batch_started", topics=len(topics), workers=args.workers, provider=args.provider)
+    timer = Stopwatch()
+    progress = _ProgressBar(len(topics)) if args.quiet else None
+    
+    workers = min(args.workers, len(topics))
+    if workers > 1:
+        completed = _generate_batch_parallel(generator, topics, workers, _generator_options(args, share=workers),
+                                             progress=progress, event_log=event_log)
+    else:
+        generator = _build_generator(options)
+        completed = _generate_topics(generator, topics, progress=progress)
+        if progress:
+            progress.close()
+        _print_prompt_report(generator)
+        if generator.scheduler:
+            _print_client_summary(generator.client)
+            generator.scheduler.shutdown()
+    
+    log_event("batch_finished", topics=len(topics), completed=completed, ms=timer.ms)
+    if event_log:
+        event_log.close()
+        print(f"🧾 Events written to {args.events}")
+    if args.prompts_dir:
+        print(f"🗂️  Prompts written to {args.prompts_dir}")
+    print(f"\n🎉 Batch generation completed! Processed {len(topics)} topics.")
+
+def _plan_coverage(generator, topics, args):
+    """Planned generations that fill the coverage gaps for the selected topics"""
+    planner = CoveragePlanner(generator.topics_config, target=args.cell_target)
+    counts = generator.data_manager.get_coverage_counts()
+    gaps = planner.gaps(topics, counts)
+    plan = planner.plan(topics, counts, limit=args.limit)
+    
+    cells = len(planner.target_cells(topics))
+    print(f"🧭 Coverage: {cells - len(gaps)}/{cells} cells at target {args.cell_target}; "
+          f"{sum(gaps.values())} generations needed, {len(plan)} planned")
+    if not plan:
+        print("✅ Every cell is already covered")
+    elif args.dry_run:
+        for item in plan:
+            print(f"   {item.topic} [{item.difficulty}, {item.company}]")
+    else:
+        for topic, count in list(summarize_plan(plan).items())[:10]:
+            print(f"   {topic}: {count}")
+    return plan
+
+def _resolve_topics(generator, args):
+    """Topics selected by --topics, --category or --company"""
+    if args.topics:
+        return [t.strip() for t in args.topics.split(',')]
+    if args.category:
+        return generator.topics_config.get_topics_by_category(args.category)
+    if args.company:
+        return generator.topics_config.get_company_topics(args.company)
+    return []
+
+def _import_batch_results(generator, args):
+    """Bulk-import offline results and export the next round of solution jobs"""
+    started = time.perf_counter()
+    summary = batch_jobs.import_results(generator, args.import_results, args.export_jobs)
+    elapsed = time.perf_counter() - started
+    
+    total = summary["problems"] + summary["solutions"] + summary["rejected"]
+    print(f"📥 Imported {summary['problems']} problems and {summary['solutions']} solutions "
+          f"in {elapsed:.2f}s ({total / max(elapsed, 1e-9):.0f} records/s)")
+    if summary["rejected"]:
+        print(f"⚠️  Rejected {summary['rejected']} responses (see {summary['rejects_file']})")
+    if summary.get("solution_jobs"):
+        print(f"📦 Exported {summary['solution_jobs']} solution jobs to {summary['solution_jobs_file']}")
+        _print_prompt_report(generator)
+
+def _generate_topic(generator, item, label):
+    """Generate, solve and integrate a topic or planned cell; returns True on success"""
+    topic, difficulty, company = (item, None, None) if isinstance(item, str) else item
+    cell = f" [{difficulty}, {company}]" if difficulty or company else ""
+    if not generator.quiet:
+        print(f"\n📝 {label}Generating problem for: {topic}{cell}")
         print("-" * 40)
-        
-        try:
-            problem = generator.generate_problem(topic)
-            full_solution = generator.generate_full_solution(problem)
-            practice_solution = generator.generate_practice_solution(problem)
-            generator.integrate_to_database(problem, full_solution, practice_solution)
+    
+    timer = Stopwatch()
+    try:
+        problem = generator.generate_problem(topic, difficulty, company)
+        full_solution = generator.generate_full_solution(problem)
+        practice_solution = generator.generate_practice_solution(problem, full_solution)
+        generator.integrate_to_database(problem, full_solution, practice_solution)
+        log_event("topic_completed", topic=topic, difficulty=difficulty, company=company,
+                  problem_id=problem["id"], ms=timer.ms)
+        TOPICS.inc(outcome="ok")
+        if not generator.quiet:
             print(f"✅ Completed: {problem['title']}")
-        except Exception as e:
+        return True
+    except Exception as e:
+        log_event("topic_failed", topic=topic, difficulty=difficulty, company=company,
+                  error=f"{type(e).__name__}: {e}", ms=timer.ms)
+        TOPICS.inc(outcome="failed")
+        if not generator.quiet:
             print(f"❌ Error generating problem for {topic}: {e}")
+        return False
+
+def _generate_topics(generator, topics, label="", progress=None):
+    """Run the generate/solve/integrate loop for a list of topics"""
+    labels = [f"{label}[{i}/{len(topics)}] " for i in range(1, len(topics) + 1)]
     
-    print(f"\n🎉 Batch generation completed! Processed {len(topics)} topics.")
+    def run(pair):
+        ok = _generate_topic(generator, *pair)
+        if progress:
+            progress.update(ok)
+        return ok
+    
+    if not generator.scheduler:
+        return sum(run(pair) for pair in zip(topics, labels))
+    
+    # With a scheduler, keep enough topics in flight to use every concurrency slot
+    with ThreadPoolExecutor(max_workers=generator.scheduler.concurrency.maximum) as executor:
+        return sum(executor.map(run, zip(topics, labels)))
+
+class _ProgressBar:
+    """One-line progress for quiet batch runs, redrawn at most ten times a second"""
+    
+    def __init__(self, total, width=30, stream=sys.stderr):
+        self.total = total
+        self.width = width
+        self.stream = stream
+        self.ok = 0
+        self.failed = 0
+        self._started = time.monotonic()
+        self._drawn = 0.0
+        self._drawn_counts = None
+        self._lock = threading.Lock()
+    
+    def update(self, ok):
+        with self._lock:
+            if ok:
+                self.ok += 1
+            else:
+                self.failed += 1
+            now = time.monotonic()
+            if now - self._drawn >= 0.1 or self.ok + self.failed == self.total:
+                self._draw(now)
+    
+    def close(self):
+        with self._lock:
+            # update() already drew the final line when the last topic finished
+            if self._drawn_counts != (self.ok, self.failed):
+                self._draw()
+            self.stream.write("\n")
+            self.stream.flush()
+    
+    def _draw(self, now=None):
+        now = now or time.monotonic()
+        self._drawn = now
+        self._drawn_counts = (self.ok, self.failed)
+        done = self.ok + self.failed
+        filled = int(self.width * done / self.total) if self.total else self.width
+        rate = done / max(now - self._started, 1e-9)
+        eta = f"{(self.total - done) / rate:.0f}s" if rate and done < self.total else "-"
+        self.stream.write(f"\r[{'#' * filled}{'.' * (self.width - filled)}] {done}/{self.total} "
+                          f"ok={self.ok} failed={self.failed} {rate:.1f}/s eta {eta}  ")
+        self.stream.flush()
+
+def _print_client_summary(client):
+    """Print scheduler/client counters and the slowest topic stages"""
+    print(f"\n📈 Scheduler: {client.scheduler.snapshot()}")
+    print(f"⏱️  Client: {client.stats}")
+    for row in [r for r in client.latency_report() if r["topic"] != "*"][:5]:
+        print(f"   {row['topic']} / {row['stage']}: n={row['count']} "
+              f"p50={row['p50']:.2f}s p95={row['p95']:.2f}s max={row['max']:.2f}s")
+
+def _print_prompt_report(generator):
+    """Print prompt sizes per stage against their budgets"""
+    rows = generator.prompt_packer.report.rows()
+    if not rows:
+        return
+    print("\n📏 Prompt sizes (estimated tokens):")
+    for row in rows:
+        budget = generator.prompt_packer.budgets.get(row["stage"])
+        print(f"   {row['stage']}: n={row['prompts']} mean={row['mean']:.0f} max={row['max']} "
+              f"budget={budget} saved={row['saved_percent']:.0f}% trimmed={row['trimmed']}")
+
+def _run_batch_shard(shard_dir, topics, worker_index, options, events_file=None, progress_queue=None,
+                     trace_file=None):
+    """Process-pool entry point: generate topics into a private shard store"""
+    if trace_file:
+        start_tracing()
+    exporters = _start_worker_exporters(options, worker_index)
+    # Check for duplicates against the main store as well as this worker's shard
+    generator = _build_generator(options, data_dir=shard_dir, duplicate_stores=[DataManager(options["data_dir"])],
+                                 ledger=GenerationLedger(options["data_dir"]))
+    event_log = open_event_log(events_file)
+    progress = _QueueProgress(progress_queue) if progress_queue is not None else None
+    try:
+        return _generate_topics(generator, topics, label=f"(worker {worker_index}) ", progress=progress)
+    finally:
+        if generator.scheduler:
+            generator.scheduler.shutdown()
+        if event_log:
+            event_log.close()
+        if trace_file:
+            stop_tracing().write(trace_file)
+        stop_exporters(exporters)
+
+def _start_worker_exporters(options, worker_index):
+    """Give each worker its own metrics port (after the parent's) or textfile, labelled by worker"""
+    port, textfile = options["metrics_port"], options["metrics_file"]
+    if port is None and not textfile:
+        return []
+    REGISTRY.const_labels["worker"] = str(worker_index)
+    if textfile:
+        root, extension = os.path.splitext(textfile)
+        textfile = f"{root}-worker-{worker_index}{extension or '.prom'}"
+    return start_exporters(port + 1 + worker_index if port is not None else None, textfile)
+
+class _QueueProgress:
+    """Forwards a worker's per-topic results to the parent's progress bar"""
+    
+    def __init__(self, queue):
+        self.queue = queue
+    
+    def update(self, ok):
+        self.queue.put(ok)
+
+def _generate_batch_parallel(generator, topics, workers, options, progress=None, event_log=None):
+    """Shard topics across a process pool and merge the shard stores at the end"""
+    run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+    shard_root = os.path.join(generator.data_manager.data_dir, "shards", run_id)
+    shard_dirs = [os.path.join(shard_root, f"worker-{i}") for i in range(workers)]
+    # Workers open the main store (for duplicates and the ledger) from wherever they start
+    options = dict(options, data_dir=os.path.abspath(generator.data_manager.data_dir))
+    # Round-robin keeps shards balanced when topics are grouped by category
+    shard_topics = [topics[i::workers] for i in range(workers)]
+    
+    print(f"⚙️  Running {workers} workers (shards in {shard_root})")
+    # Sign any unindexed problems once here rather than racing to do it in every worker
+    generator.data_manager._get_dedup_index()
+    
+    # Workers write their own event files; they are appended to the main log in worker order
+    events_files = [os.path.join(shard_dir, "events.jsonl") if event_log else None for shard_dir in shard_dirs]
+    tracer = current_tracer()
+    trace_files = [os.path.join(shard_dir, "trace.json") if tracer else None for shard_dir in shard_dirs]
+    manager = multiprocessing.Manager() if progress else None
+    progress_queue = manager.Queue() if manager else None
+    
+    completed = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_run_batch_shard, shard_dir, shard, i, options, events_file, progress_queue, trace_file)
+            for i, (shard_dir, shard, events_file, trace_file)
+            in enumerate(zip(shard_dirs, shard_topics, events_files, trace_files))
+        ]
+        if progress:
+            _drain_progress(futures, progress_queue, progress)
+        for future in as_completed(futures):
+            try:
+                completed += future.result()
+            except Exception as e:
+                print(f"❌ Worker failed: {e}")
+    if manager:
+        manager.shutdown()
+    
+    if event_log:
+        for events_file in events_files:
+            event_log.append_file(events_file)
+    if tracer:
+        for trace_file in trace_files:
+            tracer.merge_file(trace_file)
+    
+    merged = generator.data_manager.merge_shards(
+        [shard_dir for shard_dir in shard_dirs if os.path.isdir(shard_dir)]
+    )
+    shutil.rmtree(shard_root, ignore_errors=True)
+    
+    print(f"\n🔀 Merged {merged['shards']} shards: {merged['problems']} problems, "
+          f"{merged['solutions']} solutions ({completed}/{len(topics)} topics completed)")
+    return completed
+
+def _drain_progress(futures, progress_queue, progress):
+    """Feed worker results into the progress bar until every worker has finished"""
+    while True:
+        try:
+            progress.update(progress_queue.get(timeout=0.2))
+        except queue.Empty:
+            if all(future.done() for future in futures):
+                break
+    while not progress_queue.empty():
+        progress.update(progress_queue.get())
+    progress.close()
+
+def ingest_archives(args):
+    """Bulk-load problem and solution files into the store"""
+    paths = expand_sources(args.sources)
+    if not paths:
+        print(f"❌ No JSON or NDJSON files found in {', '.join(args.sources)}")
+        return
+    
+    print(f"📥 Ingesting {len(paths)} files with {args.workers or os.cpu_count()} workers...")
+    summary = ingest_files(DataManager(), paths, workers=args.workers, dry_run=args.dry_run)
+    action = "Validated" if args.dry_run else "Stored"
+    print(f"✅ {action} {summary['problems']} problems and {summary['solutions']} solutions "
+          f"from {summary['records']} records in {summary['seconds']:.2f}s "
+          f"({summary['records_per_second']:.0f} records/s, parsing {summary['parse_seconds']:.2f}s)")
+    print(f"🔁 Skipped {summary['duplicate_ids']} duplicate IDs and {summary['duplicate_content']} duplicate contents")
+    log_event("ingested", files=summary["files"], problems=summary["problems"], solutions=summary["solutions"],
+              rejected=len(summary["errors"]), ms=summary["seconds"] * 1000)
+    
+    errors = summary["errors"]
+    if errors:
+        print(f"⚠️  Rejected {len(errors)} items:")
+        for error in errors[:10]:
+            print(f"   {error}")
+        if len(errors) > 10:
+            print(f"   ... and {len(errors) - 10} more" + ("" if args.rejects else " (use --rejects FILE to keep them)"))
+        if args.rejects:
+            with open(args.rejects, 'w') as f:
+                f.write("\n".join(errors) + "\n")
+            print(f"📝 Wrote every rejection to {args.rejects}")
 
 def show_categories(args):
     """Show all available categories"""
@@ -206,6 +644,41 @@ def interactive_mode(args):
         else:
             print("❌ Invalid choice. Please enter 1-5.")
 
+def _run_traced(args):
+    """Run a command with span tracing on, then write the trace and print per-span timings"""
+    start_tracing()
+    try:
+        args.func(args)
+    finally:
+        tracer = stop_tracing()
+        tracer.write(args.trace)
+        rows = tracer.summary()
+        print(f"\n🔬 Trace written to {args.trace} (open in ui.perfetto.dev or chrome://tracing)")
+        print(f"   {'span':<34} {'n':>6} {'p50 ms':>10} {'p95 ms':>10} {'total ms':>11}")
+        for row in rows:
+            print(f"   {row['name']:<34} {row['count']:>6} {row['p50']:>10.2f} {row['p95']:>10.2f} {row['total']:>11.1f}")
+
+def _add_provider_arguments(subparser):
+    """Options shared by commands that call a generation provider"""
+    subparser.add_argument('--provider', default='manual',
+                           help="Generation provider: 'manual' (copy-paste prompts) or 'stub'")
+    subparser.add_argument('--rpm', type=float, help='Provider requests-per-minute limit')
+    subparser.add_argument('--tpm', type=float, help='Provider tokens-per-minute limit')
+    subparser.add_argument('--max-concurrency', type=int, help='Upper bound for adaptive concurrency')
+    subparser.add_argument('--hedge', action='store_true',
+                           help='Send a duplicate request when one exceeds the p95 latency for its stage')
+    subparser.add_argument('--timeout', type=float, help='Per-stage request timeout in seconds')
+    subparser.add_argument('--on-duplicate', choices=['reject', 'flag', 'off'], default='reject',
+                           help='What to do with a problem that nearly matches a stored one')
+    subparser.add_argument('--local-practice', action='store_true',
+                           help='Derive practice skeletons from the full solution instead of a model call')
+    subparser.add_argument('--trace', metavar='TRACE_JSON',
+                           help='Write a Chrome/Perfetto trace of per-stage timings and print a summary')
+    subparser.add_argument('--metrics-port', type=int,
+                           help='Serve Prometheus metrics on 127.0.0.1:PORT/metrics (batch workers use PORT+1...)')
+    subparser.add_argument('--metrics-file', metavar='PROM_FILE',
+                           help='Rewrite Prometheus metrics to this textfile every 15 seconds')
+
 def main():
     parser = argparse.ArgumentParser(description="ML/AI Problem Generation System")
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
@@ -220,6 +693,10 @@ def main():
     # Generate problem command
     generate_parser = subparsers.add_parser('generate', help='Generate problem for specific topic')
     generate_parser.add_argument('topic', help='Topic name')
+    generate_parser.add_argument('--inventory', action='store_true',
+                                 help='Serve a ready problem from the inventory when one is stocked')
+    generate_parser.add_argument('--difficulty', help='Difficulty to take from the inventory')
+    _add_provider_arguments(generate_parser)
     generate_parser.set_defaults(func=generate_problem)
     
     # Generate batch command
@@ -227,8 +704,51 @@ def main():
     batch_parser.add_argument('--topics', help='Comma-separated list of topics')
     batch_parser.add_argument('--category', help='Generate for all topics in category')
     batch_parser.add_argument('--company', help='Generate for all topics for company')
+    batch_parser.add_argument('--workers', type=int, default=1,
+                              help='Shard topics across N worker processes')
+    batch_parser.add_argument('--plan', action='store_true',
+                              help='Generate only what is missing from the topic × difficulty × company matrix')
+    batch_parser.add_argument('--cell-target', type=int, default=DEFAULT_CELL_TARGET,
+                              help='Problems wanted per coverage cell (with --plan)')
+    batch_parser.add_argument('--limit', type=int, help='Generate at most N planned problems (with --plan)')
+    batch_parser.add_argument('--dry-run', action='store_true', help='Print the plan without generating')
+    batch_parser.add_argument('--export-jobs', metavar='JOBS_JSONL',
+                              help='Write prompts to a JSONL job file for offline inference instead of generating')
+    batch_parser.add_argument('--import-results', metavar='RESULTS_JSONL',
+                              help='Bulk-import a JSONL file of offline results')
+    batch_parser.add_argument('--quiet', action='store_true',
+                              help='Show a progress bar instead of per-topic output')
+    batch_parser.add_argument('--events', metavar='EVENTS_JSONL',
+                              help='Write a structured JSON-lines event log of the run')
+    batch_parser.add_argument('--prompts-dir', metavar='DIR',
+                              help='Write every rendered prompt to its own file in DIR')
+    _add_provider_arguments(batch_parser)
     batch_parser.set_defaults(func=generate_batch)
     
+    # Inventory command
+    inventory_parser = subparsers.add_parser('inventory', help='Show or refill the ready-problem inventory')
+    inventory_parser.add_argument('action', choices=['status', 'refill'])
+    inventory_parser.add_argument('--topics', help='Comma-separated list of topics (default: all)')
+    inventory_parser.add_argument('--category', help='Stock all topics in category')
+    inventory_parser.add_argument('--company', help='Stock all topics for company')
+    inventory_parser.add_argument('--target', type=int, default=DEFAULT_TARGET,
+                                  help='Ready problems to keep per topic and difficulty')
+    inventory_parser.add_argument('--watch', action='store_true',
+                                  help='Keep refilling in the background until interrupted')
+    inventory_parser.add_argument('--interval', type=float, default=60.0,
+                                  help='Seconds between checks once the inventory is full')
+    _add_provider_arguments(inventory_parser)
+    inventory_parser.set_defaults(func=manage_inventory)
+    
+    # Ingest command
+    ingest_parser = subparsers.add_parser('ingest', help='Bulk-load problem and solution JSON/NDJSON files')
+    ingest_parser.add_argument('sources', nargs='+', metavar='DIR|GLOB',
+                               help='Directories (searched recursively) or glob patterns of files to load')
+    ingest_parser.add_argument('--workers', type=int, help='Parser processes (default: CPU count)')
+    ingest_parser.add_argument('--dry-run', action='store_true', help='Parse, validate and deduplicate without storing')
+    ingest_parser.add_argument('--rejects', metavar='FILE', help='Write every rejected item to FILE')
+    ingest_parser.set_defaults(func=ingest_archives)
+    
     # Show categories command
     categories_parser = subparsers.add_parser('categories', help='Show all categories')
     categories_parser.set_defaults(func=show_categories)
@@ -244,7 +764,14 @@ def main():
     args = parser.parse_args()
     
     if args.command:
-        args.func(args)
+        exporters = start_exporters(getattr(args, 'metrics_port', None), getattr(args, 'metrics_file', None))
+        try:
+            if getattr(args, 'trace', None):
+                _run_traced(args)
+            else:
+                args.func(args)
+        finally:
+            stop_exporters(exporters)
     else:
         # Default: show help and run interactive mode
         parser.print_help()
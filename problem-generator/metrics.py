@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Metrics for ML/AI Problem Generation System
+Prometheus-text counters, gauges and histograms served over HTTP or written to a textfile
+"""
+
+import bisect
+import functools
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds, from a fast local derivation up to a slow model call
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+def _format_labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class _Metric:
+    kind = "untyped"
+    
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def samples(self) -> List[Tuple[str, Tuple[Tuple[str, str], ...], float]]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    """Monotonically increasing total"""
+    
+    kind = "counter"
+    
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+    
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, tuple(zip(self.labelnames, key)), value) for key, value in items]
+
+class Gauge(_Metric):
+    """A value that goes up and down, or is read from a callback at scrape time"""
+    
+    kind = "gauge"
+    
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._function: Optional[Callable[[], float]] = None
+    
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+    
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def set_function(self, function: Optional[Callable[[], float]]):
+        """Read the (unlabelled) value from `function` whenever metrics are rendered"""
+        self._function = function
+    
+    def samples(self):
+        function = self._function
+        if function is not None:
+            try:
+                return [(self.name, (), float(function()))]
+            except Exception:
+                return []
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, tuple(zip(self.labelnames, key)), value) for key, value in items]
+
+class Histogram(_Metric):
+    """Observations counted into fixed cumulative buckets, with their sum and count"""
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+    
+    def timed(self, **labels):
+        """Decorator observing each call's duration in seconds"""
+        def decorate(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - started, **labels)
+            return wrapper
+        return decorate
+    
+    def samples(self):
+        with self._lock:
+            items = [(key, list(state[0]), state[1], state[2]) for key, state in self._values.items()]
+        samples = []
+        for key, counts, total, count in items:
+            labels = tuple(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                samples.append((f"{self.name}_bucket", labels + (("le", _format_value(bound)),), cumulative))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+class MetricsRegistry:
+    """A named set of metrics rendered together in the Prometheus text format"""
+    
+    def __init__(self, const_labels: Optional[Dict[str, str]] = None):
+        self.const_labels = dict(const_labels or {})
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+    
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help_text, labelnames))
+    
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help_text, labelnames))
+    
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+    
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        const = tuple(sorted(self.const_labels.items()))
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.help_text)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(const + labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+GENERATIONS = REGISTRY.counter(
+    "problemgen_generations_total", "Generation stage calls by outcome", ("stage", "provider", "outcome"))
+STAGE_LATENCY = REGISTRY.histogram(
+    "problemgen_stage_latency_seconds", "Time to produce each generation stage, request plus parsing", ("stage",))
+TOPICS = REGISTRY.counter(
+    "problemgen_topics_total", "Batch topics generated, solved and integrated", ("outcome",))
+QUEUE_DEPTH = REGISTRY.gauge(
+    "problemgen_scheduler_queue_depth", "Requests waiting in the generation scheduler")
+IN_FLIGHT = REGISTRY.gauge(
+    "problemgen_scheduler_in_flight", "Requests currently running against the provider")
+STORE_COMMIT_LATENCY = REGISTRY.histogram(
+    "problemgen_store_commit_seconds", "DataManager write operations, including validation and metadata",
+    ("operation",))
+STORE_BYTES = REGISTRY.counter(
+    "problemgen_store_bytes_written_total", "Bytes written to the DataManager's JSON files", ("file",))
+CACHE_REQUESTS = REGISTRY.counter(
+    "problemgen_cache_requests_total", "Lookups in the generation caches by result", ("cache", "result"))
+API_REQUESTS = REGISTRY.counter(
+    "problemgen_api_requests_total", "Read API responses by route and status", ("route", "status"))
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+class MetricsServer:
+    """Serves the registry at http://host:port/metrics from a daemon thread"""
+    
+    def __init__(self, port: int, host: str = "127.0.0.1", registry: MetricsRegistry = REGISTRY):
+        self.registry = registry
+        registry_ref = registry
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry_ref.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.address = self._server.server_address
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True)
+    
+    def start(self) -> "MetricsServer":
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+class TextfileExporter:
+    """Rewrites a .prom file every `interval` seconds for node_exporter's textfile collector"""
+    
+    def __init__(self, path: str, interval: float = 15.0, registry: MetricsRegistry = REGISTRY):
+        self.path = path
+        self.interval = interval
+        self.registry = registry
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="metrics-textfile", daemon=True)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    
+    def start(self) -> "TextfileExporter":
+        self.write()
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Stop the loop and write the final values"""
+        self._stop.set()
+        self._thread.join()
+        self.write()
+    
+    def write(self):
+        # Scrapers must never see a half-written file
+        temp_file = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_file, 'w') as f:
+            f.write(self.registry.render())
+        os.replace(temp_file, self.path)
+    
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+def start_exporters(port: Optional[int] = None, textfile: Optional[str] = None,
+                    interval: float = 15.0) -> List:
+    """Start whichever exporters are configured; stop them with stop_exporters()"""
+    exporters = []
+    if port is not None:
+        exporters.append(MetricsServer(port).start())
+    if textfile:
+        exporters.append(TextfileExporter(textfile, interval).start())
+    return exporters
+
+def stop_exporters(exporters: List):
+    for exporter in exporters:
+        exporter.stop()
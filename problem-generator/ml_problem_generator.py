@@ -4,93 +4,258 @@ ML Problem Generator
 Main script for generating LLM implementation problems using Cursor's AI
 """
 
-import json
 import os
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional
 import uuid
 from datetime import datetime
 from config.ml_topics_config import MLTopicsConfig
 from data_manager import DataManager
+from providers import GenerationProvider
+from scheduler import PRIORITY_BATCH, GenerationScheduler
+from generation_client import GenerationClient
+from dedup_index import DuplicateProblemError
+from practice_skeleton import SkeletonError, practice_solution_fields
+from ledger import GenerationLedger
+from metrics import GENERATIONS, IN_FLIGHT, QUEUE_DEPTH, STAGE_LATENCY, record_cache
+from events import PromptArchive, Stopwatch, events_enabled, log_event
+from prompt_packing import PromptPacker, estimate_tokens
+from tracing import span, traced
+from response_parser import PROBLEM_REQUIRED_FIELDS, SOLUTION_REQUIRED_FIELDS, MalformedResponseError, ParsedResponse
 
 class MLProblemGenerator:
-    def __init__(self):
+    def __init__(self, data_dir: str = "data", provider: Optional[GenerationProvider] = None,
+                 scheduler: Optional[GenerationScheduler] = None, client: Optional[GenerationClient] = None,
+                 priority: int = PRIORITY_BATCH, prompt_budgets: Optional[Dict[str, int]] = None,
+                 on_duplicate: str = "reject", duplicate_stores: Optional[List[DataManager]] = None,
+                 local_practice: bool = False, quiet: bool = False,
+                 prompt_archive: Optional[PromptArchive] = None, ledger: Optional[GenerationLedger] = None):
         self.problem_prompts_dir = "../prompt/problem_prompts"
         self.solution_prompts_dir = "../prompt/solution_prompts"
         self.topics_config = MLTopicsConfig()
-        self.data_manager = DataManager()
+        self.data_manager = DataManager(data_dir)
+        # Without a provider, prompts are printed for copy-paste into Cursor's AI
+        if client:
+            scheduler = client.scheduler
+        elif provider and not scheduler:
+            scheduler = GenerationScheduler(provider)
+        self.scheduler = scheduler
+        if scheduler:
+            QUEUE_DEPTH.set_function(lambda: scheduler.queue_depth)
+            IN_FLIGHT.set_function(lambda: scheduler.snapshot()["in_flight"])
+        self.provider = scheduler.provider if scheduler else None
+        self.client = client or (GenerationClient(scheduler) if scheduler else None)
+        self.priority = priority
+        self.prompt_packer = PromptPacker(prompt_budgets)
+        self._templates = {}
+        # Near-duplicates are rejected or flagged before any solution calls are spent on them
+        self.on_duplicate = on_duplicate
+        self.duplicate_stores = [self.data_manager] + list(duplicate_stores or [])
+        # Derive practice skeletons from full solutions instead of asking the model
+        self.local_practice = local_practice
+        # Quiet runs report through the event log (and prompt files) instead of stdout
+        self.quiet = quiet
+        self.prompt_archive = prompt_archive
+        # Batch workers pass the main store's ledger so every call lands in one file
+        self.ledger = ledger or GenerationLedger(data_dir)
         
-    def generate_problem(self, topic: str) -> Dict:
+    @traced("generate.problem")
+    def generate_problem(self, topic: str, difficulty: Optional[str] = None, company: Optional[str] = None) -> Dict:
         """Generate a problem from LLM implementation topic using Cursor's AI"""
-        prompt = self._load_problem_prompt(topic)
+        prompt = self._prompt_ready("problem", topic, self._load_problem_prompt(topic, difficulty, company))
+        if self.provider:
+            return self._generate(prompt, "problem", topic, PROBLEM_REQUIRED_FIELDS,
+                                  lambda generated: self.check_duplicate(
+                                      self._pin_cell(self.parse_problem_response(topic, generated), difficulty, company)
+                                  ))
         
         # This prompt would be used with Cursor's AI interface
-        print("=" * 80)
-        print("PROBLEM GENERATION PROMPT")
-        print("=" * 80)
-        print(prompt)
-        print("=" * 80)
-        print("\n📋 INSTRUCTIONS:")
-        print("1. Copy the above prompt to Cursor's AI interface")
-        print("2. Generate the problem using Cursor's AI")
-        print("3. Copy the generated JSON response back here")
-        print("4. The system will process and integrate it into the database")
-        print("=" * 80)
+        self._show_prompt("PROBLEM GENERATION PROMPT", prompt, "problem")
         
-        # For now, return a placeholder structure
-        return self._get_problem_placeholder(topic)
+        # For now, return a placeholder structure; the placeholder is the same for every run of a
+        # topic, so the near-duplicate check waits for the pasted response (see integration.py watch)
+        return self._pin_cell(self._get_problem_placeholder(topic), difficulty, company)
+    
+    def _pin_cell(self, problem: Dict, difficulty: Optional[str], company: Optional[str]) -> Dict:
+        """Keep a planned problem in the coverage cell it was requested for"""
+        if difficulty:
+            problem["difficulty"] = difficulty
+        if company:
+            problem["company"] = company
+        return problem
     
+    @traced("dedup.check")
+    def check_duplicate(self, problem: Dict) -> Dict:
+        """Reject or flag a problem that nearly matches a stored one"""
+        if self.on_duplicate == "off":
+            return problem
+        matches = [match for store in self.duplicate_stores for match in store.find_near_duplicates(problem)]
+        if not matches:
+            return problem
+        matches.sort(key=lambda match: match["similarity"], reverse=True)
+        if self.on_duplicate == "reject":
+            log_event("duplicate_rejected", topic=problem.get("topic"), duplicate_of=matches[0]["id"],
+                      similarity=matches[0]["similarity"])
+            raise DuplicateProblemError(problem, matches)
+        problem["near_duplicate_of"] = matches[0]["id"]
+        log_event("duplicate_flagged", topic=problem.get("topic"), duplicate_of=matches[0]["id"],
+                  similarity=matches[0]["similarity"])
+        self._say(f"⚠️  Near-duplicate of {matches[0]['id']} (similarity {matches[0]['similarity']:.2f})")
+        return problem
+    
+    @traced("generate.full_solution")
     def generate_full_solution(self, problem: Dict) -> Dict:
         """Generate full solution using Cursor's AI"""
-        prompt = self._load_full_solution_prompt(problem)
+        prompt = self._prompt_ready("full_solution", problem.get("topic", ""), self._load_full_solution_prompt(problem))
+        if self.provider:
+            return self._generate(prompt, "full_solution", problem.get("topic", ""), SOLUTION_REQUIRED_FIELDS,
+                                  lambda generated: self.parse_solution_response(problem, "full_solution", generated))
         
         # This prompt would be used with Cursor's AI interface
-        print("=" * 80)
-        print("FULL SOLUTION GENERATION PROMPT")
-        print("=" * 80)
-        print(prompt)
-        print("=" * 80)
-        print("\n📋 INSTRUCTIONS:")
-        print("1. Copy the above prompt to Cursor's AI interface")
-        print("2. Generate the full solution using Cursor's AI")
-        print("3. Copy the generated JSON response back here")
-        print("4. The system will process and integrate it into the database")
-        print("=" * 80)
+        self._show_prompt("FULL SOLUTION GENERATION PROMPT", prompt, "full solution")
         
         # For now, return a placeholder structure
         return self._get_full_solution_placeholder(problem)
     
-    def generate_practice_solution(self, problem: Dict) -> Dict:
+    @traced("generate.practice_solution")
+    def generate_practice_solution(self, problem: Dict, full_solution: Optional[Dict] = None) -> Dict:
         """Generate practice snippet using Cursor's AI"""
-        prompt = self._load_practice_solution_prompt(problem)
+        if self.local_practice and full_solution and full_solution.get("code"):
+            timer = Stopwatch()
+            try:
+                solution = self.derive_practice_solution(problem, full_solution)
+                log_event("practice_derived", topic=problem.get("topic"), ms=timer.ms, chars=len(solution["code"]))
+                self.ledger.record(problem.get("topic", ""), "practice_solution", "local", 0,
+                                   estimate_tokens(solution["code"]), timer.ms, cache_hit=True)
+                GENERATIONS.inc(stage="practice_solution", provider="local", outcome="ok")
+                STAGE_LATENCY.observe(timer.ms / 1000.0, stage="practice_solution")
+                return solution
+            except SkeletonError as e:
+                log_event("practice_derive_failed", topic=problem.get("topic"), error=str(e))
+                self._say(f"⚠️  Falling back to a model call for the practice solution: {e}")
+        
+        prompt = self._prompt_ready("practice_solution", problem.get("topic", ""),
+                                    self._load_practice_solution_prompt(problem))
+        if self.provider:
+            return self._generate(prompt, "practice_solution", problem.get("topic", ""), SOLUTION_REQUIRED_FIELDS,
+                                  lambda generated: self.parse_solution_response(problem, "practice_solution", generated))
         
         # This prompt would be used with Cursor's AI interface
+        self._show_prompt("PRACTICE SOLUTION GENERATION PROMPT", prompt, "practice solution")
+        
+        # For now, return a placeholder structure
+        return self._get_practice_solution_placeholder(problem)
+    
+    @traced("practice.derive")
+    def derive_practice_solution(self, problem: Dict, full_solution: Dict) -> Dict:
+        """Build the practice solution by stubbing the full solution's function bodies"""
+        solution = self._get_practice_solution_placeholder(problem)
+        solution.update(practice_solution_fields(full_solution))
+        return solution
+    
+    def _generate(self, prompt: str, stage: str, topic: str, required_fields: Dict[str, type],
+                  build: Callable[[Dict], Dict]) -> Dict:
+        """Request one stage, parsed as it streams, and build its record, recording cost and outcome in the ledger"""
+        timer = Stopwatch()
+        report = {}
+        response = None
+        outcome, error = "ok", None
+        try:
+            response = self._request(prompt, stage, topic, required_fields, report)
+            return build(response.record)
+        except DuplicateProblemError:
+            outcome = "duplicate"
+            raise
+        except Exception as e:
+            # A response that arrived but did not parse is the model's fault, not the transport's
+            invalid = response is not None or isinstance(e, MalformedResponseError)
+            outcome, error = ("invalid" if invalid else "failed"), type(e).__name__
+            raise
+        finally:
+            self.ledger.record(topic, stage, self.provider.name, estimate_tokens(prompt),
+                               estimate_tokens(response.text) if response else 0, timer.ms,
+                               retries=report.get("retries", 0), outcome=outcome, error=error)
+            GENERATIONS.inc(stage=stage, provider=self.provider.name, outcome=outcome)
+            STAGE_LATENCY.observe(timer.ms / 1000.0, stage=stage)
+    
+    def _request(self, prompt: str, stage: str, topic: str, required_fields: Dict[str, type],
+                 report: Optional[Dict] = None) -> ParsedResponse:
+        """Send a prompt to the provider through the rate-limited, hedging client.
+        
+        The scheduler parses the response as it streams and cuts off one that
+        turns out malformed, raising MalformedResponseError here.
+        """
+        timer = Stopwatch()
+        try:
+            with span("model.request", stage=stage, topic=topic):
+                response = self.client.request(prompt, stage, topic, self.priority, report=report,
+                                               required_fields=required_fields)
+        except Exception as e:
+            log_event("request_failed", stage=stage, topic=topic, ms=timer.ms, error=type(e).__name__)
+            raise
+        log_event("response", stage=stage, topic=topic, ms=timer.ms, chars=len(response.text))
+        return response
+    
+    @traced("prompt.archive")
+    def _prompt_ready(self, stage: str, topic: str, prompt: str) -> str:
+        """Archive a rendered prompt and log its size"""
+        path = self.prompt_archive.save(stage, topic, prompt) if self.prompt_archive else None
+        if events_enabled():
+            log_event("prompt", stage=stage, topic=topic, chars=len(prompt), tokens=estimate_tokens(prompt), file=path)
+        return prompt
+    
+    def _show_prompt(self, title: str, prompt: str, what: str):
+        """Print a prompt with copy-paste instructions for Cursor's AI"""
+        if self.quiet:
+            return
         print("=" * 80)
-        print("PRACTICE SOLUTION GENERATION PROMPT")
+        print(title)
         print("=" * 80)
         print(prompt)
         print("=" * 80)
         print("\n📋 INSTRUCTIONS:")
         print("1. Copy the above prompt to Cursor's AI interface")
-        print("2. Generate the practice solution using Cursor's AI")
+        print(f"2. Generate the {what} using Cursor's AI")
         print("3. Copy the generated JSON response back here")
         print("4. The system will process and integrate it into the database")
         print("=" * 80)
-        
-        # For now, return a placeholder structure
-        return self._get_practice_solution_placeholder(problem)
     
+    def _say(self, message: str):
+        if not self.quiet:
+            print(message)
+    
+    @traced("parse.problem")
+    def parse_problem_response(self, topic: str, generated: Dict) -> Dict:
+        """Build a problem from the fields parsed out of a response"""
+        problem = self._get_problem_placeholder(topic)
+        problem.update(generated)
+        return problem
+    
+    @traced("parse.solution")
+    def parse_solution_response(self, problem: Dict, solution_type: str, generated: Dict) -> Dict:
+        """Build a full or practice solution from the fields parsed out of a response"""
+        if solution_type == "practice_solution":
+            solution = self._get_practice_solution_placeholder(problem)
+        else:
+            solution = self._get_full_solution_placeholder(problem)
+        solution.update(generated)
+        return solution
+    
+    @traced("integrate.database")
     def integrate_to_database(self, problem: Dict, full_solution: Dict, practice_solution: Dict):
         """Update database with generated content"""
-        print("\n🔄 INTEGRATING TO DATABASE...")
+        self._say("\n🔄 INTEGRATING TO DATABASE...")
+        timer = Stopwatch()
         
         # Save to data manager
         problem_id = self.data_manager.save_problem(problem)
         full_solution_id = self.data_manager.save_solution(full_solution, problem_id)
         practice_solution_id = self.data_manager.save_solution(practice_solution, problem_id)
+        log_event("integrated", topic=problem.get("topic"), problem_id=problem_id,
+                  difficulty=problem.get("difficulty"), company=problem.get("company"), ms=timer.ms)
         
-        print(f"📝 Saved problem: {problem_id}")
-        print(f"💻 Saved full solution: {full_solution_id}")
-        print(f"🎯 Saved practice solution: {practice_solution_id}")
+        self._say(f"📝 Saved problem: {problem_id}")
+        self._say(f"💻 Saved full solution: {full_solution_id}")
+        self._say(f"🎯 Saved practice solution: {practice_solution_id}")
         
         # Update mock database
         self._update_mock_database(problem, full_solution, practice_solution)
@@ -101,42 +266,41 @@ class MLProblemGenerator:
         # Update admin solutions
         self._update_admin_solutions(problem, full_solution, practice_solution)
         
-        print("✅ Database integration completed!")
+        self._say("✅ Database integration completed!")
     
-    def _load_problem_prompt(self, topic: str) -> str:
+    @traced("prompt.render_problem")
+    def _load_problem_prompt(self, topic: str, difficulty: Optional[str] = None, company: Optional[str] = None) -> str:
         """Load and format problem generation prompt"""
-        prompt_file = os.path.join(self.problem_prompts_dir, "problem_generation_template.txt")
-        with open(prompt_file, 'r') as f:
-            template = f.read()
-        return template.format(LLM_CODING_TOPIC=topic)
+        template = self._load_template(self.problem_prompts_dir, "problem_generation_template.txt")
+        if difficulty or company:
+            # Steer the model towards the coverage cell a planned generation fills
+            targets = [f"Target difficulty: {difficulty}" if difficulty else "",
+                       f"Target company interview style: {company}" if company else ""]
+            template += "\n" + "\n".join(line for line in targets if line) + "\n"
+        return self.prompt_packer.render(template, "problem", LLM_CODING_TOPIC=topic)
     
+    @traced("prompt.render_full_solution")
     def _load_full_solution_prompt(self, problem: Dict) -> str:
         """Load and format full solution generation prompt"""
-        prompt_file = os.path.join(self.solution_prompts_dir, "full_solution_generation_template.txt")
-        with open(prompt_file, 'r') as f:
-            template = f.read()
-        
-        # Convert datetime objects to strings for JSON serialization
-        problem_copy = problem.copy()
-        for key, value in problem_copy.items():
-            if isinstance(value, datetime):
-                problem_copy[key] = value.isoformat()
-        
-        return template.format(GENERATED_PROBLEM=json.dumps(problem_copy, indent=2))
+        template = self._load_template(self.solution_prompts_dir, "full_solution_generation_template.txt")
+        return self.prompt_packer.render_problem(template, problem, "full_solution")
     
+    @traced("prompt.render_practice_solution")
     def _load_practice_solution_prompt(self, problem: Dict) -> str:
         """Load and format practice solution generation prompt"""
-        prompt_file = os.path.join(self.solution_prompts_dir, "practice_solution_generation_template.txt")
-        with open(prompt_file, 'r') as f:
-            template = f.read()
-        
-        # Convert datetime objects to strings for JSON serialization
-        problem_copy = problem.copy()
-        for key, value in problem_copy.items():
-            if isinstance(value, datetime):
-                problem_copy[key] = value.isoformat()
-        
-        return template.format(GENERATED_PROBLEM=json.dumps(problem_copy, indent=2))
+        template = self._load_template(self.solution_prompts_dir, "practice_solution_generation_template.txt")
+        return self.prompt_packer.render_problem(template, problem, "practice_solution")
+    
+    @traced("prompt.load_template")
+    def _load_template(self, directory: str, filename: str) -> str:
+        """Read a prompt template once and reuse it for later prompts"""
+        prompt_file = os.path.join(directory, filename)
+        template = self._templates.get(prompt_file)
+        record_cache("prompt_template", template is not None)
+        if template is None:
+            with open(prompt_file, 'r') as f:
+                template = self._templates[prompt_file] = f.read()
+        return template
     
     def _get_problem_placeholder(self, topic: str) -> Dict:
         """Return placeholder problem structure"""
@@ -185,19 +349,19 @@ class MLProblemGenerator:
     
     def _update_mock_database(self, problem: Dict, full_solution: Dict, practice_solution: Dict):
         """Update mock database with generated content"""
-        print("📝 Updating mock database...")
+        self._say("📝 Updating mock database...")
         # This would update backend/src/config/database-mock.ts
         # Implementation would go here
     
     def _update_frontend_data(self, problem: Dict, full_solution: Dict, practice_solution: Dict):
         """Update frontend data with generated content"""
-        print("🎨 Updating frontend data...")
+        self._say("🎨 Updating frontend data...")
         # This would update src/data/questions.ts
         # Implementation would go here
     
     def _update_admin_solutions(self, problem: Dict, full_solution: Dict, practice_solution: Dict):
         """Update admin solutions with generated content"""
-        print("👨‍💼 Updating admin solutions...")
+        self._say("👨‍💼 Updating admin solutions...")
         # This would update admin solution models
         # Implementation would go here
 
@@ -233,7 +397,7 @@ def main():
     
     # Generate solutions
     full_solution = generator.generate_full_solution(problem)
-    practice_solution = generator.generate_practice_solution(problem)
+    practice_solution = generator.generate_practice_solution(problem, full_solution)
     
     print(f"\n✅ Generated solution placeholders:")
     print(f"   Full solution: {full_solution['title']}")
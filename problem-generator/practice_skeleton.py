@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Practice Skeletons for ML/AI Problem Generation System
+Derives practice code from a full solution by stubbing out function bodies
+"""
+
+import ast
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from metrics import record_cache
+from schema import strip_code_fences
+
+# Skeletons kept in memory, keyed by the SHA-256 of the full solution's code
+CACHE_SIZE = 256
+
+class SkeletonError(ValueError):
+    """Raised when a full solution's code cannot be turned into a skeleton"""
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def make_skeleton(code: str) -> Tuple[str, List[str]]:
+    """Return (skeleton code, todo items) for a full solution, cached by code hash"""
+    key = hashlib.sha256(code.encode("utf-8")).hexdigest()
+    with _cache_lock:
+        hit = key in _cache
+        if hit:
+            _cache.move_to_end(key)
+            skeleton, todos = _cache[key]
+    record_cache("practice_skeleton", hit)
+    if hit:
+        return skeleton, list(todos)
+    
+    skeleton, todos = _build_skeleton(code)
+    with _cache_lock:
+        _cache[key] = (skeleton, tuple(todos))
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return skeleton, todos
+
+def _build_skeleton(code: str) -> Tuple[str, List[str]]:
+    """Replace every function body with a TODO stub, keeping signatures and docstrings.
+    
+    Edits are made on the source lines rather than by unparsing the tree, so
+    comments, formatting, decorators and type hints outside the bodies are
+    preserved exactly (and ast.unparse, which needs Python 3.9, is not used).
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        raise SkeletonError(f"full solution code does not parse: {e.msg} (line {e.lineno})")
+    
+    functions = []
+    _collect_functions(tree.body, "", functions)
+    if not functions:
+        raise SkeletonError("full solution code defines no functions to stub")
+    
+    lines = code.splitlines()
+    todos = []
+    # Work bottom-up so earlier line numbers stay valid
+    for name, node in sorted(functions, key=lambda item: item[1].lineno, reverse=True):
+        body = node.body
+        if _is_docstring(body[0]):
+            body = body[1:]
+        todo = f"TODO: implement {name}"
+        todos.append(todo)
+        
+        if not body:
+            # Docstring-only function: add the stub after the docstring
+            docstring = node.body[0]
+            first_line = lines[docstring.lineno - 1]
+            if first_line[:_char_offset(first_line, docstring.col_offset)].strip():
+                # Docstring on the same line as the signature, e.g. `def f(self): """doc"""`
+                last_line = lines[docstring.end_lineno - 1]
+                end = _char_offset(last_line, docstring.end_col_offset)
+                lines[docstring.end_lineno - 1] = last_line[:end] + f"; pass  # {todo}" + last_line[end:]
+                continue
+            indent = _indent_of(first_line)
+            lines[docstring.end_lineno:docstring.end_lineno] = [f"{indent}# {todo}", f"{indent}pass"]
+            continue
+        
+        first, last = body[0], body[-1]
+        first_line = lines[first.lineno - 1]
+        start = _char_offset(first_line, first.col_offset)
+        if first_line[:start].strip():
+            # Body on the same line as the signature, e.g. `def f(x): return x`
+            last_line = lines[last.end_lineno - 1]
+            lines[first.lineno - 1:last.end_lineno] = [
+                first_line[:start] + f"pass  # {todo}" + last_line[_char_offset(last_line, last.end_col_offset):]
+            ]
+            continue
+        
+        indent = first_line[:start]
+        lines[first.lineno - 1:last.end_lineno] = [f"{indent}# {todo}", f"{indent}pass"]
+    
+    todos.reverse()
+    return "\n".join(lines) + ("\n" if code.endswith("\n") else ""), todos
+
+def _collect_functions(statements: List[ast.stmt], prefix: str, found: List[Tuple[str, ast.AST]]):
+    """Top-level functions and class methods; nested functions go with their parent's body"""
+    for node in statements:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            found.append((prefix + node.name, node))
+        elif isinstance(node, ast.ClassDef):
+            _collect_functions(node.body, f"{prefix}{node.name}.", found)
+        elif isinstance(node, (ast.If, ast.Try)) and not _is_main_guard(node):
+            # Definitions behind import guards such as `try: ... except ImportError:`
+            for block in (node.body, getattr(node, "orelse", []), getattr(node, "finalbody", [])):
+                _collect_functions(block, prefix, found)
+
+def _is_main_guard(node: ast.AST) -> bool:
+    test = getattr(node, "test", None)
+    return (isinstance(test, ast.Compare) and isinstance(test.left, ast.Name)
+            and test.left.id == "__name__")
+
+def _is_docstring(node: ast.stmt) -> bool:
+    return (isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant)
+            and isinstance(node.value.value, str))
+
+def _char_offset(line: str, byte_offset: int) -> int:
+    """ast column offsets count UTF-8 bytes; convert one to an index into the decoded line"""
+    return len(line.encode("utf-8")[:byte_offset].decode("utf-8"))
+
+def _indent_of(line: str) -> str:
+    return line[:len(line) - len(line.lstrip())]
+
+def practice_solution_fields(full_solution: Dict) -> Dict:
+    """Practice-solution fields derived from a full solution without a model call"""
+    skeleton, todos = make_skeleton(strip_code_fences((full_solution.get("code") or "").strip()))
+    return {
+        "title": "Practice Python Solution",
+        "code": skeleton,
+        "explanation": "Implement each TODO; the signatures, docstrings and type hints match the full solution.",
+        "todo_items": todos,
+        "key_concepts": list(full_solution.get("key_concepts") or []),
+        "time_complexity": full_solution.get("time_complexity"),
+        "space_complexity": full_solution.get("space_complexity")
+    }
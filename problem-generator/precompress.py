@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Precompressed Artifacts for ML/AI Problem Generation System
+Writes .gz (and .br when brotli is installed) beside generated files for static serving
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+from integration_manifest import file_stamp
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PRECOMPRESS_MANIFEST_FILE = "precompress_manifest.json"
+
+# Payloads this small gain nothing from a compressed copy
+MIN_SIZE = 256
+
+def _gzip(data: bytes) -> bytes:
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def _brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=11)
+
+def available_encodings() -> Dict[str, tuple]:
+    """Encoding name -> (file suffix, compress function) for what this install supports"""
+    encodings = {"gzip": (".gz", _gzip)}
+    if brotli is not None:
+        encodings["br"] = (".br", _brotli)
+    return encodings
+
+class Precompressor:
+    """Keeps compressed siblings of generated artifacts in step with their sources.
+    
+    Each source's SHA-256, size and compressed sizes are kept in a manifest.
+    A source whose stat stamp is unchanged is skipped without being read;
+    one whose stamp moved is hashed and only recompressed if the hash
+    differs. Compression runs on a thread pool (zlib and brotli release the
+    GIL), one task per source.
+    
+    Paths are always the published locations. During a staged publish,
+    `locate` says where a source's new content currently is, `stage` where
+    a compressed copy should be written, and `remove` defers deletions.
+    """
+    
+    def __init__(self, manifest_file: str, workers: Optional[int] = None, min_size: int = MIN_SIZE,
+                 locate: Callable[[str], str] = None, stage: Callable[[str], str] = None,
+                 remove: Callable[[str], None] = None):
+        self.manifest_file = manifest_file
+        self.workers = workers or min(8, (os.cpu_count() or 2))
+        self.min_size = min_size
+        self.encodings = available_encodings()
+        self.entries = self._load()
+        self.locate = locate or (lambda path: path)
+        self.stage = stage or (lambda path: path)
+        self.remove = remove or _remove
+    
+    def run(self, paths: Iterable[str]) -> Dict[str, int]:
+        """Bring compressed copies of `paths` up to date; returns counts of what happened"""
+        paths = list(paths)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(self._update, paths))
+        counts = {"compressed": 0, "unchanged": 0, "skipped": 0}
+        for path, (outcome, entry) in zip(paths, results):
+            counts[outcome] += 1
+            if entry is not None:
+                self.entries[path] = entry
+        return counts
+    
+    def prune(self, directory: str, live_paths: Iterable[str]) -> int:
+        """Remove compressed copies (and manifest entries) of sources in `directory` that no longer exist"""
+        live = set(live_paths)
+        prefix = os.path.join(directory, "")
+        removed = 0
+        for path in [path for path in self.entries if path.startswith(prefix) and path not in live]:
+            for suffix, _ in self.encodings.values():
+                self.remove(path + suffix)
+            del self.entries[path]
+            removed += 1
+        return removed
+    
+    def _update(self, path: str):
+        source = self.locate(path)
+        stamp = file_stamp(source)
+        if stamp is None:
+            return "skipped", None
+        entry = self.entries.get(path)
+        if entry and entry["stamp"] == stamp and self._outputs_present(path, entry):
+            return "unchanged", None
+        
+        with open(source, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if entry and entry["sha256"] == digest and self._outputs_present(path, entry):
+            return "unchanged", dict(entry, stamp=stamp)
+        
+        outputs = {}
+        if len(data) < self.min_size:
+            # A copy left from when the source was larger would now be stale
+            for suffix, _ in self.encodings.values():
+                if os.path.exists(path + suffix):
+                    self.remove(path + suffix)
+        else:
+            for name, (suffix, compress) in self.encodings.items():
+                compressed = compress(data)
+                output = self.stage(path + suffix)
+                temp_file = f"{output}.{os.getpid()}.tmp"
+                with open(temp_file, 'wb') as f:
+                    f.write(compressed)
+                os.replace(temp_file, output)
+                outputs[name] = {"file": os.path.basename(path + suffix), "size": len(compressed)}
+        return ("compressed" if outputs else "skipped"), {
+            "stamp": stamp, "sha256": digest, "size": len(data), "encodings": outputs
+        }
+    
+    def _outputs_present(self, path: str, entry: Dict) -> bool:
+        # A newly installed brotli should produce the missing .br files
+        if len(entry.get("encodings", {})) != len(self.encodings) and entry["size"] >= self.min_size:
+            return False
+        return all(os.path.exists(path + self.encodings[name][0])
+                   for name in entry.get("encodings", {}) if name in self.encodings)
+    
+    def save(self):
+        directory = os.path.dirname(self.manifest_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_file = self.manifest_file + ".tmp"
+        with open(temp_file, 'w') as f:
+            json.dump({"artifacts": self.entries}, f, indent=2, sort_keys=True)
+        os.replace(temp_file, self.manifest_file)
+    
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.manifest_file, 'r') as f:
+                return json.load(f).get("artifacts", {})
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def compression_summary(entries: Dict[str, Dict], paths: List[str]) -> Dict[str, int]:
+    """Total source and compressed bytes per encoding for the given artifacts"""
+    totals = {"source": 0}
+    for path in paths:
+        entry = entries.get(path)
+        if not entry:
+            continue
+        totals["source"] += entry["size"]
+        for name, output in entry["encodings"].items():
+            totals[name] = totals.get(name, 0) + output["size"]
+    return totals
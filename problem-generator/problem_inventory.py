@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Problem Inventory for ML/AI Problem Generation System
+A pool of ready problems with solutions per topic and difficulty, refilled in the background
+"""
+
+import heapq
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from config.ml_topics_config import MLTopicsConfig
+from dedup_index import DUPLICATE_THRESHOLD, DuplicateProblemError, MinHashLSH, problem_text
+from schema import PROBLEM_SCHEMA, SOLUTION_SCHEMA, check_record
+
+# Ready problems kept per topic and difficulty
+DEFAULT_TARGET = 2
+
+# Recent demand decays by half every week
+DEMAND_HALF_LIFE = 7 * 24 * 3600.0
+
+class ProblemInventory:
+    """Ready-to-serve problems stored in data/inventory.json.
+    
+    Each entry holds a validated problem and both of its solutions. Entries
+    are only written to the main store when served, so serving is a file
+    read plus the normal database integration. The file is shared between
+    `generate` and the refill worker, so every change re-reads it under a
+    lock file and replaces it atomically.
+    """
+    
+    def __init__(self, data_dir: str = "data", target: int = DEFAULT_TARGET):
+        self.inventory_file = os.path.join(data_dir, "inventory.json")
+        self.lock_file = self.inventory_file + ".lock"
+        self.target = target
+        self.topics_config = MLTopicsConfig()
+        self._lock = threading.Lock()
+        os.makedirs(data_dir, exist_ok=True)
+    
+    def take(self, topic: str, difficulty: Optional[str] = None) -> Optional[Dict]:
+        """Remove and return the oldest entry for a topic, recording the demand"""
+        with self._locked() as state:
+            self._record_demand(state, topic)
+            for index, entry in enumerate(state["entries"]):
+                if entry["topic"] == topic and difficulty in (None, entry["difficulty"]):
+                    return state["entries"].pop(index)
+        return None
+    
+    def add(self, problem: Dict, full_solution: Dict, practice_solution: Dict) -> Dict:
+        """Validate a generated problem and its solutions and stock them, rejecting near-duplicates"""
+        entry = {
+            "topic": problem.get("topic", ""),
+            "difficulty": problem.get("difficulty", "medium"),
+            "added_at": datetime.now().isoformat(),
+            "problem": check_record(_to_json(problem), PROBLEM_SCHEMA),
+            "full_solution": check_record(_to_json(full_solution), SOLUTION_SCHEMA),
+            "practice_solution": check_record(_to_json(practice_solution), SOLUTION_SCHEMA)
+        }
+        with self._locked() as state:
+            # Stocked problems are not in the store's index until served
+            lsh = MinHashLSH()
+            for stocked in state["entries"]:
+                if stocked["topic"] == entry["topic"]:
+                    lsh.add(stocked["problem"]["id"], lsh.signature(problem_text(stocked["problem"])))
+            matches = lsh.query(lsh.signature(problem_text(entry["problem"])), DUPLICATE_THRESHOLD)
+            if matches:
+                raise DuplicateProblemError(
+                    entry["problem"], [{"id": key, "similarity": similarity} for key, similarity in matches]
+                )
+            state["entries"].append(entry)
+        return entry
+    
+    def counts(self) -> Dict[Tuple[str, str], int]:
+        """Stocked entries per (topic, difficulty)"""
+        counts = {}
+        for entry in self._load()["entries"]:
+            key = (entry["topic"], entry["difficulty"])
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+    
+    def demand(self, now: Optional[float] = None) -> Dict[str, float]:
+        """Decayed request counts per topic"""
+        now = time.time() if now is None else now
+        return {
+            topic: record["count"] * 0.5 ** ((now - record["updated"]) / DEMAND_HALF_LIFE)
+            for topic, record in self._load().get("demand", {}).items()
+        }
+    
+    def refill_plan(self, topics: List[str]) -> List[Tuple[float, str, str, int]]:
+        """Missing (topic, difficulty) slots as (priority, topic, difficulty, missing), most urgent first.
+        
+        A slot's priority is its shortfall weighted by how many companies list
+        the topic in COMPANY_TOPIC_PREFERENCES and by its recent demand.
+        """
+        counts = self.counts()
+        demand = self.demand()
+        companies = {}
+        for preferred in self.topics_config.COMPANY_TOPIC_PREFERENCES.values():
+            for topic in preferred:
+                companies[topic] = companies.get(topic, 0) + 1
+        
+        plan = []
+        for topic in topics:
+            weight = (1.0 + companies.get(topic, 0)) * (1.0 + math.log1p(demand.get(topic, 0.0)))
+            difficulties = self.topics_config.get_topic_metadata(topic).get("difficulty_levels") or ["medium"]
+            for difficulty in difficulties:
+                missing = self.target - counts.get((topic, difficulty), 0)
+                if missing > 0:
+                    heapq.heappush(plan, (-missing * weight, topic, difficulty, missing))
+        return [(-priority, topic, difficulty, missing)
+                for priority, topic, difficulty, missing in (heapq.heappop(plan) for _ in range(len(plan)))]
+    
+    def _record_demand(self, state: Dict, topic: str):
+        now = time.time()
+        record = state.setdefault("demand", {}).get(topic, {"count": 0.0, "updated": now})
+        decayed = record["count"] * 0.5 ** ((now - record["updated"]) / DEMAND_HALF_LIFE)
+        state["demand"][topic] = {"count": decayed + 1.0, "updated": now}
+    
+    @contextmanager
+    def _locked(self, timeout: float = 10.0):
+        """Read-modify-write the inventory under an exclusive lock file"""
+        with self._lock:
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    fd = os.open(self.lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                    break
+                except FileExistsError:
+                    # A holder that died leaves the lock behind; break it once it is stale
+                    if time.monotonic() > deadline:
+                        os.remove(self.lock_file)
+                        deadline = time.monotonic() + timeout
+                    time.sleep(0.01)
+            try:
+                state = self._load()
+                yield state
+                self._save(state)
+            finally:
+                os.close(fd)
+                os.remove(self.lock_file)
+    
+    def _load(self) -> Dict:
+        try:
+            with open(self.inventory_file, 'r') as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            state = {}
+        state.setdefault("entries", [])
+        state.setdefault("demand", {})
+        return state
+    
+    def _save(self, state: Dict):
+        temp_file = self.inventory_file + ".tmp"
+        with open(temp_file, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(temp_file, self.inventory_file)
+
+class InventoryRefiller:
+    """Background thread that generates problems for the most urgent inventory slots"""
+    
+    def __init__(self, generator, inventory: ProblemInventory, topics: List[str], interval: float = 60.0):
+        if not generator.provider:
+            raise ValueError("Refilling the inventory needs a generation provider (e.g. --provider stub)")
+        self.generator = generator
+        self.inventory = inventory
+        self.topics = topics
+        self.interval = interval
+        self.stats = {"stocked": 0, "duplicates": 0, "failed": 0}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="inventory-refill", daemon=True)
+    
+    def start(self):
+        self._thread.start()
+    
+    def stop(self, wait: bool = True):
+        self._stop.set()
+        if wait:
+            self._thread.join()
+    
+    def join(self, timeout: Optional[float] = None):
+        self._thread.join(timeout)
+    
+    def refill_once(self) -> int:
+        """Generate one problem per missing slot, most urgent first; returns how many were stocked"""
+        stocked = 0
+        for _, topic, difficulty, missing in self.inventory.refill_plan(self.topics):
+            for _ in range(missing):
+                if self._stop.is_set():
+                    return stocked
+                stocked += self._stock(topic, difficulty)
+        return stocked
+    
+    def _stock(self, topic: str, difficulty: str) -> int:
+        try:
+            problem = self.generator.generate_problem(topic, difficulty=difficulty)
+            full_solution = self.generator.generate_full_solution(problem)
+            practice_solution = self.generator.generate_practice_solution(problem, full_solution)
+            self.inventory.add(problem, full_solution, practice_solution)
+        except DuplicateProblemError:
+            self.stats["duplicates"] += 1
+            return 0
+        except Exception as e:
+            print(f"❌ Inventory refill failed for {topic}: {e}")
+            self.stats["failed"] += 1
+            return 0
+        self.stats["stocked"] += 1
+        return 1
+    
+    def _loop(self):
+        while not self._stop.is_set():
+            if not self.refill_once():
+                self._stop.wait(self.interval)
+
+def _to_json(record: Dict) -> Dict:
+    """Round-trip a record through JSON so datetimes become strings"""
+    return json.loads(json.dumps(record, default=lambda value: value.isoformat()))
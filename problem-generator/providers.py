@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Generation Providers for ML/AI Problem Generation System
+Backends that turn a rendered prompt into a model response
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+class RateLimitError(Exception):
+    """Raised by a provider when it rejects a request with HTTP 429"""
+    
+    def __init__(self, message: str = "rate limited", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class GenerationProvider:
+    """Base class for generation backends"""
+    
+    name = "base"
+    
+    def complete(self, prompt: str, stage: str, topic: str) -> str:
+        """Return the full response text for a prompt"""
+        raise NotImplementedError
+    
+    def stream(self, prompt: str, stage: str, topic: str) -> Iterator[str]:
+        """Yield the response in chunks; providers without streaming yield it whole"""
+        yield self.complete(prompt, stage, topic)
+
+class StubProvider(GenerationProvider):
+    """Local, deterministic provider for tests and dry runs.
+    
+    Responses are valid JSON built from the topic, latency is simulated with
+    an optional slow tail, and an optional server-side request limit raises
+    RateLimitError so the scheduler can be exercised without a real endpoint.
+    """
+    
+    name = "stub"
+    
+    def __init__(self, latency: float = 0.05, jitter: float = 0.5, slow_fraction: float = 0.0,
+                 slow_factor: float = 20.0, requests_per_minute: Optional[int] = None,
+                 chunk_size: int = 64, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.slow_fraction = slow_fraction
+        self.slow_factor = slow_factor
+        self.requests_per_minute = requests_per_minute
+        self.chunk_size = chunk_size
+        self.calls = 0
+        self.rejected = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window = []
+    
+    def complete(self, prompt: str, stage: str, topic: str) -> str:
+        self._admit()
+        time.sleep(self._sample_latency())
+        return json.dumps(self._response(prompt, stage, topic))
+    
+    def stream(self, prompt: str, stage: str, topic: str) -> Iterator[str]:
+        # Spread the latency over the chunks so a cancelled stream stops early
+        self._admit()
+        text = json.dumps(self._response(prompt, stage, topic))
+        chunks = [text[start:start + self.chunk_size] for start in range(0, len(text), self.chunk_size)]
+        delay = self._sample_latency() / len(chunks)
+        for chunk in chunks:
+            time.sleep(delay)
+            yield chunk
+    
+    def _admit(self):
+        """Enforce the simulated server-side requests-per-minute limit"""
+        with self._lock:
+            self.calls += 1
+            if not self.requests_per_minute:
+                return
+            now = time.monotonic()
+            self._window = [t for t in self._window if now - t < 60.0]
+            if len(self._window) >= self.requests_per_minute:
+                self.rejected += 1
+                raise RateLimitError(retry_after=60.0 - (now - self._window[0]))
+            self._window.append(now)
+    
+    def _sample_latency(self) -> float:
+        """Latency with uniform jitter and an optional slow tail"""
+        with self._lock:
+            latency = self.latency * (1.0 + self._random.uniform(-self.jitter, self.jitter))
+            if self._random.random() < self.slow_fraction:
+                latency *= self.slow_factor
+            return latency
+    
+    def _response(self, prompt: str, stage: str, topic: str) -> Dict:
+        """Build a schema-valid record for the requested stage"""
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+        name = topic.replace("-", "_").replace(" ", "_")
+        if stage == "problem":
+            return {
+                "title": f"{topic.title()} ({digest})",
+                "description": f"Implement {topic} from scratch in Python.",
+                "difficulty": "medium",
+                "categories": ["coding"],
+                "tags": [topic, "llm"],
+                "examples": [{"input": f"{name}(x)", "output": "result", "explanation": "stub example"}],
+                "constraints": ["1 <= len(x) <= 10^4"],
+                "function_signature": f"def {name}(x):"
+            }
+        return {
+            "title": "Practice Python Solution" if stage == "practice_solution" else "Complete Python Solution",
+            "code": f"```python\ndef {name}(x):\n    \"\"\"Stub solution for {topic}.\"\"\"\n    return x\n```",
+            "explanation": f"Stub {stage} for {topic}.",
+            "time_complexity": "O(n)",
+            "space_complexity": "O(1)"
+        }
+
+PROVIDERS = {
+    "stub": StubProvider
+}
+
+def get_provider(name: str, **options) -> Optional[GenerationProvider]:
+    """Create a provider by name; 'manual' means copy-paste through Cursor's AI"""
+    if name in (None, "manual"):
+        return None
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown provider '{name}'. Available: manual, {', '.join(PROVIDERS)}")
+    return PROVIDERS[name](**options)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Staged Publishing for ML/AI Problem Generation System
+Builds generated files in a staging directory and swaps them in as a numbered generation
+"""
+
+import errno
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+from typing import Dict, List
+
+from integration_manifest import file_stamp
+
+PUBLISH_STATE_FILE = "publish_state.json"
+STAGING_DIR = "staging"
+
+# Files other published files point at (content-addressed shards) are swapped in first
+PHASE_REFERENCED = 0
+PHASE_DEFAULT = 1
+
+class Publisher:
+    """One publish generation: staged writes, then a file-by-file swap.
+    
+    Builders write each output to the path `stage()` hands them instead of
+    its destination, from as many threads as they like. Nothing outside the
+    staging directory changes until `commit()`, which renames every staged
+    file over its destination, referenced files first, deletes files the
+    generation retired, and only then records the new generation number.
+    
+    Each rename is atomic, so no reader ever sees a partial file, but the
+    swap as a whole is not: while it runs, or after a crash part-way
+    through, readers can see a new module next to an old one. The outputs
+    live where the frontend and backend import them, so there is no single
+    pointer to flip. A crash mid-swap leaves the previous generation number
+    and unsaved manifests, so the next publish rebuilds and swaps in the
+    rest. A build that fails is dropped with `abort()`; a run that dies
+    mid-build leaves only a staging directory, which the next `begin()`
+    clears.
+    """
+    
+    def __init__(self, data_dir: str):
+        self.staging_root = os.path.join(data_dir, STAGING_DIR)
+        self.state_file = os.path.join(data_dir, PUBLISH_STATE_FILE)
+        self.state = self._load()
+        self.generation = None
+        self.staging_dir = None
+        self._staged: Dict[str, tuple] = {}
+        self._retired: List[str] = []
+        self._lock = threading.Lock()
+    
+    def begin(self) -> int:
+        """Start the next generation and return its number"""
+        shutil.rmtree(self.staging_root, ignore_errors=True)
+        self.generation = self.state.get("generation", 0) + 1
+        self.staging_dir = os.path.join(self.staging_root, f"gen-{self.generation}")
+        os.makedirs(self.staging_dir)
+        return self.generation
+    
+    def stage(self, destination: str, phase: int = PHASE_DEFAULT) -> str:
+        """The staging path to write `destination`'s new content to"""
+        with self._lock:
+            entry = self._staged.get(destination)
+            if entry is None:
+                staged = os.path.join(self.staging_dir, f"{len(self._staged):06d}-{os.path.basename(destination)}")
+                entry = self._staged[destination] = (staged, phase)
+            return entry[0]
+    
+    def locate(self, destination: str) -> str:
+        """Where `destination`'s newest content is: its staged copy if this generation wrote one"""
+        entry = self._staged.get(destination)
+        if entry is not None and os.path.exists(entry[0]):
+            return entry[0]
+        return destination
+    
+    def retire(self, destination: str):
+        """Delete `destination` once the generation is in place"""
+        with self._lock:
+            self._retired.append(destination)
+    
+    def has_changes(self) -> bool:
+        """Whether the generation staged or retired anything"""
+        return bool(self._retired) or any(os.path.exists(staged) for staged, _ in self._staged.values())
+    
+    def commit(self) -> Dict:
+        """Swap every staged file in, delete retired ones and record the generation"""
+        changed = []
+        for destination, (staged, _) in sorted(self._staged.items(), key=lambda item: item[1][1]):
+            if not os.path.exists(staged):
+                continue
+            directory = os.path.dirname(destination)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            _move(staged, destination)
+            changed.append(destination)
+        
+        retired = 0
+        for destination in self._retired:
+            if destination in self._staged:
+                continue
+            try:
+                os.remove(destination)
+                retired += 1
+            except FileNotFoundError:
+                pass
+        
+        self.state = {
+            "generation": self.generation,
+            "published_at": datetime.now().isoformat(),
+            "changed": {destination: file_stamp(destination) for destination in changed},
+            "retired": retired
+        }
+        temp_file = self.state_file + ".tmp"
+        with open(temp_file, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(temp_file, self.state_file)
+        self._clear_staging()
+        return self.state
+    
+    def abort(self):
+        self._clear_staging()
+        self._staged.clear()
+        self._retired.clear()
+    
+    def _clear_staging(self):
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+        try:
+            os.rmdir(self.staging_root)
+        except OSError:
+            pass
+    
+    def _load(self) -> Dict:
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+def _move(source: str, destination: str):
+    """Atomically replace `destination`, copying first when the two are on different filesystems"""
+    try:
+        os.replace(source, destination)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        temp_file = f"{destination}.{os.getpid()}.tmp"
+        # copy2 keeps the mtime, so stat stamps taken of the staged file still hold
+        shutil.copy2(source, temp_file)
+        os.replace(temp_file, destination)
+        os.remove(source)
@@ -0,0 +1,534 @@
+#!/usr/bin/env python3
+"""
+Read API for ML/AI Problem Generation System
+Asyncio HTTP/1.1 service over DataManager's read index, with a load-test client
+"""
+
+import argparse
+import asyncio
+import base64
+import binascii
+import gzip
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from collections import OrderedDict
+from email.utils import formatdate
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from data_manager import DataManager
+from metrics import API_REQUESTS, REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from read_index import FACETS, ReadIndex, page
+
+DEFAULT_PORT = 8077
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+# Smaller bodies are not worth a gzip member header and the CPU
+GZIP_MIN_SIZE = 1024
+MAX_HEADER_BYTES = 16384
+
+SUMMARY_FIELDS = ("id", "title", "difficulty", "company", "topic", "categories", "tags", "status")
+
+REASONS = {
+    200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    431: "Request Header Fields Too Large", 500: "Internal Server Error", 501: "Not Implemented"
+}
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+class Representation:
+    """An encoded response body with its strong ETag; the gzip form is made on first request"""
+    
+    __slots__ = ("status", "body", "etag", "content_type", "_gzipped")
+    
+    def __init__(self, status: int, body: bytes, content_type: str = "application/json; charset=utf-8"):
+        self.status = status
+        self.body = body
+        self.content_type = content_type
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self._gzipped = None
+    
+    def gzipped(self) -> Tuple[bytes, str]:
+        if self._gzipped is None:
+            # mtime=0 keeps the bytes, and so the gzip ETag, stable across processes
+            self._gzipped = gzip.compress(self.body, compresslevel=6, mtime=0)
+        return self._gzipped, self.etag[:-1] + '-gzip"'
+
+def encode_cursor(ordinal: int, record_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{ordinal}:{record_id}".encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, positions: Dict[str, int]) -> int:
+    """The ordinal to continue after; follows the record if earlier records were deleted"""
+    try:
+        ordinal, record_id = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8").split(":", 1)
+        ordinal = int(ordinal)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ApiError(400, "Invalid cursor")
+    return positions.get(record_id, ordinal)
+
+def accepts_gzip(header: Optional[str]) -> bool:
+    """Whether an Accept-Encoding header allows gzip (honouring q=0 and the * wildcard)"""
+    if not header:
+        return False
+    wildcard = False
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding in ("gzip", "x-gzip"):
+            return quality > 0
+        if coding == "*":
+            wildcard = quality > 0
+    return wildcard
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """If-None-Match uses the weak comparison, so W/ prefixes are ignored"""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == etag:
+            return True
+    return False
+
+class ReadApi:
+    """Routes GET requests to JSON views of the current ReadIndex.
+    
+    The store is re-checked at most once per `refresh_interval` seconds, in
+    the default executor so a rebuild never stalls the event loop. Encoded
+    responses are cached per (store version, path, query), so a repeated
+    request costs a dict lookup; the cache empties itself when the version
+    moves, as every key carries the version.
+    """
+    
+    def __init__(self, data_manager: DataManager, refresh_interval: float = 1.0, cache_size: int = 2048):
+        self.data_manager = data_manager
+        self.refresh_interval = refresh_interval
+        self.cache_size = cache_size
+        self._index: Optional[ReadIndex] = None
+        self._checked_at = 0.0
+        self._refresh_lock = asyncio.Lock()
+        self._cache: "OrderedDict[Tuple, _CacheEntry]" = OrderedDict()
+    
+    async def current_index(self) -> ReadIndex:
+        if self._index is not None and time.monotonic() - self._checked_at < self.refresh_interval:
+            return self._index
+        async with self._refresh_lock:
+            if self._index is None or time.monotonic() - self._checked_at >= self.refresh_interval:
+                loop = asyncio.get_running_loop()
+                self._index = await loop.run_in_executor(None, self.data_manager.get_read_index)
+                self._checked_at = time.monotonic()
+        return self._index
+    
+    async def respond(self, target: str) -> Tuple[str, Representation]:
+        """The route name and representation for a request target"""
+        parts = urlsplit(target)
+        path = unquote(parts.path).rstrip("/") or "/"
+        query = dict(parse_qsl(parts.query, keep_blank_values=True))
+        if path == "/metrics":
+            return "metrics", Representation(200, REGISTRY.render().encode("utf-8"), METRICS_CONTENT_TYPE)
+        
+        index = await self.current_index()
+        key = (index.version, path, tuple(sorted(query.items())))
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached.route, cached.representation
+        
+        route = "unknown"
+        try:
+            route, payload = self.route(index, path, query)
+            representation = Representation(200, _dumps(payload))
+        except ApiError as e:
+            representation = Representation(e.status, _dumps({"error": str(e)}))
+        entry = _CacheEntry(route, representation)
+        self._cache[key] = entry
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return route, representation
+    
+    def route(self, index: ReadIndex, path: str, query: Dict[str, str]) -> Tuple[str, Dict]:
+        segments = path.strip("/").split("/") if path != "/" else []
+        if segments == ["problems"]:
+            return "problems", self._list_problems(index, query)
+        if segments == ["search"]:
+            if not query.get("q", "").strip():
+                raise ApiError(400, "Missing q")
+            return "search", self._list_problems(index, dict({"view": "summary"}, **query))
+        if len(segments) == 2 and segments[0] == "problems":
+            return "problem", {"problem": self._problem(index, segments[1]),
+                               "solution_ids": [index.solutions[ordinal]["id"]
+                                                for ordinal in index.solutions_by_problem.get(segments[1], [])]}
+        if len(segments) == 3 and segments[0] == "problems" and segments[2] == "solutions":
+            self._problem(index, segments[1])
+            return "problem_solutions", {"items": [index.solutions[ordinal]
+                                                   for ordinal in index.solutions_by_problem.get(segments[1], [])]}
+        if segments == ["solutions"]:
+            return "solutions", self._list_solutions(index, query)
+        if len(segments) == 2 and segments[0] == "solutions":
+            ordinal = index.solution_position.get(segments[1])
+            if ordinal is None:
+                raise ApiError(404, f"Solution {segments[1]} not found")
+            return "solution", {"solution": index.solutions[ordinal]}
+        if segments == ["filters"]:
+            return "filters", {"facets": index.facet_counts()}
+        if segments == ["stats"]:
+            return "stats", index.statistics()
+        if segments in ([], ["healthz"]):
+            return "health", {"status": "ok", "problems": len(index.problems), "solutions": len(index.solutions)}
+        raise ApiError(404, f"No route for {path}")
+    
+    def _problem(self, index: ReadIndex, problem_id: str) -> Dict:
+        ordinal = index.position.get(problem_id)
+        if ordinal is None:
+            raise ApiError(404, f"Problem {problem_id} not found")
+        return index.problems[ordinal]
+    
+    def _list_problems(self, index: ReadIndex, query: Dict[str, str]) -> Dict:
+        filters = {}
+        for name in FACETS:
+            if query.get(name):
+                filters[name] = query[name]
+        ordinals = index.filter(filters)
+        if query.get("q", "").strip():
+            matches = index.search(query["q"])
+            if ordinals is not None:
+                members = set(matches)
+                matches = [ordinal for ordinal in ordinals if ordinal in members]
+            ordinals = matches
+        if ordinals is None:
+            ordinals = range(len(index.problems))
+        limit = _limit(query)
+        after = decode_cursor(query["cursor"], index.position) if query.get("cursor") else -1
+        selected, next_after = page(ordinals, after, limit)
+        view = query.get("view", "full")
+        if view not in ("full", "summary"):
+            raise ApiError(400, "view must be 'full' or 'summary'")
+        items = [index.problems[ordinal] for ordinal in selected]
+        if view == "summary":
+            items = [{field: item.get(field) for field in SUMMARY_FIELDS} for item in items]
+        return {
+            "items": items,
+            "total": len(ordinals),
+            "next_cursor": encode_cursor(next_after, index.problems[next_after]["id"]) if next_after is not None else None
+        }
+    
+    def _list_solutions(self, index: ReadIndex, query: Dict[str, str]) -> Dict:
+        if query.get("problem_id"):
+            ordinals = index.solutions_by_problem.get(query["problem_id"], [])
+        else:
+            ordinals = range(len(index.solutions))
+        limit = _limit(query)
+        after = decode_cursor(query["cursor"], index.solution_position) if query.get("cursor") else -1
+        selected, next_after = page(ordinals, after, limit)
+        return {
+            "items": [index.solutions[ordinal] for ordinal in selected],
+            "total": len(ordinals),
+            "next_cursor": encode_cursor(next_after, index.solutions[next_after]["id"]) if next_after is not None else None
+        }
+
+class _CacheEntry:
+    __slots__ = ("route", "representation")
+    
+    def __init__(self, route: str, representation: Representation):
+        self.route = route
+        self.representation = representation
+
+def _limit(query: Dict[str, str]) -> int:
+    try:
+        limit = int(query.get("limit", DEFAULT_LIMIT))
+    except ValueError:
+        raise ApiError(400, "limit must be an integer")
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ApiError(400, f"limit must be between 1 and {MAX_LIMIT}")
+    return limit
+
+def _dumps(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class _HttpDate:
+    """The Date header value, formatted once per second"""
+    
+    def __init__(self):
+        self._second = None
+        self._value = ""
+    
+    def now(self) -> str:
+        second = int(time.time())
+        if second != self._second:
+            self._second = second
+            self._value = formatdate(second, usegmt=True)
+        return self._value
+
+class ReadApiServer:
+    """HTTP/1.1 over asyncio streams: GET/HEAD only, keep-alive with pipelining, no request bodies"""
+    
+    def __init__(self, api: ReadApi, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 keepalive_timeout: float = 15.0, backlog: int = 2048):
+        self.api = api
+        self.host = host
+        self.port = port
+        self.keepalive_timeout = keepalive_timeout
+        self.backlog = backlog
+        self._date = _HttpDate()
+        self._server = None
+    
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, backlog=self.backlog,
+                                                  limit=MAX_HEADER_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+    
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+    
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.keepalive_timeout)
+                except asyncio.LimitOverrunError:
+                    self._write_error(writer, 431, "Request headers too large", keep_alive=False)
+                    break
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                keep_alive = await self._handle_request(head, reader, writer)
+                # Only wait for the socket to drain when its buffer is past the high-water mark
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+    
+    async def _handle_request(self, head: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            self._write_error(writer, 400, "Malformed request line", keep_alive=False)
+            return False
+        headers = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(":")
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+        
+        connection = headers.get("connection", "").lower()
+        keep_alive = "keep-alive" in connection if version == "HTTP/1.0" else "close" not in connection
+        if "transfer-encoding" in headers:
+            self._write_error(writer, 501, "Request bodies are not supported", keep_alive=False)
+            return False
+        length = headers.get("content-length")
+        if length:
+            try:
+                await reader.readexactly(int(length))
+            except (ValueError, asyncio.IncompleteReadError):
+                return False
+        if method not in ("GET", "HEAD"):
+            self._write_error(writer, 405, f"{method} is not allowed", keep_alive, extra=[("Allow", "GET, HEAD")])
+            API_REQUESTS.inc(route="unknown", status="405")
+            return keep_alive
+        
+        try:
+            route, representation = await self.api.respond(target)
+        except Exception as e:
+            self._write_error(writer, 500, f"{type(e).__name__}: {e}", keep_alive=False)
+            API_REQUESTS.inc(route="unknown", status="500")
+            return False
+        
+        body, etag = representation.body, representation.etag
+        encoded = False
+        if len(body) >= GZIP_MIN_SIZE and accepts_gzip(headers.get("accept-encoding")):
+            body, etag = representation.gzipped()
+            encoded = True
+        status = representation.status
+        if status == 200 and etag_matches(headers.get("if-none-match"), etag):
+            status = 304
+        
+        extra = [("ETag", etag), ("Vary", "Accept-Encoding"), ("Cache-Control", "no-cache")]
+        if encoded:
+            extra.append(("Content-Encoding", "gzip"))
+        if status == 304:
+            self._write_head(writer, 304, None, None, keep_alive, extra)
+        else:
+            self._write_head(writer, status, representation.content_type, len(body), keep_alive, extra)
+            if method == "GET":
+                writer.write(body)
+        API_REQUESTS.inc(route=route, status=str(status))
+        return keep_alive
+    
+    def _write_head(self, writer, status: int, content_type: Optional[str], length: Optional[int],
+                    keep_alive: bool, extra: List[Tuple[str, str]]):
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}", f"Date: {self._date.now()}"]
+        if content_type:
+            lines.append(f"Content-Type: {content_type}")
+        if length is not None:
+            lines.append(f"Content-Length: {length}")
+        lines.extend(f"{name}: {value}" for name, value in extra)
+        if keep_alive:
+            lines.append("Connection: keep-alive")
+            lines.append(f"Keep-Alive: timeout={int(self.keepalive_timeout)}")
+        else:
+            lines.append("Connection: close")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+    
+    def _write_error(self, writer, status: int, message: str, keep_alive: bool, extra: List = ()):
+        body = _dumps({"error": message})
+        self._write_head(writer, status, "application/json; charset=utf-8", len(body), keep_alive, list(extra))
+        writer.write(body)
+
+async def _serve(args):
+    api = ReadApi(DataManager(args.data_dir), refresh_interval=args.refresh)
+    server = await ReadApiServer(api, args.host, args.port, keepalive_timeout=args.keepalive).start()
+    index = await api.current_index()
+    print(f"🌐 Serving {len(index.problems)} problems and {len(index.solutions)} solutions "
+          f"on http://{args.host}:{server.port}")
+    await server.serve_forever()
+
+def serve(args):
+    """Run the read API until interrupted"""
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        print("\n👋 Read API stopped")
+
+# Load test
+
+BENCH_PATHS = ("/problems?limit=20&view=summary", "/stats", "/filters", "/search?q=att", "/problems?limit=50")
+
+async def _bench_connection(host: str, port: int, paths: List[str], deadline: float, conditional: bool,
+                            results: Dict):
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        results["connect_errors"] += 1
+        return
+    etags = {}
+    latencies = results["latencies"]
+    turn = 0
+    try:
+        while time.monotonic() < deadline:
+            path = paths[turn % len(paths)]
+            turn += 1
+            request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept-Encoding: gzip\r\n"
+            if conditional and path in etags:
+                request += f"If-None-Match: {etags[path]}\r\n"
+            started = time.perf_counter()
+            writer.write((request + "\r\n").encode("latin-1"))
+            head = await reader.readuntil(b"\r\n\r\n")
+            status = int(head[9:12])
+            length = 0
+            for line in head.split(b"\r\n")[1:]:
+                name, _, value = line.partition(b":")
+                name = name.lower()
+                if name == b"content-length":
+                    length = int(value)
+                elif name == b"etag":
+                    etags[path] = value.strip().decode("latin-1")
+            if length:
+                await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+            results["bytes"] += len(head) + length
+            results["statuses"][status] = results["statuses"].get(status, 0) + 1
+    except (asyncio.IncompleteReadError, ConnectionError):
+        results["errors"] += 1
+    finally:
+        writer.close()
+
+async def _bench_async(host: str, port: int, connections: int, duration: float, paths: List[str],
+                       conditional: bool) -> Dict:
+    results = {"latencies": [], "bytes": 0, "statuses": {}, "errors": 0, "connect_errors": 0}
+    started = time.monotonic()
+    deadline = started + duration
+    await asyncio.gather(*[
+        _bench_connection(host, port, paths, deadline, conditional, results) for _ in range(connections)
+    ])
+    results["elapsed"] = time.monotonic() - started
+    return results
+
+def _bench_worker(arguments) -> Dict:
+    return asyncio.run(_bench_async(*arguments))
+
+def bench(args):
+    """Hold --connections keep-alive connections open against a running server and report throughput"""
+    paths = args.path or list(BENCH_PATHS)
+    processes = max(1, args.processes)
+    shares = [args.connections // processes + (i < args.connections % processes) for i in range(processes)]
+    work = [(args.host, args.port, share, args.duration, paths, args.conditional) for share in shares if share]
+    print(f"🔥 {args.connections} connections over {len(work)} client process(es) for {args.duration:.0f}s "
+          f"against http://{args.host}:{args.port}")
+    if len(work) == 1:
+        parts = [_bench_worker(work[0])]
+    else:
+        with multiprocessing.Pool(len(work)) as pool:
+            parts = pool.map(_bench_worker, work)
+    
+    latencies = sorted(latency for part in parts for latency in part["latencies"])
+    elapsed = max(part["elapsed"] for part in parts)
+    statuses = {}
+    for part in parts:
+        for status, count in part["statuses"].items():
+            statuses[status] = statuses.get(status, 0) + count
+    if not latencies:
+        print("❌ No requests completed")
+        return
+    percentile = lambda p: latencies[min(len(latencies) - 1, max(0, -(-len(latencies) * p // 100) - 1))] * 1000
+    print(f"✅ {len(latencies)} requests in {elapsed:.1f}s: {len(latencies) / elapsed:,.0f} req/s, "
+          f"{sum(part['bytes'] for part in parts) / elapsed / 1e6:.1f} MB/s")
+    print(f"   latency p50 {percentile(50):.1f}ms  p95 {percentile(95):.1f}ms  p99 {percentile(99):.1f}ms  "
+          f"max {latencies[-1] * 1000:.1f}ms")
+    print(f"   statuses {dict(sorted(statuses.items()))}  errors {sum(part['errors'] for part in parts)}  "
+          f"connect errors {sum(part['connect_errors'] for part in parts)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Read API over the generated problem store")
+    subparsers = parser.add_subparsers(dest='command', help='Available commands')
+    
+    serve_parser = subparsers.add_parser('serve', help='Serve problems, solutions, filters, search and stats')
+    serve_parser.add_argument('--host', default='127.0.0.1', help='Interface to bind (default: 127.0.0.1)')
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port (default: {DEFAULT_PORT})')
+    serve_parser.add_argument('--data-dir', default='data', help='DataManager directory (default: data)')
+    serve_parser.add_argument('--refresh', type=float, default=1.0,
+                              help='Seconds between checks for store changes (default: 1)')
+    serve_parser.add_argument('--keepalive', type=float, default=15.0,
+                              help='Idle seconds before a keep-alive connection is closed (default: 15)')
+    serve_parser.set_defaults(func=serve)
+    
+    bench_parser = subparsers.add_parser('bench', help='Load-test a running read API')
+    bench_parser.add_argument('--host', default='127.0.0.1', help='Server host (default: 127.0.0.1)')
+    bench_parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Server port (default: {DEFAULT_PORT})')
+    bench_parser.add_argument('--connections', type=int, default=1000, help='Concurrent connections (default: 1000)')
+    bench_parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run (default: 10)')
+    bench_parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                              help='Client processes sharing the connections (default: CPU count)')
+    bench_parser.add_argument('--path', action='append', help='Request path to cycle through (repeatable)')
+    bench_parser.add_argument('--conditional', action='store_true',
+                              help='Revalidate with If-None-Match after the first response per path')
+    bench_parser.set_defaults(func=bench)
+    
+    args = parser.parse_args()
+    if not args.command:
+        parser.print_help()
+        return
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
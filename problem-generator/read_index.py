@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Read Index for ML/AI Problem Generation System
+In-memory lookups, facets and term postings over one version of the store
+"""
+
+import bisect
+from typing import Dict, List, Optional, Tuple
+
+from search_index import document_terms, tokenize
+
+# Query parameters the problem listing can filter on, and the field each reads
+FACETS = {
+    "difficulty": "difficulty",
+    "company": "company",
+    "topic": "topic",
+    "tag": "tags",
+    "category": "categories",
+    "status": "status"
+}
+
+class ReadIndex:
+    """Everything the read paths need, built once per store version.
+    
+    Problems keep their store order and are referred to by ordinal; each
+    facet value and each title/tag/company term maps to a sorted ordinal
+    list, so filters are list intersections and a page is a bisect into
+    the result. Instances are never mutated after construction, so readers
+    can share one without locking.
+    """
+    
+    def __init__(self, version: Tuple, problems: List[Dict], solutions: List[Dict], metadata: Dict,
+                 solution_refs: Dict[str, List[str]]):
+        self.version = version
+        self.problems = problems
+        self.solutions = solutions
+        self.position = {problem["id"]: ordinal for ordinal, problem in enumerate(problems)}
+        self.solution_position = {solution["id"]: ordinal for ordinal, solution in enumerate(solutions)}
+        self.last_updated = metadata.get("last_updated")
+        
+        # Ordinals rather than records, from DataManager's joined view
+        self.solutions_by_problem: Dict[str, List[int]] = {
+            problem_id: [self.solution_position[solution_id] for solution_id in solution_ids
+                         if solution_id in self.solution_position]
+            for problem_id, solution_ids in solution_refs.items()
+        }
+        
+        self.facets: Dict[str, Dict[str, List[int]]] = {name: {} for name in FACETS}
+        self.labels: Dict[str, Dict[str, str]] = {name: {} for name in FACETS}
+        postings: Dict[str, List[int]] = {}
+        for ordinal, problem in enumerate(problems):
+            for name, field in FACETS.items():
+                values = problem.get(field)
+                for value in values if isinstance(values, list) else [values]:
+                    if not value:
+                        continue
+                    key = str(value).lower()
+                    self.facets[name].setdefault(key, []).append(ordinal)
+                    self.labels[name].setdefault(key, str(value))
+            for term in document_terms(problem):
+                postings.setdefault(term, []).append(ordinal)
+        self.terms = sorted(postings)
+        self.postings = [postings[term] for term in self.terms]
+    
+    def filter(self, filters: Dict[str, str]) -> Optional[List[int]]:
+        """Sorted ordinals matching every facet filter, or None when there are no filters"""
+        result = None
+        for name, value in filters.items():
+            ordinals = self.facets[name].get(value.lower(), [])
+            result = ordinals if result is None else _intersect(result, ordinals)
+        return result
+    
+    def search(self, query: str) -> List[int]:
+        """Sorted ordinals of problems where every query word prefixes a title word, tag or company"""
+        result = None
+        for word in tokenize(query):
+            start = bisect.bisect_left(self.terms, word)
+            matches = set()
+            for index in range(start, len(self.terms)):
+                if not self.terms[index].startswith(word):
+                    break
+                matches.update(self.postings[index])
+            ordinals = sorted(matches)
+            result = ordinals if result is None else _intersect(result, ordinals)
+            if not result:
+                break
+        return result or []
+    
+    def facet_counts(self) -> Dict[str, Dict[str, int]]:
+        return {
+            name: dict(sorted(((self.labels[name][key], len(ordinals)) for key, ordinals in values.items()),
+                              key=lambda item: (-item[1], item[0])))
+            for name, values in self.facets.items()
+        }
+    
+    def statistics(self) -> Dict:
+        counts = self.facet_counts()
+        return {
+            "total_problems": len(self.problems),
+            "total_solutions": len(self.solutions),
+            "problems_by_difficulty": counts["difficulty"],
+            "problems_by_company": counts["company"],
+            "problems_with_solutions": sum(1 for problem_id in self.solutions_by_problem if problem_id in self.position),
+            "last_updated": self.last_updated
+        }
+
+def _intersect(left: List[int], right: List[int]) -> List[int]:
+    if len(left) > len(right):
+        left, right = right, left
+    members = set(right)
+    return [ordinal for ordinal in left if ordinal in members]
+
+def page(ordinals: List[int], after: int, limit: int) -> Tuple[List[int], Optional[int]]:
+    """Up to `limit` ordinals greater than `after`, plus the ordinal to continue after (None at the end)"""
+    start = bisect.bisect_right(ordinals, after)
+    selected = ordinals[start:start + limit]
+    more = start + limit < len(ordinals)
+    return selected, (selected[-1] if more and selected else None)
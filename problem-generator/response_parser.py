@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Streaming Response Parser for ML/AI Problem Generation System
+Parses model JSON responses incrementally and rejects malformed output early
+"""
+
+import json
+import re
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Fields every generated record must contain, with the JSON type they must have
+PROBLEM_REQUIRED_FIELDS = {
+    "title": str,
+    "description": str,
+    "examples": list,
+    "constraints": list
+}
+
+SOLUTION_REQUIRED_FIELDS = {
+    "title": str,
+    "code": str
+}
+
+# Characters that change parser state outside and inside a JSON string
+_STRUCTURAL = re.compile(r'[{}\[\]",:]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+# Models often wrap the JSON in a markdown fence; allow it before the object
+_PREFIX = re.compile(r'\s*(`{0,3}|```\w*\s*)')
+
+class MalformedResponseError(ValueError):
+    """Raised as soon as a streamed response can no longer become a valid record"""
+
+class StreamingJSONParser:
+    """Incremental parser for a single top-level JSON object.
+    
+    Chunks are scanned once, jumping between structurally significant
+    characters. Each top-level value is type-checked as soon as its first
+    character arrives and decoded as soon as it ends, so a wrong-typed or
+    missing field is reported before the rest of the response is generated.
+    """
+    
+    def __init__(self, required_fields: Dict[str, type]):
+        self.required_fields = required_fields
+        self.result = {}
+        self.done = False
+        self.chars_consumed = 0
+        
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._expect = "object"
+        self._prefix = ""
+        self._segment = []
+        self._current_key = None
+    
+    def feed(self, chunk: str) -> List[str]:
+        """Consume a chunk and return the top-level fields completed by it"""
+        completed = []
+        pos = 0
+        seg_start = 0
+        length = len(chunk)
+        
+        while pos < length and not self.done:
+            if self._in_string:
+                pos = self._skip_string(chunk, pos)
+                continue
+            
+            match = _STRUCTURAL.search(chunk, pos)
+            end = match.start() if match else length
+            if end > pos:
+                self._check_text(chunk[pos:end])
+            if not match:
+                pos = length
+                break
+            
+            char = match.group()
+            pos = end + 1
+            top_level = len(self._stack) == 1
+            
+            if char == '"':
+                if top_level and self._expect == "value":
+                    self._check_value_start('"')
+                self._in_string = True
+            elif char in "{[":
+                if not self._stack:
+                    if char != "{":
+                        raise MalformedResponseError("Expected a JSON object, got an array")
+                    self._expect = "key"
+                    seg_start = pos
+                elif top_level:
+                    if self._expect != "value":
+                        raise MalformedResponseError(f"Unexpected {char!r} where a field name was expected")
+                    self._check_value_start(char)
+                self._stack.append(char)
+            elif char in "}]":
+                opener = self._stack.pop() if self._stack else None
+                if (opener, char) not in (("{", "}"), ("[", "]")):
+                    raise MalformedResponseError(f"Unbalanced {char!r} in response")
+                if not self._stack:
+                    key = self._end_segment(chunk[seg_start:end])
+                    if key:
+                        completed.append(key)
+                    self._finish()
+            elif top_level and char == ":":
+                if self._expect != "colon":
+                    raise MalformedResponseError("Unexpected ':' in response")
+                self._current_key = self._decode_segment(chunk[seg_start:end], "field name")
+                if not isinstance(self._current_key, str):
+                    raise MalformedResponseError("Field names must be strings")
+                self._expect = "value"
+                seg_start = pos
+            elif top_level and char == ",":
+                key = self._end_segment(chunk[seg_start:end])
+                if key:
+                    completed.append(key)
+                self._expect = "key"
+                seg_start = pos
+        
+        if self._stack and seg_start < pos:
+            self._segment.append(chunk[seg_start:pos])
+        self.chars_consumed += pos
+        return completed
+    
+    def close(self) -> Dict:
+        """Finish parsing and return the decoded object"""
+        if not self.done:
+            raise MalformedResponseError("Response ended before the JSON object was closed")
+        return self.result
+    
+    def _skip_string(self, chunk: str, pos: int) -> int:
+        """Advance through string contents, returning the position after them"""
+        if self._escape:
+            self._escape = False
+            return pos + 1
+        
+        match = _STRING_SPECIAL.search(chunk, pos)
+        if not match:
+            return len(chunk)
+        if match.group() == "\\":
+            self._escape = True
+        else:
+            self._in_string = False
+            if len(self._stack) == 1 and self._expect == "key":
+                self._expect = "colon"
+        return match.end()
+    
+    def _check_text(self, text: str):
+        """Validate literal text between two structural characters"""
+        if not self._stack:
+            self._prefix += text
+            if not _PREFIX.fullmatch(self._prefix):
+                raise MalformedResponseError(f"Expected a JSON object, got {self._prefix.strip()[:40]!r}")
+        elif len(self._stack) == 1:
+            stripped = text.strip()
+            if not stripped:
+                return
+            if self._expect == "value":
+                self._check_value_start(stripped[0])
+            else:
+                raise MalformedResponseError(f"Unexpected text {stripped[:40]!r} between fields")
+    
+    def _check_value_start(self, first: str):
+        """Reject a required field as soon as its value starts with the wrong type"""
+        expected = self.required_fields.get(self._current_key)
+        if expected is None or self._expect != "value":
+            return
+        actual = {'"': str, "[": list, "{": dict}.get(first)
+        if actual is not expected:
+            raise MalformedResponseError(f"Field '{self._current_key}' should be {expected.__name__}")
+        self._expect = "value_checked"
+    
+    def _end_segment(self, tail: str) -> Optional[str]:
+        """Decode the top-level value that just ended, returning its field name"""
+        if self._expect == "key":
+            # Empty object or trailing comma; nothing to decode
+            self._segment = []
+            return None
+        if self._expect not in ("value", "value_checked"):
+            raise MalformedResponseError("Field name without a value")
+        
+        key = self._current_key
+        value = self._decode_segment(tail, f"field '{key}'")
+        expected = self.required_fields.get(key)
+        if expected is not None:
+            if not isinstance(value, expected):
+                raise MalformedResponseError(
+                    f"Field '{key}' should be {expected.__name__}, got {type(value).__name__}"
+                )
+            if not value:
+                raise MalformedResponseError(f"Field '{key}' is empty")
+        
+        self.result[key] = value
+        self._current_key = None
+        return key
+    
+    def _decode_segment(self, tail: str, what: str):
+        """Join buffered text for the current segment and decode it"""
+        self._segment.append(tail)
+        raw = "".join(self._segment)
+        self._segment = []
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise MalformedResponseError(f"Invalid JSON in {what}: {e.msg}")
+    
+    def _finish(self):
+        """Close the top-level object and check that nothing required is missing"""
+        missing = [field for field in self.required_fields if field not in self.result]
+        if missing:
+            raise MalformedResponseError(f"Missing required fields: {', '.join(missing)}")
+        self.done = True
+
+class ParsedResponse:
+    """A response read off a stream together with the record parsed from it"""
+    
+    __slots__ = ("text", "record")
+    
+    def __init__(self, text: str, record: Dict):
+        self.text = text
+        self.record = record
+
+class StreamingResponseHandler:
+    """Feeds a chunked model response through the parser and cancels it early.
+    
+    The stream is cancelled as soon as it is known to be malformed, and also
+    once the object has closed, since any remaining tokens are wasted.
+    """
+    
+    def __init__(self, required_fields: Dict[str, type], cancel: Optional[Callable[[], None]] = None):
+        self.parser = StreamingJSONParser(required_fields)
+        self.cancel = cancel
+        self.cancelled = False
+        self.fields_seen = []
+    
+    def feed(self, chunk: str) -> bool:
+        """Consume one chunk; True once the object is complete and the rest can be dropped"""
+        self.fields_seen.extend(self.parser.feed(chunk))
+        return self.parser.done
+    
+    def consume(self, chunks: Iterable[str]) -> Dict:
+        """Consume chunks until the object is complete and return it"""
+        iterator = iter(chunks)
+        for chunk in iterator:
+            try:
+                done = self.feed(chunk)
+            except MalformedResponseError:
+                self._cancel(iterator)
+                raise
+            if done:
+                self._cancel(iterator)
+                break
+        return self.parser.close()
+    
+    def _cancel(self, iterator):
+        """Stop the underlying request"""
+        self.cancelled = True
+        if self.cancel:
+            self.cancel()
+        elif hasattr(iterator, "close"):
+            iterator.close()
+
+def parse_response(response, required_fields: Dict[str, type]) -> Dict:
+    """Parse a complete response string or an iterable of streamed chunks"""
+    chunks = [response] if isinstance(response, str) else response
+    return StreamingResponseHandler(required_fields).consume(chunks)
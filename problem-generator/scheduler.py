@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Generation Scheduler for ML/AI Problem Generation System
+Rate limiting, adaptive concurrency and priority lanes in front of a provider
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Union
+
+from prompt_packing import estimate_tokens
+from providers import GenerationProvider, RateLimitError
+from response_parser import ParsedResponse, StreamingResponseHandler
+
+# Priority lanes: lower values are dispatched first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+# Default limits per provider name: requests/min, tokens/min, max concurrency
+PROVIDER_LIMITS = {
+    "stub": {"requests_per_minute": 600, "tokens_per_minute": 1000000, "max_concurrency": 16},
+    "default": {"requests_per_minute": 60, "tokens_per_minute": 90000, "max_concurrency": 8}
+}
+
+# Completion budget reserved per call when charging the tokens/min bucket
+DEFAULT_COMPLETION_TOKENS = 1500
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at a fixed rate"""
+    
+    def __init__(self, capacity: float, refill_per_second: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.clock = clock
+        self.tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+    
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+    
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)"""
+        with self._lock:
+            self._refill()
+            amount = min(amount, self.capacity)
+            if self.tokens >= amount:
+                return 0.0
+            return (amount - self.tokens) / self.refill_per_second
+    
+    def consume(self, amount: float):
+        """Take tokens; the balance may go negative when a request overruns"""
+        with self._lock:
+            self._refill()
+            self.tokens -= min(amount, self.capacity)
+    
+    def drain(self):
+        """Empty the bucket, e.g. after the provider reports a 429"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0.0)
+
+class AdaptiveConcurrency:
+    """AIMD concurrency limit driven by 429s and latency.
+    
+    Each success adds 1/limit (about +1 per round of requests); a 429 halves
+    the limit and a response slower than the latency target shrinks it by 10%.
+    """
+    
+    def __init__(self, initial: int = 2, minimum: int = 1, maximum: int = 8, latency_target: float = 30.0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self._lock = threading.Lock()
+    
+    @property
+    def slots(self) -> int:
+        return int(self.limit)
+    
+    def on_success(self, latency: float):
+        with self._lock:
+            if latency > self.latency_target:
+                self.limit = max(self.minimum, self.limit * 0.9)
+            else:
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+    
+    def on_throttle(self):
+        with self._lock:
+            self.limit = max(self.minimum, self.limit * 0.5)
+
+class _Job:
+    """A queued generation request"""
+    
+    __slots__ = ("prompt", "stage", "topic", "priority", "tokens", "required_fields", "future", "attempts",
+                 "not_before")
+    
+    def __init__(self, prompt: str, stage: str, topic: str, priority: int, tokens: int,
+                 required_fields: Optional[Dict[str, type]] = None):
+        self.prompt = prompt
+        self.stage = stage
+        self.topic = topic
+        self.priority = priority
+        self.tokens = tokens
+        self.required_fields = required_fields
+        self.future = Future()
+        self.attempts = 0
+        self.not_before = 0.0
+
+class GenerationScheduler:
+    """Dispatches provider calls within rate limits, highest priority first"""
+    
+    def __init__(self, provider: GenerationProvider, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None, max_concurrency: Optional[int] = None,
+                 latency_target: float = 30.0, max_retries: int = 5,
+                 clock: Callable[[], float] = time.monotonic):
+        limits = PROVIDER_LIMITS.get(provider.name, PROVIDER_LIMITS["default"])
+        requests_per_minute = requests_per_minute or limits["requests_per_minute"]
+        tokens_per_minute = tokens_per_minute or limits["tokens_per_minute"]
+        max_concurrency = max_concurrency or limits["max_concurrency"]
+        
+        self.provider = provider
+        self.clock = clock
+        self.max_retries = max_retries
+        self.request_bucket = TokenBucket(requests_per_minute, requests_per_minute / 60.0, clock)
+        self.token_bucket = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0, clock)
+        self.concurrency = AdaptiveConcurrency(
+            initial=min(2, max_concurrency), maximum=max_concurrency, latency_target=latency_target
+        )
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "throttled": 0, "cancelled": 0}
+        
+        self._queue = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._closed = False
+        self._cancelled = False
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="generation")
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="scheduler", daemon=True)
+        self._dispatcher.start()
+    
+    def submit(self, prompt: str, stage: str, topic: str, priority: int = PRIORITY_BATCH,
+               required_fields: Optional[Dict[str, type]] = None) -> Future:
+        """Queue a request and return a future for the response text.
+        
+        With `required_fields` the response is parsed as it streams in and the
+        future holds a ParsedResponse instead; a response that turns out
+        malformed is cut off there and fails the future with
+        MalformedResponseError. Cancelling the future drops a queued job, or
+        abandons a running one at its next streamed chunk.
+        """
+        job = _Job(prompt, stage, topic, priority, estimate_tokens(prompt) + DEFAULT_COMPLETION_TOKENS,
+                   required_fields)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Scheduler is shut down")
+            self.stats["submitted"] += 1
+            self._enqueue(job)
+        return job.future
+    
+    def generate(self, prompt: str, stage: str, topic: str, priority: int = PRIORITY_BATCH,
+                 required_fields: Optional[Dict[str, type]] = None) -> Union[str, ParsedResponse]:
+        """Submit a request and block until it completes"""
+        return self.submit(prompt, stage, topic, priority, required_fields).result()
+    
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+    
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work and release the worker threads.
+        
+        With wait=True queued jobs are finished first; otherwise they are cancelled.
+        """
+        with self._condition:
+            self._closed = True
+            self._cancelled = not wait
+            if not wait:
+                for _, _, job in self._queue:
+                    job.future.cancel()
+                self._queue = []
+            self._condition.notify_all()
+        if wait:
+            self._dispatcher.join()
+        self._executor.shutdown(wait=wait)
+    
+    def _enqueue(self, job: _Job):
+        heapq.heappush(self._queue, (job.priority, next(self._sequence), job))
+        self._condition.notify_all()
+    
+    def _dispatch_loop(self):
+        with self._condition:
+            while True:
+                if not self._queue:
+                    if self._closed and not self._in_flight:
+                        return
+                    self._condition.wait()
+                    continue
+                if self._in_flight >= self.concurrency.slots:
+                    self._condition.wait()
+                    continue
+                
+                job = self._queue[0][2]
+                if job.future.cancelled():
+                    heapq.heappop(self._queue)
+                    self.stats["cancelled"] += 1
+                    continue
+                wait = max(
+                    job.not_before - self.clock(),
+                    self.request_bucket.wait_time(1),
+                    self.token_bucket.wait_time(job.tokens)
+                )
+                if wait > 0:
+                    self._condition.wait(timeout=wait)
+                    continue
+                
+                heapq.heappop(self._queue)
+                self.request_bucket.consume(1)
+                self.token_bucket.consume(job.tokens)
+                self._in_flight += 1
+                self._executor.submit(self._run, job)
+    
+    def _run(self, job: _Job):
+        started = self.clock()
+        try:
+            response = self._stream(job)
+        except RateLimitError as e:
+            self._on_throttle(job, e)
+            return
+        except Exception as e:
+            self._finish(job, error=e)
+            return
+        
+        if response is not None:
+            text = response.text if isinstance(response, ParsedResponse) else response
+            self.concurrency.on_success(self.clock() - started)
+            self.token_bucket.consume(max(0, estimate_tokens(text) - DEFAULT_COMPLETION_TOKENS))
+        self._finish(job, result=response)
+    
+    def _stream(self, job: _Job) -> Union[str, ParsedResponse, None]:
+        """Read the response, parsing it as it arrives when the job has required fields.
+        
+        The provider stream is closed as soon as the job is cancelled, the
+        response can no longer parse (the MalformedResponseError propagates),
+        or the object is complete.
+        """
+        chunks = []
+        handler = StreamingResponseHandler(job.required_fields) if job.required_fields else None
+        stream = self.provider.stream(job.prompt, job.stage, job.topic)
+        try:
+            for chunk in stream:
+                if job.future.cancelled():
+                    return None
+                chunks.append(chunk)
+                if handler and handler.feed(chunk):
+                    break
+        finally:
+            stream.close()
+        text = "".join(chunks)
+        if handler is None:
+            return text
+        return ParsedResponse(text, handler.parser.close())
+    
+    def _on_throttle(self, job: _Job, error: RateLimitError):
+        self.concurrency.on_throttle()
+        self.request_bucket.drain()
+        with self._condition:
+            self.stats["throttled"] += 1
+            self._in_flight -= 1
+            job.attempts += 1
+            if self._cancelled or job.future.cancelled():
+                job.future.cancel()
+                self._condition.notify_all()
+                return
+            if job.attempts > self.max_retries:
+                self.stats["failed"] += 1
+                try:
+                    job.future.set_exception(error)
+                except InvalidStateError:
+                    pass
+                self._condition.notify_all()
+                return
+            backoff = error.retry_after if error.retry_after is not None else min(60.0, 2.0 ** job.attempts)
+            job.not_before = self.clock() + backoff
+            self._enqueue(job)
+    
+    def _finish(self, job: _Job, result: Union[str, ParsedResponse, None] = None,
+                error: Optional[Exception] = None):
+        with self._condition:
+            self._in_flight -= 1
+            try:
+                if job.future.cancelled():
+                    self.stats["cancelled"] += 1
+                elif error is not None:
+                    job.future.set_exception(error)
+                    self.stats["failed"] += 1
+                else:
+                    job.future.set_result(result)
+                    self.stats["completed"] += 1
+            except InvalidStateError:
+                # Cancelled between the check and the result being set
+                self.stats["cancelled"] += 1
+            self._condition.notify_all()
+    
+    def snapshot(self) -> Dict:
+        """Current scheduler state for progress output"""
+        return dict(self.stats, queue_depth=self.queue_depth, in_flight=self._in_flight,
+                    concurrency_limit=round(self.concurrency.limit, 2))
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Record Schemas for ML/AI Problem Generation System
+Validates and repairs generated problems and solutions before they are stored
+"""
+
+import copy
+import json
+import re
+from typing import Callable, Dict, List
+
+DIFFICULTIES = ["easy", "medium", "hard"]
+SOLUTION_TYPES = ["full_solution", "practice_solution"]
+
+# Field rules: type, required, non_empty, enum, item_type, default, strip_fences
+PROBLEM_SCHEMA = {
+    "id": {"type": str, "required": True, "non_empty": True},
+    "topic": {"type": str},
+    "title": {"type": str, "required": True, "non_empty": True},
+    "description": {"type": str, "required": True, "non_empty": True},
+    "difficulty": {"type": str, "enum": DIFFICULTIES, "default": "medium"},
+    "company": {"type": str, "default": "OpenAI"},
+    "categories": {"type": list, "item_type": str, "default": ["coding"]},
+    "tags": {"type": list, "item_type": str, "default": []},
+    "examples": {"type": list, "item_type": dict, "default": []},
+    "constraints": {"type": list, "item_type": str, "default": []},
+    "follow_up": {"type": str},
+    "function_signature": {"type": str, "strip_fences": True},
+    "input_format": {"type": str},
+    "output_format": {"type": str}
+}
+
+SOLUTION_SCHEMA = {
+    "id": {"type": str, "required": True, "non_empty": True},
+    "problem_id": {"type": str, "required": True, "non_empty": True},
+    "type": {"type": str, "required": True, "enum": SOLUTION_TYPES},
+    "title": {"type": str, "required": True, "non_empty": True},
+    "code": {"type": str, "strip_fences": True},
+    "explanation": {"type": str},
+    "time_complexity": {"type": str},
+    "space_complexity": {"type": str},
+    "key_concepts": {"type": list, "item_type": str},
+    "hints": {"type": list, "item_type": str},
+    "learning_objectives": {"type": list, "item_type": str},
+    "todo_items": {"type": list, "item_type": str}
+}
+
+_FENCED = re.compile(r'^\s*```[\w+-]*[ \t]*\n?(.*?)\n?[ \t]*```\s*$', re.S)
+_STRING_OR_TRAILING_COMMA = re.compile(r'"(?:[^"\\]|\\.)*"|,(\s*[}\]])', re.S)
+
+class SchemaValidationError(ValueError):
+    """Raised when a record still fails its schema after repair"""
+    
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+def compile_schema(schema: Dict[str, Dict]) -> Callable[[Dict], List[str]]:
+    """Compile a schema into a validator returning a list of error messages.
+    
+    Rules are flattened into tuples once so each call is a single pass over
+    the fields with no dictionary lookups into the schema itself.
+    """
+    required = tuple(name for name, rule in schema.items() if rule.get("required"))
+    checks = tuple(
+        (
+            name,
+            rule["type"],
+            rule.get("non_empty", False),
+            frozenset(rule["enum"]) if "enum" in rule else None,
+            rule.get("item_type")
+        )
+        for name, rule in schema.items()
+    )
+    
+    def validate(record: Dict) -> List[str]:
+        if not isinstance(record, dict):
+            return [f"record must be an object, got {type(record).__name__}"]
+        
+        errors = [f"missing required field '{name}'" for name in required if record.get(name) is None]
+        for name, expected, non_empty, enum, item_type in checks:
+            value = record.get(name)
+            if value is None:
+                continue
+            if not isinstance(value, expected):
+                errors.append(f"'{name}' should be {expected.__name__}, got {type(value).__name__}")
+            elif non_empty and not value:
+                errors.append(f"'{name}' must not be empty")
+            elif enum is not None and value not in enum:
+                errors.append(f"'{name}' must be one of {', '.join(sorted(enum))}")
+            elif item_type is not None and not all(isinstance(item, item_type) for item in value):
+                errors.append(f"'{name}' items should be {item_type.__name__}")
+        return errors
+    
+    return validate
+
+_validators = {}
+
+def get_validator(schema: Dict[str, Dict]) -> Callable[[Dict], List[str]]:
+    """Return the compiled validator for a schema, compiling it on first use"""
+    validator = _validators.get(id(schema))
+    if validator is None:
+        validator = _validators[id(schema)] = compile_schema(schema)
+    return validator
+
+validate_problem = get_validator(PROBLEM_SCHEMA)
+validate_solution = get_validator(SOLUTION_SCHEMA)
+
+def strip_code_fences(text: str) -> str:
+    """Remove a surrounding markdown code fence, if any"""
+    match = _FENCED.match(text)
+    return match.group(1) if match else text
+
+def repair_json_text(text: str) -> str:
+    """Cheap textual fixes for model output: fences, surrounding prose, trailing commas"""
+    text = strip_code_fences(text.strip())
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        text = text[start:end + 1]
+    return _STRING_OR_TRAILING_COMMA.sub(lambda m: m.group(1) if m.group(1) else m.group(0), text)
+
+def repair_record(record: Dict, schema: Dict[str, Dict]) -> Dict:
+    """Coerce field types and fill defaults so most imperfect records validate"""
+    repaired = dict(record)
+    for name, rule in schema.items():
+        value = repaired.get(name)
+        if value is None:
+            if "default" in rule:
+                repaired[name] = copy.deepcopy(rule["default"])
+            continue
+        repaired[name] = _coerce(value, rule)
+    return repaired
+
+def _coerce(value, rule: Dict):
+    """Coerce a single value towards the type its rule expects"""
+    expected = rule["type"]
+    
+    if expected is str:
+        if isinstance(value, list):
+            value = "\n".join(str(item) for item in value)
+        elif isinstance(value, (int, float, bool)):
+            value = str(value)
+        if isinstance(value, str):
+            value = value.strip()
+            if rule.get("strip_fences"):
+                value = strip_code_fences(value)
+            if "enum" in rule:
+                value = value.lower()
+                if value not in rule["enum"] and "default" in rule:
+                    value = rule["default"]
+        return value
+    
+    if expected is list:
+        item_type = rule.get("item_type")
+        if isinstance(value, str):
+            stripped = value.strip()
+            if stripped.startswith("["):
+                try:
+                    value = json.loads(stripped)
+                except json.JSONDecodeError:
+                    value = [stripped]
+            elif item_type is str:
+                value = [part.strip() for part in re.split(r'[,\n]', stripped) if part.strip()]
+            else:
+                value = [value]
+        elif isinstance(value, (tuple, set)):
+            value = list(value)
+        elif isinstance(value, dict):
+            value = [value]
+        if item_type is str and isinstance(value, list):
+            value = [item if isinstance(item, str) else _to_text(item) for item in value]
+        return value
+    
+    return value
+
+def _to_text(value) -> str:
+    """Render a non-string list item as text"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+def load_record(text: str, schema: Dict[str, Dict], base: Dict = None) -> Dict:
+    """Parse a raw model response, repair it and validate it against a schema"""
+    try:
+        generated = json.loads(repair_json_text(text))
+    except json.JSONDecodeError as e:
+        raise SchemaValidationError([f"invalid JSON: {e.msg}"])
+    
+    record = dict(base or {})
+    if isinstance(generated, dict):
+        record.update(generated)
+    return check_record(record, schema)
+
+def check_record(record: Dict, schema: Dict[str, Dict]) -> Dict:
+    """Repair a record and raise SchemaValidationError if it is still invalid"""
+    repaired = repair_record(record, schema)
+    errors = get_validator(schema)(repaired)
+    if errors:
+        raise SchemaValidationError(errors)
+    return repaired
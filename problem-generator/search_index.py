@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Search Index for ML/AI Problem Generation System
+Prefix-searchable term postings over question titles, tags and companies
+"""
+
+import json
+import os
+import re
+from typing import Dict, Iterable, List
+
+SEARCH_STATE_FILE = "search_index_state.json"
+SEARCH_INDEX_VERSION = 1
+
+# The frontend tokenizes queries with the same pattern, so the two must stay in step
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Words that would match nearly every title and only bloat the postings; integration.py
+# writes this list into the frontend module so queries skip the same words
+STOP_WORDS = frozenset({"a", "an", "and", "for", "from", "in", "of", "on", "the", "to", "with"})
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOP_WORDS]
+
+def document_terms(summary: Dict) -> List[str]:
+    """Distinct searchable terms of a question summary: its title, tags and company"""
+    terms = set(tokenize(summary.get("title", "")))
+    for tag in summary.get("tags", []):
+        terms.update(tokenize(tag))
+    terms.update(tokenize(summary.get("company") or ""))
+    return sorted(terms)
+
+class SearchIndex:
+    """Inverted index from term to question IDs, updated from a record diff.
+    
+    The per-document terms and the postings are kept in a state file, so a
+    run only tokenizes added and changed questions and only touches the
+    postings of their old and new terms. The published artifact is laid out
+    for type-ahead: sorted terms for a binary-searched prefix lookup,
+    delta-encoded document ordinals, and just enough of each question to
+    show a suggestion and fetch its shard.
+    """
+    
+    def __init__(self, state_file: str):
+        self.state_file = state_file
+        state = self._load()
+        self.documents: Dict[str, Dict] = state["documents"]
+        self.postings: Dict[str, set] = {term: set(ids) for term, ids in state["postings"].items()}
+    
+    def apply(self, diff: Dict, summaries: Iterable[Dict]) -> int:
+        """Fold an IntegrationManifest diff into the index; returns how many documents were re-tokenized"""
+        for record_id in diff["changed"] + diff["removed"]:
+            self._remove(record_id)
+        changed = set(diff["added"]) | set(diff["changed"])
+        seen = set()
+        reindexed = 0
+        for summary in summaries:
+            record_id = summary["id"]
+            seen.add(record_id)
+            if record_id in changed or record_id not in self.documents:
+                self._remove(record_id)
+                self._add(summary)
+                reindexed += 1
+        # A state file out of step with the manifest must not keep stale documents
+        for record_id in [record_id for record_id in self.documents if record_id not in seen]:
+            self._remove(record_id)
+        return reindexed
+    
+    def artifact(self, order: List[str]) -> Dict:
+        """The compact published form, with documents in `order`"""
+        order = [record_id for record_id in order if record_id in self.documents]
+        ordinals = {record_id: index for index, record_id in enumerate(order)}
+        terms = sorted(self.postings)
+        postings = []
+        for term in terms:
+            previous = 0
+            gaps = []
+            for ordinal in sorted(ordinals[record_id] for record_id in self.postings[term]):
+                gaps.append(ordinal - previous)
+                previous = ordinal
+            postings.append(gaps)
+        return {
+            "version": SEARCH_INDEX_VERSION,
+            "docs": [self.documents[record_id]["entry"] for record_id in order],
+            "terms": terms,
+            "postings": postings
+        }
+    
+    def _add(self, summary: Dict):
+        record_id = summary["id"]
+        terms = document_terms(summary)
+        self.documents[record_id] = {
+            "terms": terms,
+            "entry": [record_id, summary["title"], summary["difficulty"], summary["shard"]]
+        }
+        for term in terms:
+            self.postings.setdefault(term, set()).add(record_id)
+    
+    def _remove(self, record_id: str):
+        document = self.documents.pop(record_id, None)
+        if document is None:
+            return
+        for term in document["terms"]:
+            ids = self.postings.get(term)
+            if ids is not None:
+                ids.discard(record_id)
+                if not ids:
+                    del self.postings[term]
+    
+    def save(self):
+        directory = os.path.dirname(self.state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_file = self.state_file + ".tmp"
+        with open(temp_file, 'w') as f:
+            json.dump({
+                "version": SEARCH_INDEX_VERSION,
+                "documents": self.documents,
+                "postings": {term: sorted(ids) for term, ids in self.postings.items()}
+            }, f, separators=(",", ":"))
+        os.replace(temp_file, self.state_file)
+    
+    def _load(self) -> Dict:
+        try:
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            state = {}
+        if state.get("version") != SEARCH_INDEX_VERSION:
+            state = {}
+        state.setdefault("documents", {})
+        state.setdefault("postings", {})
+        return state
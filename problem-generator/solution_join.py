@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Solution Join for ML/AI Problem Generation System
+Materialized problem -> ordered solution IDs view kept beside the store
+"""
+
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class SolutionJoin:
+    """Each problem's solution IDs in the order they were stored.
+    
+    The view is saved with the store version (the stat stamps of the
+    problems and solutions files) it describes. DataManager applies each
+    write's delta and re-saves it under the new version; a saved version
+    that no longer matches the files means someone else wrote the store,
+    and the view is rebuilt from the records instead.
+    """
+    
+    def __init__(self, join_file: str):
+        self.join_file = join_file
+        self.version: Optional[List] = None
+        self.refs: Dict[str, List[str]] = {}
+        self._load()
+    
+    def matches(self, version: Tuple) -> bool:
+        return self.version is not None and self.version == _jsonable(version)
+    
+    def rebuild(self, solutions: Iterable[Dict]):
+        self.refs = {}
+        self.add_solutions(solutions)
+    
+    def add_solutions(self, solutions: Iterable[Dict]):
+        for solution in solutions:
+            self.refs.setdefault(solution.get("problem_id"), []).append(solution["id"])
+    
+    def remove_problem(self, problem_id: str):
+        self.refs.pop(problem_id, None)
+    
+    def solution_ids(self, problem_id: str) -> List[str]:
+        return self.refs.get(problem_id, [])
+    
+    def save(self, version: Tuple):
+        self.version = _jsonable(version)
+        temp_file = self.join_file + ".tmp"
+        with open(temp_file, 'w') as f:
+            json.dump({"version": self.version, "refs": self.refs}, f, separators=(",", ":"))
+        os.replace(temp_file, self.join_file)
+    
+    def _load(self):
+        try:
+            with open(self.join_file, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        self.version = data.get("version")
+        self.refs = data.get("refs", {})
+
+def _jsonable(version: Tuple) -> List:
+    return [list(stamp) if stamp is not None else None for stamp in version]
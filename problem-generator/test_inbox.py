@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for the response inbox parser and bulk ingest
+"""
+
+import json
+
+from data_manager import DataManager
+from inbox import parse_file
+from ingest import ingest_files
+
+PROBLEMS = [
+    {"id": "array-1", "title": "Implement softmax", "description": "Write a numerically stable softmax."},
+    {"id": "array-2", "title": "Implement layer norm", "description": "Normalize over the last axis."}
+]
+
+def test_parse_file_reads_json_array(tmp_path):
+    path = tmp_path / "a.json"
+    path.write_text(json.dumps(PROBLEMS))
+    
+    result = parse_file(str(path))
+    
+    assert result["errors"] == []
+    assert [problem["id"] for problem in result["problems"]] == ["array-1", "array-2"]
+
+def test_parse_file_repairs_fenced_object(tmp_path):
+    path = tmp_path / "b.json"
+    path.write_text('```json\n{"title": "Fenced", "description": "From a model",}\n```')
+    
+    result = parse_file(str(path))
+    
+    assert result["errors"] == []
+    assert result["problems"][0]["title"] == "Fenced"
+
+def test_ingest_stores_json_array_file(tmp_path):
+    path = tmp_path / "archive" / "a.json"
+    path.parent.mkdir()
+    path.write_text(json.dumps(PROBLEMS))
+    data_manager = DataManager(str(tmp_path / "data"))
+    
+    summary = ingest_files(data_manager, [str(path)], workers=1)
+    
+    assert summary["errors"] == []
+    assert summary["problems"] == 2
+    assert {problem["id"] for problem in data_manager.get_all_problems()} == {"array-1", "array-2"}
+
+def test_ingest_drops_stored_content_under_a_new_id(tmp_path):
+    data_manager = DataManager(str(tmp_path / "data"))
+    # Stored before the schema filled examples and constraints with defaults
+    stored = dict(PROBLEMS[0], topic="softmax", generated_at="2025-01-01T00:00:00", status="generated")
+    with open(data_manager.problems_file, 'w') as f:
+        json.dump([stored], f)
+    path = tmp_path / "archive" / "a.json"
+    path.parent.mkdir()
+    path.write_text(json.dumps({key: value for key, value in stored.items() if key != "id"}))
+    
+    summary = ingest_files(data_manager, [str(path)], workers=1, dry_run=True)
+    
+    assert summary["errors"] == []
+    assert summary["problems"] == 0
+    assert summary["duplicate_content"] == 1
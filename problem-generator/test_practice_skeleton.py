@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Tests for deriving practice skeletons from full solutions
+"""
+
+from practice_skeleton import make_skeleton
+
+def test_one_line_def_with_non_ascii_default():
+    skeleton, todos = make_skeleton('def f(x="hélloéé"): return x\n')
+    
+    assert skeleton == 'def f(x="hélloéé"): pass  # TODO: implement f\n'
+    assert todos == ["TODO: implement f"]
+
+def test_multi_line_body_after_non_ascii_comment():
+    code = 'def greet(name):\n    """Say hi"""\n    return f"héllo {name}"  # ünïcode\n'
+    
+    skeleton, _ = make_skeleton(code)
+    
+    assert skeleton == 'def greet(name):\n    """Say hi"""\n    # TODO: implement greet\n    pass\n'
+
+def test_one_line_docstring_only_method_stays_inside_the_method():
+    code = 'class A:\n    def f(self): """Döc"""\n    def g(self):\n        return 1\n'
+    
+    skeleton, todos = make_skeleton(code)
+    
+    assert skeleton == ('class A:\n    def f(self): """Döc"""; pass  # TODO: implement A.f\n'
+                        '    def g(self):\n        # TODO: implement A.g\n        pass\n')
+    assert todos == ["TODO: implement A.f", "TODO: implement A.g"]
+    compile(skeleton, "<skeleton>", "exec")
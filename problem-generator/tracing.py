@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Span Tracing for ML/AI Problem Generation System
+Per-stage timing spans exported as a Chrome/Perfetto trace
+"""
+
+import functools
+import json
+import math
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import Dict, List, Optional
+
+# Shared no-op span handed out while tracing is off
+_NULL_SPAN = nullcontext()
+
+_tracer = None
+
+class Tracer:
+    """Collects completed spans as Chrome trace "complete" events.
+    
+    Spans are appended to a plain list (atomic under the GIL), so recording
+    one costs two clock reads and an append. Timestamps are microseconds
+    since the tracer started, as the trace format expects.
+    """
+    
+    def __init__(self):
+        self.events: List[Dict] = []
+        self.pid = os.getpid()
+        self._origin = time.perf_counter()
+        # Lets traces from worker processes line up with this one
+        self.started_at = time.time()
+    
+    def span(self, name: str, **args) -> "_Span":
+        return _Span(self, name, args)
+    
+    def record(self, name: str, started: float, ended: float, args: Dict):
+        event = {
+            "name": name,
+            "cat": name.split(".", 1)[0],
+            "ph": "X",
+            "ts": round((started - self._origin) * 1e6, 1),
+            "dur": round((ended - started) * 1e6, 1),
+            "pid": self.pid,
+            "tid": threading.get_ident()
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+    
+    def merge_file(self, path: str):
+        """Add the spans of another process's trace file, shifted onto this tracer's clock, then delete it"""
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        offset = (data.get("startedAt", self.started_at) - self.started_at) * 1e6
+        for event in data.get("traceEvents", []):
+            if event.get("ph") == "X":
+                event["ts"] = round(event["ts"] + offset, 1)
+            self.events.append(event)
+        os.remove(path)
+    
+    def write(self, path: str):
+        """Write a trace that chrome://tracing and ui.perfetto.dev can open"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {"traceEvents": list(self.events), "displayTimeUnit": "ms", "startedAt": self.started_at}
+        with open(path, 'w') as f:
+            json.dump(data, f, separators=(",", ":"))
+    
+    def summary(self) -> List[Dict]:
+        """Per-span count, p50, p95 and total in milliseconds, largest total first"""
+        durations = {}
+        for event in self.events:
+            if event.get("ph") == "X":
+                durations.setdefault(event["name"], []).append(event["dur"] / 1000.0)
+        rows = []
+        for name, values in durations.items():
+            values.sort()
+            rows.append({
+                "name": name,
+                "count": len(values),
+                "p50": _percentile(values, 0.5),
+                "p95": _percentile(values, 0.95),
+                "total": sum(values)
+            })
+        return sorted(rows, key=lambda row: row["total"], reverse=True)
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "started")
+    
+    def __init__(self, tracer: Tracer, name: str, args: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.started = 0.0
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.record(self.name, self.started, time.perf_counter(), self.args)
+        return False
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    index = min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))
+    return values[index]
+
+def span(name: str, **args):
+    """Context manager timing a block as a named span; a shared no-op while tracing is off"""
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return tracer.span(name, **args)
+
+def traced(name: str):
+    """Decorator timing every call of a function as a named span"""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return function(*args, **kwargs)
+            with tracer.span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def current_tracer() -> Optional[Tracer]:
+    return _tracer
+
+def start_tracing() -> Tracer:
+    """Install a process-wide tracer and return it"""
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+def stop_tracing() -> Optional[Tracer]:
+    """Uninstall the process-wide tracer and return it"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+TypeScript Emitter for ML/AI Problem Generation System
+Streams records into a generated TypeScript module with an atomic replace
+"""
+
+import json
+import os
+import re
+from typing import Dict, Iterable, Optional, Tuple
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_$][A-Za-z0-9_$]*$")
+
+class TsExpression(str):
+    """A value emitted as raw TypeScript rather than as a string literal"""
+
+TS_NEW_DATE = TsExpression("new Date()")
+
+def ts_value(value) -> str:
+    """A TypeScript literal for a JSON-compatible value.
+    
+    Strings go through the JSON encoder, so quotes, backslashes, newlines and
+    control characters are escaped; U+2028/U+2029 are escaped as well since
+    older JavaScript parsers reject them inside string literals.
+    """
+    if isinstance(value, TsExpression):
+        return str(value)
+    text = json.dumps(value, ensure_ascii=False)
+    return text.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029")
+
+def ts_key(key: str) -> str:
+    return key if _IDENTIFIER.match(key) else json.dumps(key)
+
+class TsModuleWriter:
+    """Writes `export const NAME = [...]` one record at a time.
+    
+    Records go straight to a buffered handle on a temporary file next to the
+    target, so memory stays flat however large the records are, and the
+    target is only replaced once the whole module has been written.
+    """
+    
+    def __init__(self, output_file: str, buffer_size: int = 1 << 16):
+        self.output_file = output_file
+        self.temp_file = f"{output_file}.{os.getpid()}.tmp"
+        self.buffer_size = buffer_size
+        self.records = 0
+        self._file = None
+        self._in_array = False
+    
+    def __enter__(self) -> "TsModuleWriter":
+        directory = os.path.dirname(self.output_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.temp_file, 'w', buffering=self.buffer_size, encoding="utf-8")
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self._discard()
+        return False
+    
+    def line(self, text: str = ""):
+        self._file.write(text)
+        self._file.write("\n")
+    
+    def begin_array(self, export_name: str, element_type: Optional[str] = None):
+        annotation = f": {element_type}[]" if element_type else ""
+        self._file.write(f"export const {export_name}{annotation} = [")
+        self._in_array = True
+        self.records = 0
+    
+    def write_record(self, record: Dict):
+        write = self._file.write
+        write(",\n  {\n" if self.records else "\n  {\n")
+        last = len(record) - 1
+        for index, (key, value) in enumerate(record.items()):
+            write("    ")
+            write(ts_key(key))
+            write(": ")
+            write(ts_value(value))
+            write(",\n" if index < last else "\n")
+        write("  }")
+        self.records += 1
+    
+    def end_array(self):
+        self._file.write("\n];\n" if self.records else "];\n")
+        self._in_array = False
+    
+    def commit(self):
+        """Flush, fsync and move the module into place"""
+        if self._in_array:
+            self.end_array()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.temp_file, self.output_file)
+    
+    def _discard(self):
+        self._file.close()
+        try:
+            os.remove(self.temp_file)
+        except FileNotFoundError:
+            pass
+
+def write_ts_module(output_file: str, export_name: str, records: Iterable[Dict], header: Iterable[str] = (),
+                    element_type: Optional[Tuple[str, str]] = None) -> int:
+    """Stream records into a module exporting one array; returns how many were written.
+    
+    `element_type` is a (type name, module) pair imported with `import type`;
+    a module of None means the header declares the type itself.
+    """
+    with TsModuleWriter(output_file) as writer:
+        for text in header:
+            writer.line(text)
+        if element_type and element_type[1]:
+            writer.line(f"import type {{ {element_type[0]} }} from '{element_type[1]}';")
+        writer.line()
+        writer.begin_array(export_name, element_type[0] if element_type else None)
+        for record in records:
+            writer.write_record(record)
+        writer.end_array()
+        return writer.records
@@ -7,6 +7,7 @@ Provides a command-line interface to view and browse generated content
 import argparse
 import json
 from data_manager import DataManager
+from ledger import GROUPINGS, GenerationLedger, throughput_report
 from config.ml_topics_config import MLTopicsConfig
 
 class ProblemViewer:
@@ -40,11 +41,12 @@ class ProblemViewer:
     def show_problem(self, args):
         """Show detailed information about a specific problem"""
         problem_id = args.problem_id
-        problem = self.data_manager.get_problem(problem_id)
+        joined = self.data_manager.get_problem_with_solutions(problem_id)
         
-        if not problem:
+        if not joined:
             print(f"❌ Problem with ID '{problem_id}' not found.")
             return
+        problem, solutions = joined
         
         print(f"📋 Problem Details: {problem.get('title', 'Untitled')}")
         print("=" * 60)
@@ -85,7 +87,6 @@ class ProblemViewer:
             print()
         
         # Show solutions
-        solutions = self.data_manager.get_solutions_for_problem(problem_id)
         if solutions:
             print(f"Solutions ({len(solutions)} total):")
             print("-" * 20)
@@ -187,6 +188,9 @@ class ProblemViewer:
     
     def show_statistics(self, args):
         """Show generation statistics"""
+        if getattr(args, 'throughput', False):
+            self.show_throughput(args)
+            return
         stats = self.data_manager.get_statistics()
         
         print("📊 Generation Statistics")
@@ -213,6 +217,27 @@ class ProblemViewer:
             for entry in stats['generation_history'][-5:]:  # Last 5 entries
                 print(f"  {entry['timestamp']}: {entry['action']} ({entry['item_id'][:8]}...)")
     
+    def show_throughput(self, args):
+        """Show generation cost and throughput from the ledger"""
+        ledger = GenerationLedger(self.data_manager.data_dir)
+        records = list(ledger.read())
+        if not records:
+            print(f"No generation calls recorded yet in {ledger.ledger_file}")
+            return
+        
+        print("⏱️  Generation Throughput")
+        print("=" * 40)
+        print(f"Calls recorded: {len(records)}")
+        for grouping in ([args.by] if args.by else GROUPINGS):
+            rows = throughput_report(records, grouping)
+            print(f"\nBy {grouping}:")
+            print(f"  {grouping:<28} {'calls':>6} {'rec/min':>8} {'tok/rec':>8} {'cache':>6} "
+                  f"{'ok':>5} {'retries':>7} {'mean s':>7} {'total s':>8}")
+            for row in rows[:args.top]:
+                print(f"  {str(row['key'])[:28]:<28} {row['records']:>6} {row['records_per_minute']:>8.1f} "
+                      f"{row['tokens_per_record']:>8.0f} {row['cache_hit_rate']:>6.0%} {row['success_rate']:>5.0%} "
+                      f"{row['retries']:>7} {row['mean_ms'] / 1000:>7.2f} {row['total_ms'] / 1000:>8.1f}")
+    
     def export_data(self, args):
         """Export all data to a file"""
         export_file = self.data_manager.export_data(args.file)
@@ -220,7 +245,8 @@ class ProblemViewer:
     
     def interactive_browse(self, args):
         """Interactive browsing mode"""
-        problems = self.data_manager.get_all_problems()
+        joined = list(self.data_manager.iter_problems_with_solutions())
+        problems = [problem for problem, _ in joined]
         
         if not problems:
             print("📝 No generated problems found.")
@@ -244,8 +270,8 @@ class ProblemViewer:
                 choice_num = int(choice)
                 if 1 <= choice_num <= len(problems):
                     # Show problem details
-                    problem = problems[choice_num - 1]
-                    self._show_problem_summary(problem)
+                    problem, solutions = joined[choice_num - 1]
+                    self._show_problem_summary(problem, solutions)
                 elif choice_num == len(problems) + 1:
                     self.show_statistics(None)
                 elif choice_num == len(problems) + 2:
@@ -258,7 +284,7 @@ class ProblemViewer:
             except ValueError:
                 print("❌ Please enter a valid number.")
     
-    def _show_problem_summary(self, problem):
+    def _show_problem_summary(self, problem, solutions):
         """Show a summary of a problem"""
         print(f"\n📋 {problem.get('title', 'Untitled')}")
         print("-" * 40)
@@ -278,7 +304,6 @@ class ProblemViewer:
             print(f"Function: {function_sig}")
         
         # Show solutions
-        solutions = self.data_manager.get_solutions_for_problem(problem['id'])
         if solutions:
             print(f"Solutions: {len(solutions)} available")
             for solution in solutions:
@@ -314,6 +339,10 @@ def main():
     
     # Statistics command
     stats_parser = subparsers.add_parser('stats', help='Show generation statistics')
+    stats_parser.add_argument('--throughput', action='store_true',
+                              help='Show cost and throughput from the generation ledger')
+    stats_parser.add_argument('--by', choices=GROUPINGS, help='Only group the throughput report by this')
+    stats_parser.add_argument('--top', type=int, default=10, help='Rows per throughput table')
     stats_parser.set_defaults(func=ProblemViewer().show_statistics)
     
     # Export command